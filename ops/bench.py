@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""
+Office OS - Deploy Benchmark
+Runs multi_deploy's deploy pipeline against local stand-ins so deploy
+performance can be measured reproducibly without touching any real host.
+Every run goes through run_pipeline with the build step left out.
+
+- A synthetic dist/ (index.html, a few public files and hashed assets with
+  log-normally distributed sizes) is generated from a seed.
+- Fake wrangler/vercel/surge binaries are put first on PATH. They
+  read the deployed directory, sleep for a configurable latency plus a
+  per-file cost, print a deploy URL and fail with a 503 at a given rate.
+- Neocities, the Netlify deploy API and the Cloudflare DNS and Pages APIs
+  are served by fake_services (Cloudflare uses wrangler without blake3).
+- GitHub Pages pushes to a local bare repository.
+- With --verify, each platform's deployed tree is served by a static host
+  stand-in with its own latency and checked by verify.py; with --dns too,
+  subdomains are pointed at the fastest healthy one.
+
+Reports wall time, throughput, peak RSS and request counts per platform.
+
+Usage:
+    python ops/bench.py --files 5000 --runs 3 --mutate 0.05
+    python ops/bench.py --files 50000 --platforms neocities --json bench.json
+
+POSIX only (the fake CLIs are shell wrappers).
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+import fake_services
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+# Platforms the bench can drive, keyed like PLATFORMS in multi_deploy
+CLI_PLATFORMS = {
+    'cloudflare': 'wrangler',
+    'vercel': 'vercel',
+    'surge': 'surge',
+}
+BENCH_PLATFORMS = list(CLI_PLATFORMS) + ['netlify', 'neocities', 'github']
+
+# Output each fake CLI prints on success; matched by multi_deploy.URL_PATTERNS
+FAKE_URLS = {
+    'wrangler': 'https://{id}.office-os.pages.dev',
+    'vercel': 'https://office-os-{id}.vercel.app',
+    'surge': 'https://office-os.surge.sh',
+}
+
+# Share of generated assets per extension
+ASSET_MIX = [
+    ('js', 0.45), ('css', 0.10), ('svg', 0.10), ('png', 0.15),
+    ('woff2', 0.05), ('json', 0.10), ('wasm', 0.05),
+]
+TEXT_EXTENSIONS = {'js', 'css', 'svg', 'json', 'html'}
+PUBLIC_FILES = ['favicon.svg', 'robots.txt', 'manifest.webmanifest']
+
+MIN_FILE_SIZE = 64
+MAX_FILE_SIZE = 8 * 1024 * 1024
+
+
+def log(msg: str):
+    print(f"⏱️  {msg}", flush=True)
+
+
+# ============================================================================
+# Synthetic dist/
+# ============================================================================
+
+def file_size(rng: random.Random, median: int, sigma: float) -> int:
+    """A log-normal file size clamped to a sane range."""
+    size = int(rng.lognormvariate(math.log(median), sigma))
+    return max(MIN_FILE_SIZE, min(MAX_FILE_SIZE, size))
+
+
+def file_content(rng: random.Random, extension: str, size: int) -> bytes:
+    """Compressible text for source-like files, random bytes for binaries."""
+    if extension not in TEXT_EXTENSIONS:
+        return rng.randbytes(size)
+    # Repetitive source with a unique header, so gzip/brotli ratios look real
+    words = [f"const v{rng.randrange(10 ** 6)}=" for _ in range(64)]
+    body = (' '.join(words) + ';\n').encode()
+    header = f"/* {rng.getrandbits(64):016x} */\n".encode()
+    return (header + body * (size // len(body) + 1))[:size]
+
+
+def hashed_name(rng: random.Random, stem: str, extension: str) -> str:
+    """`name-[hash].ext` the way Vite names build output."""
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-'
+    return f"{stem}-{''.join(rng.choice(alphabet) for _ in range(8))}.{extension}"
+
+
+def generate_dist(dist_dir: Path, files: int, seed: int = 0,
+                  median: int = 4096, sigma: float = 1.3) -> int:
+    """Write a synthetic build of `files` files. Returns the total bytes."""
+    rng = random.Random(seed)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    (dist_dir / 'assets').mkdir(parents=True)
+
+    extensions = [ext for ext, _ in ASSET_MIX]
+    weights = [weight for _, weight in ASSET_MIX]
+    total = 0
+
+    entry = hashed_name(rng, 'index', 'js')
+    index = (f'<!doctype html><html><head><script type="module" src="/assets/{entry}"></script>'
+             f'</head><body><div id="app"></div></body></html>\n').encode()
+    (dist_dir / 'index.html').write_bytes(index)
+    total += len(index)
+
+    paths = [f"assets/{entry}"] + PUBLIC_FILES
+    while len(paths) < files - 1:
+        extension = rng.choices(extensions, weights)[0]
+        # Large builds split chunks into nested directories
+        folder = f"assets/c{len(paths) % 64:02d}" if files > 5000 else 'assets'
+        paths.append(f"{folder}/{hashed_name(rng, f'chunk{len(paths)}', extension)}")
+
+    for relative in paths[:files - 1]:
+        path = dist_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        extension = relative.rsplit('.', 1)[-1]
+        content = file_content(rng, extension, file_size(rng, median, sigma))
+        path.write_bytes(content)
+        total += len(content)
+    return total
+
+
+def mutate_dist(dist_dir: Path, fraction: float, seed: int) -> int:
+    """Rewrite a fraction of the assets in place, as a small code change would."""
+    rng = random.Random(seed)
+    assets = sorted(p for p in (dist_dir / 'assets').rglob('*') if p.is_file())
+    changed = rng.sample(assets, int(len(assets) * fraction)) if assets else []
+    for path in changed:
+        with open(path, 'ab') as f:
+            f.write(f"\n/* {rng.getrandbits(64):016x} */".encode())
+    return len(changed)
+
+
+# ============================================================================
+# Fake platform CLIs
+# ============================================================================
+
+def install_fake_clis(bin_dir: Path) -> Dict[str, Path]:
+    """Write a wrapper per CLI that runs `bench.py fake-cli <name>`."""
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    wrappers = {}
+    for name in CLI_PLATFORMS.values():
+        wrapper = bin_dir / name
+        wrapper.write_text(
+            f'#!/bin/sh\nexec "{sys.executable}" "{Path(__file__).resolve()}" fake-cli {name} "$@"\n'
+        )
+        wrapper.chmod(0o755)
+        wrappers[name] = wrapper
+    return wrappers
+
+
+def deployed_dir(argv: List[str]) -> Path:
+    """The directory a CLI invocation deploys (positional or --dir=)."""
+    for arg in argv:
+        if arg.startswith('--dir='):
+            return Path(arg.split('=', 1)[1])
+    for arg in argv:
+        if not arg.startswith('-') and Path(arg).is_dir():
+            return Path(arg)
+    return Path('dist')
+
+
+def fake_cli(name: str, argv: List[str]) -> int:
+    """Behave like a platform CLI deploy, with injected latency and failures."""
+    latency = float(os.getenv('FAKE_CLI_LATENCY', '0'))
+    per_file = float(os.getenv('FAKE_CLI_PER_FILE', '0'))
+    failure_rate = float(os.getenv('FAKE_CLI_FAILURE_RATE', '0'))
+
+    # CLIs hash every file before uploading, so read them all
+    files = 0
+    total = 0
+    digest = hashlib.sha1()
+    for path in sorted(deployed_dir(argv).rglob('*')):
+        if path.is_file():
+            data = path.read_bytes()
+            digest.update(data)
+            files += 1
+            total += len(data)
+
+    print(f"Uploading... ({files} files, {total / 1024:.0f} KiB)", flush=True)
+    time.sleep(latency + files * per_file)
+
+    failed = random.random() < failure_rate
+    log_file = os.getenv('FAKE_CLI_LOG')
+    if log_file:
+        with open(log_file, 'a') as f:
+            f.write(json.dumps({'cli': name, 'ok': not failed, 'files': files, 'bytes': total}) + '\n')
+
+    if failed:
+        print("Error: 503 Service Unavailable", file=sys.stderr, flush=True)
+        return 1
+    print(f"✨ Deployment complete! {FAKE_URLS[name].format(id=digest.hexdigest()[:8])}", flush=True)
+    return 0
+
+
+def cli_invocations(log_file: Path) -> Dict[str, int]:
+    """Invocations (attempts) per CLI from the fake CLI log."""
+    counts: Dict[str, int] = {}
+    try:
+        with open(log_file) as f:
+            for line in f:
+                name = json.loads(line)['cli']
+                counts[name] = counts.get(name, 0) + 1
+    except OSError:
+        pass
+    return counts
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+def peak_rss() -> Dict[str, Optional[float]]:
+    """Peak resident set size (MiB) of this process and its largest child."""
+    if not HAS_RESOURCE:
+        return {'self': None, 'children': None}
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+@dataclass
+class PlatformStats:
+    """One platform's result in one run."""
+    platform: str
+    success: bool
+    duration: float
+    attempts: int
+    requests: Optional[int]  # None where there is no request count (git)
+    files_per_sec: float
+    bytes_per_sec: float
+
+
+@dataclass
+class RunStats:
+    """One benchmark run."""
+    run: int
+    files: int
+    bytes: int
+    changed: int
+    wall: float
+    stages: Dict[str, float] = field(default_factory=dict)
+    platforms: List[PlatformStats] = field(default_factory=list)
+    dns_requests: Optional[int] = None
+    dns_target: Optional[str] = None
+    verify: Dict[str, Dict[str, Optional[float]]] = field(default_factory=dict)
+    critical_path: List[str] = field(default_factory=list)
+    rss_mib: Dict[str, Optional[float]] = field(default_factory=dict)
+
+
+def start_services(args) -> Dict[str, fake_services.FakeService]:
+    """Start the API stand-ins, keyed by the platform they replace."""
+    options = {'latency': args.api_latency, 'failure_rate': args.api_failure_rate, 'seed': args.seed,
+               'rate_limit': args.api_rate_limit}
+    services = {
+        'neocities': fake_services.FakeNeocities(**options),
+        'netlify': fake_services.FakeNetlify(**options),
+        'cloudflare': fake_services.FakeCloudflare(**options),
+    }
+    services['cloudflare'].add_filler_records(args.dns_records)
+    for service in services.values():
+        service.start()
+    return services
+
+
+def start_hosts(args, project_root: Path) -> Dict[str, fake_services.FakeStaticHost]:
+    """One static host per platform, serving its staged tree, each with its own latency."""
+    import staging
+
+    rng = random.Random(args.seed)
+    hosts = {}
+    for platform in args.platforms:
+        latency = args.host_latency * rng.uniform(0.5, 2.0)
+        hosts[platform] = fake_services.FakeStaticHost(
+            staging.stage_dir(project_root, platform), latency=latency, seed=args.seed
+        ).start()
+    return hosts
+
+
+def configure_env(args, services: Dict[str, fake_services.FakeService],
+                  bin_dir: Path, cli_log: Path, pages_repo: Path):
+    """Point the deploy scripts at the fakes. Must run before importing them."""
+    env = {
+        'PATH': f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        'OPS_USE_PATH_TOOLS': 'True',
+        'DEPLOY_STREAM_OUTPUT': 'True' if args.verbose else 'False',
+        'DEPLOY_RETRY_BUDGET': str(args.retry_budget),
+        'ENABLE_PRECOMPRESS': 'True' if args.precompress else 'False',
+        'FAKE_CLI_LATENCY': str(args.latency),
+        'FAKE_CLI_PER_FILE': str(args.per_file),
+        'FAKE_CLI_FAILURE_RATE': str(args.failure_rate),
+        'FAKE_CLI_LOG': str(cli_log),
+        'NEOCITIES_API_URL': f"{services['neocities'].url}/api",
+        'NEOCITIES_API_KEY': 'bench',
+        'NEOCITIES_SITENAME': 'bench',
+        'CLOUDFLARE_API_BASE': services['cloudflare'].url,
+        'CLOUDFLARE_API_TOKEN': 'bench',
+        'CLOUDFLARE_ACCOUNT_ID': 'bench',
+        'CLOUDFLARE_DOMAIN': services['cloudflare'].domain,
+        'VERCEL_TOKEN': 'bench',
+        'NETLIFY_API_URL': f"{services['netlify'].url}/api/v1",
+        'NETLIFY_AUTH_TOKEN': 'bench',
+        'NETLIFY_SITE_ID': services['netlify'].site_id,
+        'SURGE_TOKEN': 'bench',
+        'GH_PAGES_REPO': str(pages_repo),
+        'DNS_PLATFORM_TARGETS': ','.join(f"{p}={p}.bench.test" for p in args.platforms),
+    }
+    if args.client_rate_limit:
+        # The fakes all listen on 127.0.0.1, so limits are keyed by host:port
+        env['HTTP_RATE_LIMITS'] = ','.join(
+            f"{service.url.split('://', 1)[1]}={args.client_rate_limit}/10" for service in services.values()
+        )
+    # Explicit values win over anything in ops/.env
+    for key in ('ENABLE_CLOUDFLARE', 'ENABLE_VERCEL', 'ENABLE_NETLIFY', 'ENABLE_SURGE',
+                'ENABLE_NEOCITIES', 'ENABLE_GITHUB_PAGES', 'ENABLE_RENDER'):
+        env[key] = 'False'
+    for platform in args.platforms:
+        env[{'github': 'ENABLE_GITHUB_PAGES'}.get(platform, f"ENABLE_{platform.upper()}")] = 'True'
+    os.environ.update(env)
+
+
+def bench_run(md, deployer, args, run: int, total_bytes: int, changed: int,
+              services: Dict[str, fake_services.FakeService], cli_log: Path,
+              hosts: Dict[str, fake_services.FakeStaticHost]) -> RunStats:
+    """One timed pass of the deploy pipeline over the generated dist/ (no build)."""
+    import asyncio
+    import dns_manager
+    import pipeline
+    import verify
+
+    stats = RunStats(run, args.files, total_bytes, changed, 0.0)
+    before = {key: service.total_requests for key, service in services.items()}
+    cli_before = cli_invocations(cli_log)
+    start = time.perf_counter()
+
+    # Verify and DNS run below instead, against the static host stand-ins
+    options = argparse.Namespace(force_build=False, allow_bundle_regression=False, resume=False,
+                                 sequential=args.sequential, concurrency=args.concurrency,
+                                 no_verify=True, dns=False, dns_fastest=False)
+    enabled = md.get_enabled_platforms()
+    runs = asyncio.run(md.run_pipeline(deployer, options, enabled, build=False))
+    for name in ('bundle', 'stage', 'precompress', 'journal'):
+        if not runs[name].ok:
+            raise SystemExit(f"{name} failed: {runs[name].error}")
+        stats.stages[name] = runs[name].duration
+    deploys = [runs[f'deploy:{key}'] for key, _ in enabled]
+    stats.stages['deploy'] = max(r.end for r in deploys) - min(r.start for r in deploys)
+    stats.critical_path = [r.name for r in pipeline.critical_path(runs)]
+    results = [
+        r.value if r.ok else md.DeploymentResult(config.name, False, error=r.error)
+        for r, (_, config) in zip(deploys, enabled)
+    ]
+    after = {key: service.total_requests for key, service in services.items()}
+    cli_after = cli_invocations(cli_log)
+
+    by_name = {config.name: key for key, config in md.PLATFORMS.items()}
+    target = dns_manager.TARGET_CNAME
+    records = None
+    if hosts:
+        stage_start = time.perf_counter()
+        deployed = {by_name[r.platform]: hosts[by_name[r.platform]].url for r in results if r.success}
+        reports = verify.verify_all(deployed, deployer.project_root, deployer.dist_dir, wait=0)
+        stats.stages['verify'] = time.perf_counter() - stage_start
+        for report in reports:
+            stats.verify[report.platform] = {
+                'healthy': report.healthy, 'requests': len(report.probes),
+                'ttfb_p50': report.ttfb_p50, 'ttfb_p95': report.ttfb_p95,
+                'transfer_p50': report.transfer_p50, 'transfer_p95': report.transfer_p95,
+            }
+        records = dns_manager.get_dns_records(services['cloudflare'].zone_id)
+        target = md.fastest_dns_target(reports, dns_manager.current_target(records or []))
+
+    if args.dns and target:
+        stage_start = time.perf_counter()
+        stats.dns_target = target
+        dns_manager.reconcile(services['cloudflare'].zone_id, target, records=records)
+        stats.stages['dns'] = time.perf_counter() - stage_start
+        stats.dns_requests = services['cloudflare'].total_requests - after['cloudflare']
+
+    stats.wall = time.perf_counter() - start
+
+    for result in results:
+        key = by_name[result.platform]
+        # API requests plus CLI invocations (Cloudflare uses either)
+        requests_made = None
+        if key in services:
+            requests_made = after[key] - before[key]
+        if key in CLI_PLATFORMS:
+            name = CLI_PLATFORMS[key]
+            requests_made = (requests_made or 0) + cli_after.get(name, 0) - cli_before.get(name, 0)
+        duration = result.duration or 1e-9
+        stats.platforms.append(PlatformStats(
+            key, result.success, result.duration, result.attempts, requests_made,
+            args.files / duration, total_bytes / duration,
+        ))
+    stats.rss_mib = peak_rss()
+    return stats
+
+
+def print_report(runs: List[RunStats]):
+    """Plain-text table, one block per run."""
+    for stats in runs:
+        rss = stats.rss_mib
+        rss_text = (f"peak RSS {rss['self']:.0f} MiB (largest child {rss['children']:.0f} MiB)"
+                    if rss.get('self') is not None else "peak RSS n/a")
+        print()
+        print(f"Run {stats.run}: {stats.files} files, {stats.bytes / 1024 / 1024:.1f} MiB, "
+              f"{stats.changed} changed - {stats.wall:.2f}s wall, {rss_text}")
+        print("  " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in stats.stages.items()))
+        if stats.critical_path:
+            print(f"  Critical path: {' → '.join(stats.critical_path)}")
+        print(f"  {'Platform':<12} {'OK':<3} {'Time':>8} {'Tries':>5} {'Requests':>8} "
+              f"{'Files/s':>10} {'MiB/s':>8}")
+        for p in stats.platforms:
+            print(f"  {p.platform:<12} {'✓' if p.success else '✗':<3} {p.duration:>7.2f}s {p.attempts:>5} "
+                  f"{'-' if p.requests is None else p.requests:>8} {p.files_per_sec:>10.0f} {p.bytes_per_sec / 1024 / 1024:>8.1f}")
+        if stats.dns_requests is not None:
+            print(f"  {'dns':<12} {'':<3} {stats.stages['dns']:>7.2f}s {'':>5} {stats.dns_requests:>8}"
+                  f"  -> {stats.dns_target}")
+        if stats.verify:
+            print(f"  {'Verify':<12} {'OK':<3} {'Requests':>8} {'TTFB p50':>9} {'p95':>6} "
+                  f"{'Total p50':>10} {'p95':>6}  (ms)")
+            for platform, v in stats.verify.items():
+                ms = {k: f"{v[k] * 1000:.0f}" if v[k] is not None else '-'
+                      for k in ('ttfb_p50', 'ttfb_p95', 'transfer_p50', 'transfer_p95')}
+                print(f"  {platform:<12} {'✓' if v['healthy'] else '✗':<3} {v['requests']:>8} "
+                      f"{ms['ttfb_p50']:>9} {ms['ttfb_p95']:>6} {ms['transfer_p50']:>10} {ms['transfer_p95']:>6}")
+
+
+# ============================================================================
+# Main
+# ============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark multi_deploy against local fakes")
+    parser.add_argument('--files', type=int, default=1000, help="files in the synthetic dist/ (100-50000)")
+    parser.add_argument('--median-size', type=int, default=4096, help="median file size in bytes")
+    parser.add_argument('--sigma', type=float, default=1.3, help="log-normal spread of file sizes")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--runs', type=int, default=1, help="deploy passes over the same fakes")
+    parser.add_argument('--mutate', type=float, default=0.0,
+                        help="fraction of assets to change between runs")
+    parser.add_argument('--platforms', default=','.join(BENCH_PLATFORMS),
+                        help=f"comma-separated subset of {','.join(BENCH_PLATFORMS)}")
+    parser.add_argument('--latency', type=float, default=0.5, help="fake CLI base latency (s)")
+    parser.add_argument('--per-file', type=float, default=0.0001, help="fake CLI cost per file (s)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="fake CLI 503 rate (0-1)")
+    parser.add_argument('--api-latency', type=float, default=0.01, help="fake API latency per request (s)")
+    parser.add_argument('--api-failure-rate', type=float, default=0.0, help="fake API 503 rate (0-1)")
+    parser.add_argument('--api-rate-limit', type=float, default=0.0,
+                        help="fake API requests per second before answering 429 (0 = unlimited)")
+    parser.add_argument('--client-rate-limit', type=float, default=0.0,
+                        help="client-side requests per second per fake API (0 = no throttling)")
+    parser.add_argument('--concurrency', type=int, default=None)
+    parser.add_argument('--sequential', action='store_true')
+    parser.add_argument('--retry-budget', type=int, default=6)
+    parser.add_argument('--precompress', action='store_true', help="include the precompress stage")
+    parser.add_argument('--dns', action='store_true', help="also reconcile DNS against the fake API")
+    parser.add_argument('--dns-records', type=int, default=2500, help="unrelated records in the fake zone")
+    parser.add_argument('--verify', action='store_true',
+                        help="serve each deployed tree from a static host and verify it")
+    parser.add_argument('--host-latency', type=float, default=0.005,
+                        help="median static host latency per request (s), varied per platform")
+    parser.add_argument('--json', type=Path, help="also write the results as JSON")
+    parser.add_argument('--keep', action='store_true', help="keep the scratch directory")
+    parser.add_argument('--verbose', action='store_true', help="echo fake CLI output")
+    args = parser.parse_args(argv)
+
+    args.platforms = [p.strip() for p in args.platforms.split(',') if p.strip()]
+    unknown = set(args.platforms) - set(BENCH_PLATFORMS)
+    if unknown:
+        parser.error(f"unknown platforms: {', '.join(sorted(unknown))}")
+    if not 100 <= args.files <= 50000:
+        parser.error("--files must be between 100 and 50000")
+    return args
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == 'fake-cli':
+        sys.exit(fake_cli(sys.argv[2], sys.argv[3:]))
+
+    args = parse_args()
+    scratch = Path(tempfile.mkdtemp(prefix='office-os-bench-'))
+    project_root = scratch / 'project'
+    cli_log = scratch / 'cli.jsonl'
+
+    services = start_services(args)
+    hosts = start_hosts(args, project_root) if args.verify else {}
+
+    try:
+        log(f"Generating {args.files} files in {project_root / 'dist'}...")
+        gen_start = time.perf_counter()
+        total_bytes = generate_dist(project_root / 'dist', args.files, args.seed,
+                                    args.median_size, args.sigma)
+        log(f"Generated {total_bytes / 1024 / 1024:.1f} MiB in {time.perf_counter() - gen_start:.1f}s")
+
+        install_fake_clis(scratch / 'bin')
+        pages_repo = scratch / 'pages.git'
+        subprocess.run(['git', 'init', '-q', '--bare', str(pages_repo)], check=True)
+        configure_env(args, services, scratch / 'bin', cli_log, pages_repo)
+
+        # Imported late: these read their configuration from the environment
+        import multi_deploy
+        import dns_manager
+        dns_manager.CACHE_FILE = str(project_root / '.deploy-cache' / 'dns.json')
+
+        deployer = multi_deploy.Deployer(project_root)
+        if not deployer.preflight():
+            raise SystemExit("preflight failed")
+
+        runs = []
+        changed = 0
+        for run in range(1, args.runs + 1):
+            if run > 1 and args.mutate:
+                changed = mutate_dist(project_root / 'dist', args.mutate, args.seed + run)
+            log(f"Run {run}/{args.runs}...")
+            runs.append(bench_run(multi_deploy, deployer, args, run, total_bytes, changed, services,
+                                  cli_log, hosts))
+
+        print_report(runs)
+        if args.api_rate_limit:
+            log("429 answers: " + ", ".join(f"{key} {service.throttled}" for key, service in services.items()))
+        if args.json:
+            args.json.write_text(json.dumps({
+                'args': {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+                'runs': [asdict(r) for r in runs],
+                'api_requests': {key: dict(service.requests) for key, service in services.items()},
+                'api_throttled': {key: service.throttled for key, service in services.items()},
+            }, indent=2))
+            log(f"Wrote {args.json}")
+        if not all(p.success for r in runs for p in r.platforms):
+            sys.exit(1)
+    finally:
+        for service in list(services.values()) + list(hosts.values()):
+            service.stop()
+        if args.keep:
+            log(f"Kept {scratch}")
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Office OS - Build Cache
+Fingerprints the build inputs so an unchanged tree can reuse the last dist/,
+and the lockfile so an unchanged node_modules/ skips `npm ci`.
+
+The build fingerprint covers the content of every build input, the Node/npm
+versions and the environment variables Vite bakes into the bundle. It is
+stored next to dist/ and only written after a successful build. The
+dependency fingerprint lives inside node_modules/ so deleting the folder
+also invalidates it.
+"""
+import os
+import json
+import hashlib
+import functools
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional
+
+from dist_scan import sha1_file
+
+# Paths (relative to the project root) that affect `npm run build`
+BUILD_INPUTS = [
+    'src',
+    'public',
+    'index.html',
+    'vite.config.ts',
+    'tsconfig.json',
+    'package.json',
+    'package-lock.json',
+    # Vite inlines VITE_* values from these (production mode); optional
+    '.env',
+    '.env.local',
+    '.env.production',
+    '.env.production.local',
+]
+
+FINGERPRINT_FILE = '.dist-fingerprint.json'
+DEPS_FINGERPRINT_FILE = 'node_modules/.deps-fingerprint.json'
+
+
+@functools.lru_cache(maxsize=None)
+def toolchain_versions() -> Dict[str, str]:
+    """Return the installed Node and npm versions (empty if unavailable)."""
+    versions = {}
+    for tool in ('node', 'npm'):
+        try:
+            result = subprocess.run(
+                f"{tool} --version", shell=True,
+                capture_output=True, text=True, timeout=30
+            )
+            versions[tool] = result.stdout.strip() if result.returncode == 0 else ''
+        except (subprocess.TimeoutExpired, OSError):
+            versions[tool] = ''
+    return versions
+
+
+def build_fingerprint(project_root: Path) -> str:
+    """Hash every build input, the toolchain and the build environment."""
+    digest = hashlib.sha256()
+    for entry in BUILD_INPUTS:
+        path = project_root / entry
+        files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+        for file_path in files:
+            if not file_path.exists():
+                continue
+            relative = file_path.relative_to(project_root).as_posix()
+            digest.update(f"{relative}\0{sha1_file(file_path)}\n".encode())
+
+    build_env = {
+        key: value for key, value in os.environ.items()
+        if key.startswith('VITE_') or key == 'NODE_ENV'
+    }
+    digest.update(json.dumps(toolchain_versions(), sort_keys=True).encode())
+    digest.update(json.dumps(build_env, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def load_fingerprint(project_root: Path) -> Optional[str]:
+    """Return the fingerprint of the last successful build, if any."""
+    try:
+        data = json.loads((project_root / FINGERPRINT_FILE).read_text())
+        return data.get('fingerprint')
+    except (OSError, ValueError):
+        return None
+
+
+def save_fingerprint(project_root: Path, fingerprint: str):
+    """Record the fingerprint of a successful build."""
+    data = {'fingerprint': fingerprint, 'toolchain': toolchain_versions()}
+    (project_root / FINGERPRINT_FILE).write_text(json.dumps(data, indent=2))
+
+
+def clear_fingerprint(project_root: Path):
+    """Forget the cached build (call before dist/ is rewritten)."""
+    (project_root / FINGERPRINT_FILE).unlink(missing_ok=True)
+
+
+def is_build_current(project_root: Path, fingerprint: str) -> bool:
+    """True when dist/ was produced from exactly these inputs."""
+    dist_dir = project_root / 'dist'
+    return (dist_dir / 'index.html').exists() and load_fingerprint(project_root) == fingerprint
+
+
+# ============================================================================
+# Dependencies
+# ============================================================================
+
+def _lockfile(project_root: Path) -> Path:
+    lockfile = project_root / 'package-lock.json'
+    return lockfile if lockfile.exists() else project_root / 'package.json'
+
+
+def deps_fingerprint(project_root: Path) -> str:
+    """Hash the lockfile together with the Node/npm versions."""
+    digest = hashlib.sha256()
+    digest.update(sha1_file(_lockfile(project_root)).encode())
+    digest.update(json.dumps(toolchain_versions(), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def deps_up_to_date(project_root: Path) -> bool:
+    """True when node_modules/ was installed from the current lockfile."""
+    try:
+        data = json.loads((project_root / DEPS_FINGERPRINT_FILE).read_text())
+    except (OSError, ValueError):
+        return False
+    return data.get('fingerprint') == deps_fingerprint(project_root)
+
+
+def save_deps_fingerprint(project_root: Path):
+    """Record that node_modules/ matches the current lockfile."""
+    data = {'fingerprint': deps_fingerprint(project_root), 'toolchain': toolchain_versions()}
+    (project_root / DEPS_FINGERPRINT_FILE).write_text(json.dumps(data, indent=2))
+
+
+def install_command(project_root: Path) -> str:
+    """Clean, reproducible install when a lockfile exists."""
+    return "npm ci" if (project_root / 'package-lock.json').exists() else "npm install"
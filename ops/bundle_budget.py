@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Office OS - Bundle Budgets
+Measures what each route downloads on first load and checks it against a
+pinned baseline and any explicit budgets.
+
+The Vite build manifest (dist/.vite/manifest.json, `build.manifest: true`)
+maps every source module to its output chunk with its static imports and
+CSS. Routes are read from src/core/routes.ts, where each route lazy-loads
+one module. A route's first load is the entry chunk (index.html) plus the
+route module, each with every static import and stylesheet, de-duplicated.
+Sizes are gzip -9 bytes, which is close to what every host here sends.
+
+The baseline, ops/bundle-baseline.json, is a report of a real build that
+is committed with the code (`--pin`). Each entry, route and named chunk may
+grow by the headroom in ops/bundle-budgets.json before the deploy is
+blocked; the same file can set absolute limits in KiB, which take
+precedence. Growth is always measured against the pinned numbers, so small
+steps cannot add up unnoticed.
+
+The report of the last successful deploy is kept in
+.deploy-cache/bundle-report.json. It feeds the change column and, until a
+baseline is pinned, stands in for it: a deploy that grows past the last
+deployed sizes plus the headroom is blocked. Only the very first deploy,
+with neither, goes unchecked.
+
+Usage:
+    python ops/bundle_budget.py         # report and check dist/
+    python ops/bundle_budget.py --pin   # make this build the pinned baseline
+"""
+import re
+import sys
+import gzip
+import json
+import argparse
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+MANIFEST_FILE = '.vite/manifest.json'
+ROUTES_FILE = 'src/core/routes.ts'
+BUDGETS_FILE = Path(__file__).parent / 'bundle-budgets.json'
+BASELINE_FILE = Path(__file__).parent / 'bundle-baseline.json'
+REPORT_FILE = '.deploy-cache/bundle-report.json'
+
+ENTRY_KEY = 'index.html'
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.mjs', '/index.ts', '/index.js')
+
+# `path: '...'` followed by the route's `import('...')`, before the next path
+ROUTE_PATTERN = re.compile(r"path:\s*'([^']+)'(?:(?!path:).)*?import\(\s*'([^']+)'\s*\)", re.DOTALL)
+
+
+@dataclass
+class Violation:
+    """A size over its explicit budget, or over the baseline (or last deploy) plus headroom."""
+    kind: str  # 'budget', 'baseline' or 'previous'
+    scope: str  # 'entry', 'route' or 'chunk'
+    name: str
+    size: int
+    limit: int
+
+    def describe(self) -> str:
+        what = {'budget': 'budget', 'baseline': 'pinned baseline + headroom',
+                'previous': 'last deployed + headroom'}[self.kind]
+        return (f"{self.scope} {self.name}: {self.size / 1024:.1f} KiB "
+                f"(over {what} {self.limit / 1024:.1f} KiB)")
+
+
+@dataclass
+class BundleReport:
+    """Compressed first-load bytes per route and bytes per named chunk."""
+    entry: int = 0
+    routes: Dict[str, int] = field(default_factory=dict)
+    chunks: Dict[str, int] = field(default_factory=dict)
+    unresolved: List[str] = field(default_factory=list)
+
+    def to_json(self) -> dict:
+        return {'entry': self.entry, 'routes': self.routes, 'chunks': self.chunks}
+
+
+def load_manifest(dist_dir: Path) -> Dict[str, dict]:
+    return json.loads((dist_dir / MANIFEST_FILE).read_text())
+
+
+def parse_routes(project_root: Path) -> Dict[str, str]:
+    """{route path: source module (project-relative, no extension)}."""
+    routes_file = project_root / ROUTES_FILE
+    base = routes_file.parent
+    routes = {}
+    for path, module in ROUTE_PATTERN.findall(routes_file.read_text()):
+        resolved = (base / module).resolve().relative_to(project_root.resolve())
+        routes[path] = resolved.as_posix()
+    return routes
+
+
+def manifest_key(manifest: Dict[str, dict], module: str) -> Optional[str]:
+    """The manifest entry for a source module written without an extension."""
+    for extension in ('',) + SOURCE_EXTENSIONS:
+        if module + extension in manifest:
+            return module + extension
+    return None
+
+
+def static_closure(manifest: Dict[str, dict], key: str) -> Set[str]:
+    """Output files loaded with a chunk: its static imports and their CSS."""
+    files = set()
+    seen = set()
+    pending = [key]
+    while pending:
+        current = pending.pop()
+        if current in seen or current not in manifest:
+            continue
+        seen.add(current)
+        chunk = manifest[current]
+        files.add(chunk['file'])
+        files.update(chunk.get('css', []))
+        pending.extend(chunk.get('imports', []))
+    return files
+
+
+class SizeCache:
+    """gzip -9 size per output file, computed once."""
+
+    def __init__(self, dist_dir: Path):
+        self.dist_dir = dist_dir
+        self.sizes: Dict[str, int] = {}
+
+    def __call__(self, relative: str) -> int:
+        if relative not in self.sizes:
+            data = (self.dist_dir / relative).read_bytes()
+            self.sizes[relative] = len(gzip.compress(data, compresslevel=9, mtime=0))
+        return self.sizes[relative]
+
+    def total(self, files: Set[str]) -> int:
+        return sum(self(relative) for relative in files)
+
+
+def analyze(project_root: Path, dist_dir: Path) -> BundleReport:
+    """Measure the entry, every route's first load and every named chunk."""
+    manifest = load_manifest(dist_dir)
+    size = SizeCache(dist_dir)
+    report = BundleReport()
+
+    entry = static_closure(manifest, ENTRY_KEY)
+    report.entry = size.total(entry)
+
+    for path, module in parse_routes(project_root).items():
+        key = manifest_key(manifest, module)
+        if key is None:
+            report.unresolved.append(path)
+            continue
+        report.routes[path] = size.total(entry | static_closure(manifest, key))
+
+    # Manual chunks (pdfjs, tensorflow, ...) and shared chunks carry a name
+    for key, chunk in manifest.items():
+        name = chunk.get('name')
+        if name and not chunk.get('isEntry') and not chunk.get('isDynamicEntry'):
+            report.chunks[name] = report.chunks.get(name, 0) + size(chunk['file'])
+    return report
+
+
+# ============================================================================
+# Budgets and baseline
+# ============================================================================
+
+def _load_json(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def load_budgets(path: Path = BUDGETS_FILE) -> dict:
+    return _load_json(path) or {}
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> Optional[dict]:
+    return _load_json(path)
+
+
+def pin_baseline(report: BundleReport, path: Path = BASELINE_FILE):
+    path.write_text(json.dumps(report.to_json(), indent=2, sort_keys=True) + '\n')
+
+
+def load_previous(project_root: Path) -> Optional[dict]:
+    return _load_json(project_root / REPORT_FILE)
+
+
+def save_report(project_root: Path, report: BundleReport):
+    """Remember the report of a build that was deployed successfully."""
+    path = project_root / REPORT_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report.to_json(), indent=2, sort_keys=True))
+
+
+def check(report: BundleReport, budgets: dict, baseline: Optional[dict],
+          previous: Optional[dict] = None) -> List[Violation]:
+    """Sizes over their explicit budget, or else over the reference sizes plus headroom.
+
+    The reference is the pinned baseline, or the last deployed report when
+    nothing is pinned.
+    """
+    violations = []
+    reference_kind = 'baseline' if baseline else 'previous'
+    baseline = baseline or previous or {}
+    headroom = budgets.get('headroom', {})
+    ratio = headroom.get('ratio', 0.10)
+    min_bytes = headroom.get('min_bytes', 2048)
+
+    def limit(budget_kib: Optional[float], pinned: Optional[int]):
+        if budget_kib is not None:
+            return 'budget', int(budget_kib * 1024)
+        if pinned:
+            return reference_kind, int(pinned + max(pinned * ratio, min_bytes))
+        return None, None  # new since the reference, and no budget
+
+    def measure(scope: str, name: str, size: int, budget_kib: Optional[float], pinned: Optional[int]):
+        kind, allowed = limit(budget_kib, pinned)
+        if kind and size > allowed:
+            violations.append(Violation(kind, scope, name, size, allowed))
+
+    measure('entry', ENTRY_KEY, report.entry, budgets.get('entry'), baseline.get('entry'))
+    route_budgets = budgets.get('routes', {})
+    for path, size in report.routes.items():
+        measure('route', path, size, route_budgets.get(path, route_budgets.get('default')),
+                baseline.get('routes', {}).get(path))
+    chunk_budgets = budgets.get('chunks', {})
+    for name, size in report.chunks.items():
+        measure('chunk', name, size, chunk_budgets.get(name), baseline.get('chunks', {}).get(name))
+    return violations
+
+
+def enforced(budgets: dict, baseline: Optional[dict], previous: Optional[dict] = None) -> bool:
+    """Whether there is anything to check against."""
+    return bool(baseline or previous or budgets.get('entry') or budgets.get('routes')
+                or budgets.get('chunks'))
+
+
+def print_report(report: BundleReport, previous: Optional[dict], top: int = 15):
+    """Plain-text summary: heaviest routes and all named chunks."""
+    def delta(size: int, before: Optional[int]) -> str:
+        if not before:
+            return ''
+        change = size - before
+        return f" ({'+' if change >= 0 else ''}{change / 1024:.1f})"
+
+    previous = previous or {}
+    print(f"📦 Entry: {report.entry / 1024:.1f} KiB gzip{delta(report.entry, previous.get('entry'))}")
+    print(f"   Heaviest routes (first load, KiB gzip):")
+    for path, size in sorted(report.routes.items(), key=lambda item: -item[1])[:top]:
+        print(f"   {size / 1024:>9.1f}{delta(size, previous.get('routes', {}).get(path)):<10} {path}")
+    if report.chunks:
+        print(f"   Chunks (KiB gzip):")
+        for name, size in sorted(report.chunks.items(), key=lambda item: -item[1]):
+            print(f"   {size / 1024:>9.1f}{delta(size, previous.get('chunks', {}).get(name)):<10} {name}")
+    if report.unresolved:
+        print(f"⚠️  Routes not found in the manifest: {', '.join(report.unresolved)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Office OS bundle budgets")
+    parser.add_argument('--pin', action='store_true',
+                        help=f"write this build's sizes to {BASELINE_FILE.name} as the new baseline")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).parent.parent.absolute()
+    dist_dir = project_root / 'dist'
+    if not (dist_dir / MANIFEST_FILE).exists():
+        print(f"❌ {MANIFEST_FILE} not found in dist/. Build with build.manifest enabled.")
+        sys.exit(1)
+
+    report = analyze(project_root, dist_dir)
+    previous = load_previous(project_root)
+    print_report(report, previous)
+    budgets, baseline = load_budgets(), load_baseline()
+    if args.pin:
+        pin_baseline(report)
+        print(f"✅ Pinned as the new baseline in {BASELINE_FILE.name}; commit it with the change.")
+        return
+    if not enforced(budgets, baseline, previous):
+        print(f"⚠️  No {BASELINE_FILE.name}, budgets or deployed report; run with --pin after a release build.")
+    elif not baseline:
+        print(f"ℹ️  No {BASELINE_FILE.name}; checking against the last deployed sizes.")
+    violations = check(report, budgets, baseline, previous)
+    for violation in violations:
+        print(f"❌ {violation.describe()}")
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Office OS - Cache Headers
+Generates per-platform caching rules from the built dist/.
+
+Content-hashed Vite assets (`assets/name-[hash].ext`) get a year-long immutable
+Cache-Control, HTML gets revalidated on every load. Rules are written in each
+host's native format:
+
+- `_headers`    Cloudflare Pages and Netlify
+- `vercel.json` Vercel
+
+Surge, Neocities, GitHub Pages and Render do not read per-deploy header
+files, so nothing is generated for them. Nothing is written into dist/;
+the files are overlaid onto each platform's staging view.
+"""
+import re
+import json
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from dist_scan import scan_dist, PRECOMPRESSED_SUFFIXES
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+
+# Vite's default `[name]-[hash].[ext]` with an 8 character base64url hash
+HASHED_NAME = re.compile(r'-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+
+ASSETS_DIR = 'assets'
+
+# Which native file each platform reads, keyed like PLATFORMS in multi_deploy
+PLATFORM_FORMATS = {
+    'cloudflare': '_headers',
+    'netlify': '_headers',
+    'vercel': 'vercel.json',
+}
+GENERATED_FILES = tuple(sorted(set(PLATFORM_FORMATS.values())))
+
+
+@dataclass
+class CacheRules:
+    """Classified dist paths (URL paths, leading slash)."""
+    hashed: List[str] = field(default_factory=list)
+    html: List[str] = field(default_factory=list)
+    # True when every file under /assets is hashed so one wildcard is safe
+    assets_all_hashed: bool = True
+
+
+def is_hashed(relative: str) -> bool:
+    """True for content-hashed build output (ignoring .gz/.br siblings)."""
+    name = relative.rsplit('/', 1)[-1]
+    for suffix in PRECOMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return bool(HASHED_NAME.search(name))
+
+
+def classify(dist_dir: Path) -> CacheRules:
+    """Sort dist files into immutable assets and HTML documents."""
+    rules = CacheRules()
+    files = scan_dist(dist_dir, PRECOMPRESSED_SUFFIXES)
+    for relative in files:
+        if relative in GENERATED_FILES:
+            continue
+        url = f"/{relative}"
+        if relative.endswith('.html'):
+            rules.html.append(url)
+            if relative == 'index.html':
+                rules.html.insert(0, '/')
+        elif relative.startswith(f"{ASSETS_DIR}/"):
+            # public/ files are copied verbatim to the root, never hashed
+            if is_hashed(relative):
+                rules.hashed.append(url)
+            else:
+                rules.assets_all_hashed = False
+    return rules
+
+
+def _immutable_paths(rules: CacheRules) -> List[str]:
+    if rules.assets_all_hashed and rules.hashed:
+        return [f"/{ASSETS_DIR}/*"]
+    return list(rules.hashed)
+
+
+def render_headers_file(rules: CacheRules) -> str:
+    """Render a Netlify / Cloudflare Pages `_headers` file."""
+    blocks = [f"{path}\n  Cache-Control: {IMMUTABLE}" for path in _immutable_paths(rules)]
+    blocks += [f"{path}\n  Cache-Control: {REVALIDATE}" for path in rules.html]
+    return "\n\n".join(blocks) + "\n"
+
+
+def render_vercel_json(rules: CacheRules) -> str:
+    """Render a `vercel.json` with the equivalent header rules."""
+    def rule(source: str, value: str) -> dict:
+        return {'source': source, 'headers': [{'key': 'Cache-Control', 'value': value}]}
+
+    headers = []
+    for path in _immutable_paths(rules):
+        source = path[:-1] + '(.*)' if path.endswith('/*') else path
+        headers.append(rule(source, IMMUTABLE))
+    headers += [rule(path, REVALIDATE) for path in rules.html]
+    return json.dumps({'headers': headers}, indent=2) + "\n"
+
+
+RENDERERS = {
+    '_headers': render_headers_file,
+    'vercel.json': render_vercel_json,
+}
+
+
+def render_cache_headers(dist_dir: Path, platforms: List[str]) -> Tuple[CacheRules, Dict[str, Dict[str, str]]]:
+    """Render the header file each platform needs, as {platform: {filename: content}}.
+
+    The files are not written into dist/; staging.py overlays them onto
+    each platform's own view.
+    """
+    rules = classify(dist_dir)
+    rendered = {}
+    files = {}
+    for platform in platforms:
+        filename = PLATFORM_FORMATS.get(platform)
+        if filename:
+            if filename not in rendered:
+                rendered[filename] = RENDERERS[filename](rules)
+            files[platform] = {filename: rendered[filename]}
+    return rules, files
@@ -0,0 +1,283 @@
+"""
+Office OS - Cloudflare Pages Direct Upload
+Deploys dist/ to Cloudflare Pages through the direct upload API, without
+wrangler.
+
+Assets are hashed the way wrangler hashes them (BLAKE3 of the base64 content
+plus the file extension), so both clients share Cloudflare's asset store.
+The API is asked which hashes it is missing and only those are uploaded, in
+size-bounded buckets sent in parallel and base64-encoded as they stream
+from disk. The deployment is then created from
+the full path -> hash manifest. Unchanged vendor chunks cost one hash check.
+
+Requires the optional `blake3` package; without it callers fall back to
+wrangler. Point CLOUDFLARE_API_BASE at a local server to test.
+"""
+import os
+import time
+import json
+import base64
+import requests
+import mimetypes
+import threading
+import concurrent.futures
+from contextlib import ExitStack
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from dist_scan import scan_dist, hash_files, PRECOMPRESSED_SUFFIXES
+from cache_headers import GENERATED_FILES, PLATFORM_FORMATS
+import streaming
+from http_client import HttpClient, upload_budget
+
+try:
+    from blake3 import blake3
+    HAS_BLAKE3 = True
+except ImportError:
+    HAS_BLAKE3 = False
+
+API_BASE = os.getenv('CLOUDFLARE_API_BASE', 'https://api.cloudflare.com/client/v4')
+UPLOAD_WORKERS = int(os.getenv('CF_PAGES_UPLOAD_WORKERS', '3'))
+
+# Bucket limits, measured on the base64-encoded payload
+BUCKET_MAX_FILES = int(os.getenv('CF_PAGES_BUCKET_FILES', '2000'))
+BUCKET_MAX_BYTES = 40 * 1024 * 1024
+MAX_FILE_SIZE = 25 * 1024 * 1024  # Pages rejects larger assets
+
+# Sent as parts of the deployment itself rather than as assets
+SPECIAL_FILES = ('_headers', '_redirects', '_routes.json', '_worker.js')
+
+# Cloudflare compresses on its own edge; other hosts' header files are noise
+EXCLUDE_PATHS = SPECIAL_FILES + tuple(
+    name for name in GENERATED_FILES if name != PLATFORM_FORMATS['cloudflare']
+)
+
+
+class CloudflarePagesError(Exception):
+    """Raised when the Pages API rejects a request."""
+
+
+@dataclass
+class PagesDeployResult:
+    """Outcome of a direct upload."""
+    deployment_id: Optional[str] = None
+    url: Optional[str] = None
+    uploaded: int = 0
+    unchanged: int = 0
+    bytes_uploaded: int = 0
+    duration: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.uploaded / self.duration if self.duration else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes_uploaded / self.duration if self.duration else 0.0
+
+
+def native_available() -> bool:
+    """True when direct upload can be used instead of wrangler."""
+    return HAS_BLAKE3 and bool(os.getenv('CLOUDFLARE_API_TOKEN')) and bool(os.getenv('CLOUDFLARE_ACCOUNT_ID'))
+
+
+def asset_hash(file_path: Path) -> str:
+    """wrangler's asset key: BLAKE3(base64(content) + extension), 32 hex chars."""
+    hasher = blake3()
+    with open(file_path, 'rb') as f:
+        # Chunks are a multiple of 3 bytes, so their encodings concatenate
+        for chunk in iter(lambda: f.read(streaming.CHUNK_SIZE), b''):
+            hasher.update(base64.b64encode(chunk))
+    hasher.update(file_path.suffix.lstrip('.').encode())
+    return hasher.hexdigest()[:32]
+
+
+def hash_assets(files: Dict[str, Path], workers: int = 8,
+                cache: Optional[Dict[str, tuple]] = None) -> Dict[str, str]:
+    """Return {relative path: asset hash}."""
+    return hash_files(files, asset_hash, workers, cache)
+
+
+def encoded_size(file_path: Path) -> int:
+    return streaming.encoded_length(file_path.stat().st_size)
+
+
+def make_buckets(files: Dict[str, Path], max_files: int = BUCKET_MAX_FILES,
+                 max_bytes: int = BUCKET_MAX_BYTES) -> List[Dict[str, Path]]:
+    """Group {hash: path} into upload buckets bounded by count and encoded size.
+
+    Largest files first, so big assets do not all land in the last bucket.
+    """
+    buckets = []
+    bucket, bucket_bytes = {}, 0
+    for key, file_path in sorted(files.items(), key=lambda item: -item[1].stat().st_size):
+        size = encoded_size(file_path)
+        if bucket and (len(bucket) >= max_files or bucket_bytes + size > max_bytes):
+            buckets.append(bucket)
+            bucket, bucket_bytes = {}, 0
+        bucket[key] = file_path
+        bucket_bytes += size
+    if bucket:
+        buckets.append(bucket)
+    return buckets
+
+
+class PagesClient:
+    """Minimal client for the Pages direct upload API."""
+
+    def __init__(self, api_token: str, account_id: str, project: str, api_base: str = API_BASE,
+                 timeout: Tuple[int, int] = (10, 300), workers: int = UPLOAD_WORKERS):
+        self.api_base = api_base.rstrip('/')
+        self.project_url = f"{self.api_base}/accounts/{account_id}/pages/projects/{project}"
+        self.timeout = timeout
+        self.workers = workers
+        self.api_token = api_token
+        # One keep-alive pool shared by all upload threads
+        self.http = HttpClient(pool_size=workers)
+        self._jwt = None
+        self._jwt_lock = threading.Lock()
+        # Asset hashes by file stat, reused while the client stays alive
+        self.hash_cache: Dict[str, tuple] = {}
+
+    def _check(self, response: requests.Response):
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        if response.status_code not in (200, 201) or not payload.get('success'):
+            errors = payload.get('errors') or [{'message': response.text}]
+            message = '; '.join(str(e.get('message', e)) for e in errors)
+            raise CloudflarePagesError(f"HTTP {response.status_code}: {message}")
+        return payload.get('result')
+
+    def upload_token(self, refresh: bool = False) -> str:
+        """Short-lived JWT that authorizes the asset endpoints."""
+        with self._jwt_lock:
+            if self._jwt is None or refresh:
+                response = self.http.get(
+                    f"{self.project_url}/upload-token",
+                    headers={'Authorization': f"Bearer {self.api_token}"},
+                    timeout=self.timeout
+                )
+                self._jwt = self._check(response)['jwt']
+            return self._jwt
+
+    def _assets_post(self, endpoint: str, payload) -> object:
+        """POST to an asset endpoint, renewing the JWT once if it expired.
+
+        `payload` is JSON-serializable or a streaming.StreamBody.
+        """
+        for refresh in (False, True):
+            headers = {'Authorization': f"Bearer {self.upload_token(refresh)}"}
+            if isinstance(payload, streaming.StreamBody):
+                payload.seek(0)
+                body = {'data': payload}
+                headers['Content-Type'] = payload.content_type
+            else:
+                body = {'json': payload}
+            # Asset endpoints are keyed by content hash, so repeating is harmless
+            response = self.http.post(
+                f"{self.api_base}/pages/assets/{endpoint}",
+                headers=headers,
+                timeout=self.timeout,
+                idempotent=True,
+                **body
+            )
+            if response.status_code != 401:
+                break
+        return self._check(response)
+
+    def check_missing(self, hashes: List[str]) -> List[str]:
+        return self._assets_post('check-missing', {'hashes': hashes}) or []
+
+    def upload_bucket(self, bucket: Dict[str, Path]) -> int:
+        """Upload {hash: path} in one request, encoded while it is sent. Returns the raw bytes."""
+        entries = [
+            ({'key': key,
+              'metadata': {'contentType': mimetypes.guess_type(file_path.name)[0]
+                           or 'application/octet-stream'},
+              'base64': True}, file_path)
+            for key, file_path in bucket.items()
+        ]
+        with streaming.base64_json_body(entries) as body, upload_budget.reserve(len(body)):
+            self._assets_post('upload', body)
+        return sum(file_path.stat().st_size for file_path in bucket.values())
+
+    def upsert_hashes(self, hashes: List[str]):
+        """Mark every asset of the deployment as recently used."""
+        self._assets_post('upsert-hashes', {'hashes': hashes})
+
+    def create_deployment(self, manifest: Dict[str, str], branch: str,
+                          special: Dict[str, Path], commit_message: Optional[str] = None) -> dict:
+        """Create the deployment from the path -> hash manifest."""
+        with ExitStack() as stack:
+            parts = {
+                'manifest': (None, json.dumps(manifest)),
+                'branch': (None, branch),
+                'commit_dirty': (None, 'true'),
+            }
+            if commit_message:
+                parts['commit_message'] = (None, commit_message)
+            for name, file_path in special.items():
+                parts[name] = (name, stack.enter_context(open(file_path, 'rb')))
+            response = self.http.post(
+                f"{self.project_url}/deployments",
+                files=parts,
+                headers={'Authorization': f"Bearer {self.api_token}"},
+                timeout=self.timeout
+            )
+        return self._check(response)
+
+
+def deploy(client: PagesClient, dist_dir: Path, branch: str,
+           cancel: Optional[threading.Event] = None) -> PagesDeployResult:
+    """Upload the assets Cloudflare is missing and create a deployment.
+
+    Setting `cancel` stops any bucket that has not started yet; a deploy
+    cancelled before its deployment was created raises CloudflarePagesError.
+    """
+    files = scan_dist(dist_dir, PRECOMPRESSED_SUFFIXES, EXCLUDE_PATHS)
+    too_large = [relative for relative, path in files.items() if path.stat().st_size > MAX_FILE_SIZE]
+    if too_large:
+        raise CloudflarePagesError(f"assets over {MAX_FILE_SIZE // (1024 * 1024)} MiB: {too_large[:3]}")
+
+    hashes = hash_assets(files, cache=client.hash_cache)
+    unique = {key: files[relative] for relative, key in hashes.items()}
+    missing = set(client.check_missing(sorted(unique)))
+
+    # Per path: files with identical content share one hash
+    result = PagesDeployResult(unchanged=sum(1 for key in hashes.values() if key not in missing))
+    buckets = make_buckets({key: path for key, path in unique.items() if key in missing})
+    start = time.time()
+
+    def upload(bucket: Dict[str, Path]) -> int:
+        if cancel is not None and cancel.is_set():
+            raise CloudflarePagesError("deploy cancelled")
+        return client.upload_bucket(bucket)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=client.workers) as executor:
+        futures = {executor.submit(upload, bucket): bucket for bucket in buckets}
+        for future in concurrent.futures.as_completed(futures):
+            bucket = futures[future]
+            try:
+                result.bytes_uploaded += future.result()
+                result.uploaded += len(bucket)
+            except (CloudflarePagesError, requests.RequestException, OSError) as e:
+                result.errors.append(f"{len(bucket)} assets: {e}")
+    result.duration = time.time() - start
+
+    if result.errors:
+        return result
+    if cancel is not None and cancel.is_set():
+        raise CloudflarePagesError("deploy cancelled")
+
+    client.upsert_hashes(sorted(unique))
+    special = {name: dist_dir / name for name in SPECIAL_FILES if (dist_dir / name).is_file()}
+    deployment = client.create_deployment(
+        {f"/{relative}": key for relative, key in hashes.items()}, branch, special
+    )
+    result.deployment_id = deployment.get('id')
+    result.url = deployment.get('url')
+    return result
@@ -4,6 +4,9 @@ import sys
 import shutil
 from pathlib import Path
 
+import build_cache
+import cloudflare_pages
+
 # Try to load .env, but don't fail if missing (wrangler might have its own auth)
 try:
     from dotenv import load_dotenv
@@ -42,9 +45,13 @@ def main():
 
     print("🚀 Starting Office OS Deployment...")
 
-    # 1. Install Dependencies
-    print("\n📦 Installing Node dependencies...")
-    run_command("npm install", cwd=project_root)
+    # 1. Install Dependencies (only when the lockfile or toolchain changed)
+    if build_cache.deps_up_to_date(project_root):
+        print("\n📦 Node dependencies up to date, skipping install.")
+    else:
+        print("\n📦 Installing Node dependencies...")
+        run_command(build_cache.install_command(project_root), cwd=project_root)
+        build_cache.save_deps_fingerprint(project_root)
 
     # 2. Build Project
     print("\n🛠️  Building project...")
@@ -54,15 +61,32 @@ def main():
         print(f"❌ Build failed. Directory not found: {dist_dir}")
         sys.exit(1)
 
-    # 3. Check Wrangler
-    check_wrangler()
-
-    # 4. Deploy to Cloudflare Pages
     project_name = os.getenv("CF_PAGES_PROJECT", "office-os")
     branch = os.getenv("CF_PAGES_BRANCH", "main")
 
     print(f"\n☁️  Deploying to Cloudflare Pages ({project_name})...")
 
+    # 3. Direct upload when possible: only assets Cloudflare lacks are sent
+    if cloudflare_pages.native_available():
+        client = cloudflare_pages.PagesClient(
+            os.getenv("CLOUDFLARE_API_TOKEN"), os.getenv("CLOUDFLARE_ACCOUNT_ID"), project_name
+        )
+        try:
+            result = cloudflare_pages.deploy(client, dist_dir, branch)
+        except Exception as e:
+            print(f"❌ Direct upload failed: {e}")
+            sys.exit(1)
+        if result.errors:
+            print(f"❌ Direct upload failed: {result.errors[:3]}")
+            sys.exit(1)
+        print(f"   {result.uploaded} uploaded, {result.unchanged} unchanged")
+        print(f"   {result.url}")
+        print("\n✅ Deployment Complete!")
+        return
+
+    # 4. Otherwise fall back to wrangler
+    check_wrangler()
+
     # Construct deployment command
     # Uses CLOUDFLARE_ACCOUNT_ID and CLOUDFLARE_API_TOKEN from env implicitly if set
     deploy_cmd = f"wrangler pages deploy dist --project-name={project_name} --branch={branch} --commit-dirty=true"
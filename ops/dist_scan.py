@@ -0,0 +1,71 @@
+"""
+Office OS - Dist Scanner
+Walks the build output and fingerprints files for incremental deploys.
+"""
+import hashlib
+import concurrent.futures
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB read buffer
+
+# Siblings written by precompress.py
+PRECOMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+def sha1_file(path: Path) -> str:
+    """Return the hex SHA1 of a file, read in fixed-size chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_dist(dist_dir: Path, exclude_suffixes: Tuple[str, ...] = (),
+              exclude_paths: Tuple[str, ...] = ()) -> Dict[str, Path]:
+    """Map every file under dist to its POSIX-style relative path."""
+    files = {}
+    for file_path in sorted(dist_dir.rglob('*')):
+        if file_path.is_file() and not file_path.name.endswith(exclude_suffixes):
+            relative = file_path.relative_to(dist_dir).as_posix()
+            if relative not in exclude_paths:
+                files[relative] = file_path
+    return files
+
+
+def hash_files(files: Dict[str, Path], hasher: Callable[[Path], str] = sha1_file,
+               workers: int = 8, cache: Optional[Dict[str, tuple]] = None) -> Dict[str, str]:
+    """Return {relative path: hash} using `hasher`, in parallel.
+
+    With a `cache` ({relative: (inode, mtime_ns, size, hash)}, kept by the
+    caller between calls), files whose stat is unchanged are not read again.
+    """
+    hashes = {}
+    pending = {}
+    stats = {}
+    for relative, path in files.items():
+        if cache is not None:
+            st = path.stat()
+            stats[relative] = (st.st_ino, st.st_mtime_ns, st.st_size)
+            entry = cache.get(relative)
+            if entry is not None and entry[:3] == stats[relative]:
+                hashes[relative] = entry[3]
+                continue
+        pending[relative] = path
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        hashes.update(zip(pending.keys(), executor.map(hasher, pending.values())))
+
+    if cache is not None:
+        cache.clear()
+        cache.update({relative: stats[relative] + (hashes[relative],) for relative in files})
+    return {relative: hashes[relative] for relative in files}
+
+
+def hash_dist(dist_dir: Path, exclude_suffixes: Tuple[str, ...] = (),
+              exclude_paths: Tuple[str, ...] = (), workers: int = 8,
+              cache: Optional[Dict[str, tuple]] = None) -> Dict[str, str]:
+    """Return {relative path: sha1} for every file under dist."""
+    files = scan_dist(dist_dir, exclude_suffixes, exclude_paths)
+    return hash_files(files, sha1_file, workers, cache)
@@ -2,9 +2,30 @@
 Office OS - DNS Manager
 Manages CNAME records for subdomains pointing to the main deployment.
 Supports both API Token and Global API Key authentication.
+
+The full record set is paged through once over the shared, rate-limited
+HTTP client (http_client), the change set against SUBDOMAINS is computed
+locally and applied with Cloudflare's batch DNS endpoint (falling back to
+bounded concurrent requests). Point CLOUDFLARE_API_BASE at a local server
+to test.
+
+Usage:
+    python ops/dns_manager.py plan     # show the changes, apply nothing
+    python ops/dns_manager.py apply    # apply them (default)
+
+Zone IDs are cached in .deploy-cache/dns.json. Records are not: the zone
+is listed afresh before every reconcile, since changes made elsewhere (the
+dashboard, another deploy) must not be overwritten from a stale copy.
 """
 import os
-import requests
+import json
+import time
+import argparse
+import concurrent.futures
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from http_client import HttpClient
 
 try:
     from dotenv import load_dotenv
@@ -24,6 +45,18 @@ ZONE_ID = os.getenv("CLOUDFLARE_ZONE_ID")
 DOMAIN = os.getenv("CLOUDFLARE_DOMAIN", "oriz.in")
 TARGET_CNAME = os.getenv("CLOUDFLARE_TARGET_CNAME", "office-os.pages.dev")
 
+def parse_targets(value):
+    """"platform=host,platform=host" -> {platform: host}."""
+    targets = {}
+    for item in value.split(","):
+        platform, _, host = item.partition("=")
+        if platform.strip() and host.strip():
+            targets[platform.strip()] = host.strip()
+    return targets
+
+# CNAME target per platform, for pointing SUBDOMAINS at the fastest healthy host
+PLATFORM_TARGETS = parse_targets(os.getenv("DNS_PLATFORM_TARGETS", f"cloudflare={TARGET_CNAME}"))
+
 # Subdomains to create (will point to TARGET_CNAME)
 SUBDOMAINS = [
     "o",           # Main: o.oriz.in
@@ -34,7 +67,17 @@ SUBDOMAINS = [
     "app",         # app.oriz.in
 ]
 
-API_BASE = "https://api.cloudflare.com/client/v4"
+API_BASE = os.getenv("CLOUDFLARE_API_BASE", "https://api.cloudflare.com/client/v4")
+PER_PAGE = 1000  # records per page when listing
+MAX_WORKERS = 4  # concurrent requests when the batch endpoint is unavailable
+TIMEOUT = 30
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          '.deploy-cache', 'dns.json')
+ZONE_CACHE_TTL = 7 * 24 * 3600  # zone IDs practically never change
+
+_session = None
+api_calls = 0
 
 def get_headers():
     """Get auth headers - supports both API Token and Global API Key."""
@@ -54,10 +97,22 @@ def get_headers():
         print("   Set CLOUDFLARE_API_TOKEN or (CLOUDFLARE_GLOBAL_API_KEY + CLOUDFLARE_EMAIL)")
         exit(1)
 
+def _count_call(response, *args, **kwargs):
+    global api_calls
+    api_calls += 1
+
+def get_session():
+    """Shared keep-alive client with auth headers set once."""
+    global _session
+    if _session is None:
+        _session = HttpClient(headers=get_headers(), pool_size=MAX_WORKERS)
+        _session.session.hooks["response"].append(_count_call)
+    return _session
+
 def get_zone_id(domain):
     """Fetch Zone ID for a domain."""
-    url = f"{API_BASE}/zones?name={domain}"
-    response = requests.get(url, headers=get_headers())
+    url = f"{API_BASE}/zones"
+    response = get_session().get(url, params={"name": domain}, timeout=TIMEOUT)
     if response.status_code == 200:
         result = response.json().get("result", [])
         if result:
@@ -67,93 +122,244 @@ def get_zone_id(domain):
     return None
 
 def get_dns_records(zone_id):
-    """Fetch existing DNS records for the zone."""
-    url = f"{API_BASE}/zones/{zone_id}/dns_records?per_page=100"
-    response = requests.get(url, headers=get_headers())
-    if response.status_code != 200:
-        print(f"❌ Failed to fetch DNS records: {response.text}")
-        return []
-    return response.json().get("result", [])
-
-def create_cname(zone_id, name, target, proxied=True):
-    """Create a CNAME record."""
+    """Fetch every DNS record in the zone, following pagination. None on failure."""
     url = f"{API_BASE}/zones/{zone_id}/dns_records"
-    data = {
+    records = []
+    page = 1
+    while True:
+        response = get_session().get(url, params={"page": page, "per_page": PER_PAGE}, timeout=TIMEOUT)
+        if response.status_code != 200:
+            print(f"❌ Failed to fetch DNS records: {response.text}")
+            return None
+        payload = response.json()
+        records.extend(payload.get("result", []))
+        total_pages = (payload.get("result_info") or {}).get("total_pages", 1)
+        if page >= total_pages:
+            return records
+        page += 1
+
+def current_target(records, subdomains=SUBDOMAINS, domain=DOMAIN):
+    """The CNAME target most SUBDOMAINS point at now, or None."""
+    names = {f"{sub}.{domain}" for sub in subdomains}
+    targets = [r["content"] for r in records if r["type"] == "CNAME" and r["name"] in names]
+    return max(set(targets), key=targets.count) if targets else None
+
+def cname_payload(name, target, proxied=True):
+    """Record body shared by create, update and batch requests."""
+    return {
         "type": "CNAME",
         "name": name,
         "content": target,
         "ttl": 1,  # Auto
         "proxied": proxied
     }
-    response = requests.post(url, headers=get_headers(), json=data)
+
+def create_cname(zone_id, name, target, proxied=True):
+    """Create a CNAME record. Returns the created record, or None."""
+    url = f"{API_BASE}/zones/{zone_id}/dns_records"
+    response = get_session().post(url, json=cname_payload(name, target, proxied), timeout=TIMEOUT)
     if response.status_code == 200:
         print(f"✅ Created CNAME: {name}.{DOMAIN} -> {target}")
-        return True
+        return response.json().get("result") or {}
     else:
         print(f"❌ Failed to create {name}: {response.text}")
-        return False
+        return None
 
 def update_cname(zone_id, record_id, name, target, proxied=True):
-    """Update an existing CNAME record."""
+    """Update an existing CNAME record. Returns the record, or None."""
     url = f"{API_BASE}/zones/{zone_id}/dns_records/{record_id}"
-    data = {
-        "type": "CNAME",
-        "name": name,
-        "content": target,
-        "ttl": 1,
-        "proxied": proxied
-    }
-    response = requests.put(url, headers=get_headers(), json=data)
+    response = get_session().put(url, json=cname_payload(name, target, proxied), timeout=TIMEOUT)
     if response.status_code == 200:
         print(f"✅ Updated CNAME: {name}.{DOMAIN} -> {target}")
-        return True
+        return response.json().get("result") or {}
     else:
         print(f"❌ Failed to update {name}: {response.text}")
+        return None
+
+# ============================================================================
+# Reconciliation
+# ============================================================================
+
+@dataclass
+class ChangeSet:
+    """Difference between the zone and the desired SUBDOMAINS state."""
+    create: List[str] = field(default_factory=list)  # subdomains
+    update: Dict[str, dict] = field(default_factory=dict)  # subdomain -> existing record
+    unchanged: List[str] = field(default_factory=list)
+    conflicts: Dict[str, str] = field(default_factory=dict)  # subdomain -> record type
+
+    @property
+    def empty(self):
+        return not self.create and not self.update
+
+def compute_changes(records, subdomains, target, domain=DOMAIN):
+    """Work out which CNAMEs need creating or repointing."""
+    by_name = {}
+    for r in records:
+        by_name.setdefault(r["name"], []).append(r)
+
+    changes = ChangeSet()
+    for sub in subdomains:
+        existing = by_name.get(f"{sub}.{domain}", [])
+        cname = next((r for r in existing if r["type"] == "CNAME"), None)
+        if cname:
+            if cname["content"] != target:
+                changes.update[sub] = cname
+            else:
+                changes.unchanged.append(sub)
+        elif existing:
+            # A CNAME cannot coexist with other records of the same name
+            changes.conflicts[sub] = existing[0]["type"]
+        else:
+            changes.create.append(sub)
+    return changes
+
+def apply_batch(zone_id, changes, target):
+    """Apply all changes in one request.
+
+    Returns the written records, None on failure, or False when the batch
+    endpoint is not available.
+    """
+    url = f"{API_BASE}/zones/{zone_id}/dns_records/batch"
+    body = {
+        "posts": [cname_payload(sub, target) for sub in changes.create],
+        "patches": [
+            {"id": record["id"], **cname_payload(sub, target)}
+            for sub, record in changes.update.items()
+        ],
+    }
+    response = get_session().post(url, json=body, timeout=TIMEOUT)
+    if response.status_code in (404, 405, 501):
+        return False
+    if response.status_code != 200 or not response.json().get("success"):
+        print(f"❌ Batch DNS update failed: {response.text}")
+        return None
+    for sub in changes.create:
+        print(f"✅ Created CNAME: {sub}.{DOMAIN} -> {target}")
+    for sub in changes.update:
+        print(f"✅ Updated CNAME: {sub}.{DOMAIN} -> {target}")
+    result = response.json().get("result") or {}
+    return result.get("posts", []) + result.get("patches", [])
+
+def apply_concurrently(zone_id, changes, target):
+    """Fallback: one request per record, a few at a time."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(create_cname, zone_id, sub, target) for sub in changes.create]
+        futures += [
+            executor.submit(update_cname, zone_id, record["id"], sub, target)
+            for sub, record in changes.update.items()
+        ]
+        written = [f.result() for f in futures]
+    return None if any(r is None for r in written) else written
+
+def apply_changes(zone_id, changes, target):
+    """Apply a change set, preferring the batch endpoint.
+
+    Returns the written records (empty for a no-op), or None on failure.
+    """
+    if changes.empty:
+        return []
+    written = apply_batch(zone_id, changes, target)
+    if written is False:
+        print("ℹ️  Batch endpoint unavailable, applying records individually")
+        written = apply_concurrently(zone_id, changes, target)
+    return written
+
+def print_changes(changes, target):
+    """Print the minimal diff: only what changes, unchanged as a count."""
+    for sub, record in changes.update.items():
+        print(f"🔄 {sub}.{DOMAIN}: {record['content']} -> {target}")
+    for sub in changes.create:
+        print(f"➕ {sub}.{DOMAIN} -> {target}")
+    for sub, record_type in changes.conflicts.items():
+        print(f"⚠️  {sub}.{DOMAIN} already has a {record_type} record; not creating a CNAME")
+    if changes.unchanged:
+        print(f"✨ {len(changes.unchanged)} record(s) already point to {target}")
+
+# ============================================================================
+# Local Cache
+# ============================================================================
+
+def load_cache():
+    try:
+        with open(CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(cache):
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    with open(CACHE_FILE, "w") as f:
+        json.dump(cache, f, indent=2)
+
+def resolve_zone_id(domain, cache, refresh=False):
+    """Zone ID from the environment, the local cache or the API."""
+    if ZONE_ID:
+        return ZONE_ID
+    entry = cache.get("zones", {}).get(domain)
+    if entry and not refresh and time.time() - entry["fetched_at"] < ZONE_CACHE_TTL:
+        return entry["id"]
+    print(f"🔍 Fetching Zone ID for {domain}...")
+    zone_id = get_zone_id(domain)
+    if zone_id:
+        cache.setdefault("zones", {})[domain] = {"id": zone_id, "fetched_at": time.time()}
+    return zone_id
+
+# ============================================================================
+# Commands
+# ============================================================================
+
+def reconcile(zone_id, target=TARGET_CNAME, subdomains=SUBDOMAINS, apply=True, records=None):
+    """Point every subdomain at the target. Returns True on success.
+
+    `records` must be a listing fetched just before; without it the zone is
+    listed here.
+    """
+    records = get_dns_records(zone_id) if records is None else records
+    if records is None:
         return False
 
+    changes = compute_changes(records, subdomains, target)
+    print_changes(changes, target)
+    ok = not changes.conflicts
+    if apply and not changes.empty:
+        ok = apply_changes(zone_id, changes, target) is not None and ok
+    elif not apply and not changes.empty:
+        print(f"📝 {len(changes.create)} to create, {len(changes.update)} to update. "
+              f"Run 'apply' to make these changes.")
+    return ok
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Office OS DNS manager")
+    parser.add_argument("command", nargs="?", choices=["plan", "apply"], default="apply")
+    parser.add_argument("--target", default=TARGET_CNAME, help="CNAME target for all subdomains")
+    parser.add_argument("--refresh", action="store_true", help="look up the zone ID again instead of using the cache")
+    return parser.parse_args()
+
 def main():
-    global ZONE_ID
+    args = parse_args()
 
     print(f"🔧 Office OS DNS Manager")
     print(f"   Domain: {DOMAIN}")
-    print(f"   Target: {TARGET_CNAME}")
+    print(f"   Target: {args.target}")
     print()
 
-    # Get Zone ID if not provided
-    if not ZONE_ID:
-        print(f"🔍 Fetching Zone ID for {DOMAIN}...")
-        ZONE_ID = get_zone_id(DOMAIN)
-        if not ZONE_ID:
-            exit(1)
+    cache = load_cache()
+    zone_id = resolve_zone_id(DOMAIN, cache, args.refresh)
+    if not zone_id:
+        exit(1)
+    save_cache(cache)
 
-    print(f"📍 Zone ID: {ZONE_ID}")
+    print(f"📍 Zone ID: {zone_id}")
     print()
 
-    # Fetch existing records
-    existing_records = get_dns_records(ZONE_ID)
-    existing_map = {}
-    for r in existing_records:
-        if r["type"] == "CNAME":
-            # Extract subdomain from full name (e.g., "o.oriz.in" -> "o")
-            sub = r["name"].replace(f".{DOMAIN}", "")
-            existing_map[sub] = r
-
-    # Process each subdomain
-    for sub in SUBDOMAINS:
-        record = existing_map.get(sub)
-
-        if record:
-            if record["content"] != TARGET_CNAME:
-                print(f"🔄 Updating {sub}...")
-                update_cname(ZONE_ID, record["id"], sub, TARGET_CNAME)
-            else:
-                print(f"✨ {sub}.{DOMAIN} already points to {TARGET_CNAME}")
-        else:
-            print(f"➕ Creating {sub}...")
-            create_cname(ZONE_ID, sub, TARGET_CNAME)
+    ok = reconcile(zone_id, args.target, apply=args.command == "apply")
 
     print()
-    print("✅ DNS Management Complete!")
+    print(f"   API calls: {api_calls}")
+    if not ok:
+        exit(1)
+    print("✅ DNS Management Complete!" if args.command == "apply" else "✅ Plan complete.")
 
 if __name__ == "__main__":
     main()
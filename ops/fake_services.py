@@ -0,0 +1,452 @@
+"""
+Office OS - Fake Services
+Local HTTP stand-ins for the provider APIs used by the ops scripts.
+
+Each fake runs a threaded HTTP server on 127.0.0.1 in a background thread,
+keeps its state in memory, counts requests per route and can inject latency
+a failure rate (HTTP 503) and a rate limit (HTTP 429 with Retry-After).
+Used by bench.py; point NEOCITIES_API_URL,
+NETLIFY_API_URL or CLOUDFLARE_API_BASE at `server.url` to exercise the real
+clients. FakeStaticHost serves a deployed directory for verify.py.
+"""
+import json
+import time
+import uuid
+import random
+import hashlib
+import mimetypes
+import threading
+from collections import Counter
+from email.parser import BytesParser
+from email.policy import HTTP
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+from typing import Dict, List, Optional
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """Dispatches to `route_<method>` on the owning FakeService."""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def read_body(self) -> bytes:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b''.join(chunks)
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def send_json(self, payload, status: int = 200, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_empty(self, status: int, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+
+    def handle_method(self, method: str):
+        service = self.server.service
+        url = urlparse(self.path)
+        body = self.read_body()
+        service.count(method, url.path)
+        if service.latency:
+            time.sleep(service.latency)
+        if not service.admit():
+            self.send_json({'success': False, 'message': 'Too Many Requests'}, 429,
+                           {'Retry-After': str(service.retry_after)})
+            return
+        if service.failure_rate and service.rng.random() < service.failure_rate:
+            self.send_json({'success': False, 'result': 'error', 'message': 'Service Unavailable'}, 503)
+            return
+        handler = getattr(service, f"route_{method.lower()}", None)
+        if handler is None:
+            self.send_json({'success': False, 'message': 'method not allowed'}, 405)
+            return
+        handler(self, url.path, parse_qs(url.query), body)
+
+    def do_GET(self):
+        self.handle_method('GET')
+
+    def do_POST(self):
+        self.handle_method('POST')
+
+    def do_PUT(self):
+        self.handle_method('PUT')
+
+    def do_PATCH(self):
+        self.handle_method('PATCH')
+
+    def do_DELETE(self):
+        self.handle_method('DELETE')
+
+
+class FakeService:
+    """Base class: a background HTTP server with request counters."""
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: int = 0,
+                 rate_limit: float = 0.0, burst: int = 10, retry_after: int = 1):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rate_limit = rate_limit  # requests per second, 0 for none
+        self.burst = burst
+        self.retry_after = retry_after
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.throttled = 0
+        self.rng = random.Random(seed)
+        self.requests = Counter()
+        self.bytes_received = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    def count(self, method: str, path: str):
+        with self.lock:
+            self.requests[f"{method} {self.route_name(path)}"] += 1
+
+    def route_name(self, path: str) -> str:
+        return path
+
+    def admit(self) -> bool:
+        """Token bucket for the rate limit; False means answer 429."""
+        if not self.rate_limit:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate_limit)
+            self.refilled = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.throttled += 1
+            return False
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def start(self) -> 'FakeService':
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeHandler)
+        self.server.daemon_threads = True
+        self.server.service = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def parse_multipart(content_type: str, body: bytes) -> Dict[str, bytes]:
+    """Field name -> content for a multipart/form-data body."""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        fields[name] = part.get_payload(decode=True) or b''
+    return fields
+
+
+# ============================================================================
+# Neocities
+# ============================================================================
+
+class FakeNeocities(FakeService):
+    """The /api/list, /api/upload and /api/delete endpoints of Neocities."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.files: Dict[str, str] = {}  # path -> sha1
+        self.files_uploaded = 0
+
+    def route_get(self, handler, path, query, body):
+        if path.endswith('/list'):
+            with self.lock:
+                files = [
+                    {'path': p, 'is_directory': False, 'sha1_hash': sha1}
+                    for p, sha1 in sorted(self.files.items())
+                ]
+            handler.send_json({'result': 'success', 'files': files})
+        else:
+            handler.send_json({'result': 'error', 'message': 'not found'}, 404)
+
+    def route_post(self, handler, path, query, body):
+        if path.endswith('/upload'):
+            fields = parse_multipart(handler.headers['Content-Type'], body)
+            with self.lock:
+                for name, content in fields.items():
+                    self.files[name] = hashlib.sha1(content).hexdigest()
+                self.files_uploaded += len(fields)
+                self.bytes_received += len(body)
+            handler.send_json({'result': 'success', 'message': 'your file(s) have been successfully uploaded'})
+        elif path.endswith('/delete'):
+            names = parse_qs(body.decode()).get('filenames[]', [])
+            with self.lock:
+                for name in names:
+                    self.files.pop(name, None)
+            handler.send_json({'result': 'success', 'message': 'file(s) have been deleted'})
+        else:
+            handler.send_json({'result': 'error', 'message': 'not found'}, 404)
+
+
+# ============================================================================
+# Netlify
+# ============================================================================
+
+class FakeNetlify(FakeService):
+    """The digest deploy endpoints of the Netlify API (/api/v1)."""
+
+    def __init__(self, site_id: str = 'bench', **kwargs):
+        super().__init__(**kwargs)
+        self.site_id = site_id
+        self.blobs = set()  # sha1 digests already stored
+        self.deploys: Dict[str, dict] = {}
+        self.files_uploaded = 0
+
+    def route_name(self, path: str) -> str:
+        parts = path.split('/')
+        if 'deploys' in parts:
+            index = parts.index('deploys')
+            if index + 1 < len(parts):
+                parts[index + 1] = ':id'
+            del parts[index + 3:]
+        return '/'.join(parts)
+
+    def deploy_view(self, deploy: dict) -> dict:
+        pending = [sha1 for sha1 in deploy['required'] if sha1 not in self.blobs]
+        return {
+            'id': deploy['id'], 'site_id': self.site_id,
+            'state': 'uploading' if pending else 'ready',
+            'required': pending,
+            'ssl_url': f"https://{self.site_id}.netlify.app",
+        }
+
+    def route_post(self, handler, path, query, body):
+        if path.endswith(f'/sites/{self.site_id}/deploys'):
+            files = json.loads(body or b'{}').get('files', {})
+            with self.lock:
+                deploy = {
+                    'id': uuid.uuid4().hex, 'files': files,
+                    'required': sorted({sha1 for sha1 in files.values() if sha1 not in self.blobs}),
+                }
+                self.deploys[deploy['id']] = deploy
+                view = self.deploy_view(deploy)
+            handler.send_json(view)
+        else:
+            handler.send_json({'code': 404, 'message': 'Not Found'}, 404)
+
+    def route_get(self, handler, path, query, body):
+        deploy = self.deploys.get(path.rsplit('/', 1)[-1])
+        if '/deploys/' in path and deploy:
+            with self.lock:
+                view = self.deploy_view(deploy)
+            handler.send_json(view)
+        else:
+            handler.send_json({'code': 404, 'message': 'Not Found'}, 404)
+
+    def route_put(self, handler, path, query, body):
+        _, _, rest = path.partition('/deploys/')
+        deploy_id, _, relative = rest.partition('/files/')
+        deploy = self.deploys.get(deploy_id)
+        if deploy is None:
+            handler.send_json({'code': 404, 'message': 'Not Found'}, 404)
+            return
+        sha1 = hashlib.sha1(body).hexdigest()
+        if deploy['files'].get('/' + unquote(relative)) != sha1:
+            handler.send_json({'code': 422, 'message': 'digest mismatch'}, 422)
+            return
+        with self.lock:
+            self.blobs.add(sha1)
+            self.files_uploaded += 1
+            self.bytes_received += len(body)
+        handler.send_json({'id': sha1, 'path': '/' + unquote(relative)})
+
+
+# ============================================================================
+# Cloudflare
+# ============================================================================
+
+class FakeCloudflare(FakeService):
+    """Zones and DNS records (with pagination and batch) and Pages direct
+    upload of the Cloudflare API."""
+
+    def __init__(self, domain: str = 'oriz.in', records: Optional[List[dict]] = None,
+                 batch: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.domain = domain
+        self.zone_id = uuid.uuid4().hex
+        self.records: List[dict] = records or []
+        self.batch = batch
+        self.jwt = uuid.uuid4().hex
+        self.assets = set()  # asset hashes already stored
+        self.deployments: List[dict] = []
+        self.files_uploaded = 0
+
+    def route_name(self, path: str) -> str:
+        # Collapse record IDs so counts group by endpoint
+        parts = path.split('/')
+        if len(parts) > 5 and parts[-2] == 'dns_records' and parts[-1] != 'batch':
+            parts[-1] = ':id'
+        return '/'.join(parts)
+
+    def add_filler_records(self, count: int):
+        """Unrelated A records to make pagination matter."""
+        for i in range(count):
+            self.records.append({
+                'id': uuid.uuid4().hex, 'type': 'A',
+                'name': f"host{i}.{self.domain}", 'content': '192.0.2.1',
+            })
+
+    def full_name(self, name: str) -> str:
+        return name if name.endswith(self.domain) else f"{name}.{self.domain}"
+
+    def route_get(self, handler, path, query, body):
+        if path.endswith('/upload-token'):
+            handler.send_json({'success': True, 'result': {'jwt': self.jwt}})
+            return
+        if path.endswith('/zones'):
+            handler.send_json({'success': True, 'result': [{'id': self.zone_id, 'name': self.domain}]})
+            return
+        if path.endswith('/dns_records'):
+            with self.lock:
+                page = int(query.get('page', ['1'])[0])
+                per_page = min(int(query.get('per_page', ['100'])[0]), 5000)
+                total_pages = max(1, -(-len(self.records) // per_page))
+                result = self.records[(page - 1) * per_page:page * per_page]
+            handler.send_json({
+                'success': True, 'result': result,
+                'result_info': {'page': page, 'per_page': per_page, 'total_pages': total_pages,
+                                'total_count': len(self.records)},
+            })
+            return
+        handler.send_json({'success': False, 'errors': [{'message': 'not found'}]}, 404)
+
+    def create_record(self, data: dict) -> dict:
+        record = {'id': uuid.uuid4().hex, **data, 'name': self.full_name(data['name'])}
+        self.records.append(record)
+        return record
+
+    def update_record(self, record_id: str, data: dict) -> Optional[dict]:
+        for record in self.records:
+            if record['id'] == record_id:
+                record.update({k: v for k, v in data.items() if k != 'id'})
+                record['name'] = self.full_name(record['name'])
+                return record
+        return None
+
+    def route_pages(self, handler, path, body):
+        """The /pages/assets/* endpoints (JWT auth) and deployment creation."""
+        if path.endswith('/deployments'):
+            fields = parse_multipart(handler.headers['Content-Type'], body)
+            manifest = json.loads(fields.get('manifest') or b'{}')
+            with self.lock:
+                missing = [key for key in manifest.values() if key not in self.assets]
+                if not missing:
+                    deployment = {'id': uuid.uuid4().hex, 'manifest': manifest,
+                                  'files': sorted(name for name in fields if name.startswith('_'))}
+                    deployment['url'] = f"https://{deployment['id'][:8]}.office-os.pages.dev"
+                    self.deployments.append(deployment)
+            if missing:
+                handler.send_json({'success': False, 'errors': [{'message': f'{len(missing)} assets missing'}]}, 400)
+            else:
+                handler.send_json({'success': True, 'result': {'id': deployment['id'], 'url': deployment['url']}})
+            return
+
+        if handler.headers.get('Authorization') != f"Bearer {self.jwt}":
+            handler.send_json({'success': False, 'errors': [{'message': 'expired JWT'}]}, 401)
+            return
+        data = json.loads(body or b'null')
+        with self.lock:
+            if path.endswith('/check-missing'):
+                result = [key for key in data['hashes'] if key not in self.assets]
+            elif path.endswith('/upload'):
+                for item in data:
+                    self.assets.add(item['key'])
+                self.files_uploaded += len(data)
+                self.bytes_received += len(body)
+                result = None
+            else:  # upsert-hashes
+                result = None
+        handler.send_json({'success': True, 'result': result})
+
+    def route_post(self, handler, path, query, body):
+        if '/pages/' in path:
+            self.route_pages(handler, path, body)
+            return
+        data = json.loads(body or b'{}')
+        if path.endswith('/dns_records/batch'):
+            if not self.batch:
+                handler.send_json({'success': False, 'errors': [{'message': 'not found'}]}, 404)
+                return
+            with self.lock:
+                posts = [self.create_record(r) for r in data.get('posts', [])]
+                patches = [self.update_record(r['id'], r) for r in data.get('patches', [])]
+            handler.send_json({'success': True, 'result': {'posts': posts, 'patches': patches}})
+        elif path.endswith('/dns_records'):
+            with self.lock:
+                record = self.create_record(data)
+            handler.send_json({'success': True, 'result': record})
+        else:
+            handler.send_json({'success': False, 'errors': [{'message': 'not found'}]}, 404)
+
+    def route_put(self, handler, path, query, body):
+        with self.lock:
+            record = self.update_record(path.rsplit('/', 1)[-1], json.loads(body or b'{}'))
+        if record:
+            handler.send_json({'success': True, 'result': record})
+        else:
+            handler.send_json({'success': False, 'errors': [{'message': 'record not found'}]}, 404)
+
+
+# ============================================================================
+# Static hosts
+# ============================================================================
+
+class FakeStaticHost(FakeService):
+    """Serves a directory over GET the way a static host serves a deploy."""
+
+    def __init__(self, root, **kwargs):
+        super().__init__(**kwargs)
+        self.root = Path(root)
+
+    def route_name(self, path: str) -> str:
+        return 'GET'
+
+    def route_get(self, handler, path, query, body):
+        relative = unquote(path).lstrip('/') or 'index.html'
+        file_path = (self.root / relative).resolve()
+        if self.root.resolve() not in file_path.parents or not file_path.is_file():
+            handler.send_empty(404)
+            return
+        content = file_path.read_bytes()
+        handler.send_response(200)
+        handler.send_header('Content-Type', mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream')
+        handler.send_header('Content-Length', str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
@@ -0,0 +1,223 @@
+"""
+Office OS - GitHub Pages Publisher
+Publishes dist/ to the pages branch from a persistent shallow checkout.
+
+The checkout lives in .deploy-cache/gh-pages and is reused across runs. Each
+publish fetches only the tip of the branch (depth 1), resets to it, copies
+in the files whose content differs from the published directory, removes
+files that are gone and stages just those paths. The directory is published
+as-is; .nojekyll and CNAME come from its staging overlay. Nothing is
+committed or pushed when the tree is unchanged, so deploy time follows the
+size of the change rather than the branch history.
+
+The remote is GH_PAGES_REPO (any git URL or a local bare repo path), else
+the project's `origin`. GH_TOKEN, if set, authenticates HTTPS remotes.
+
+A publish can be given a deadline (time.monotonic()); every git command is
+limited to the time left before it, so a publish never outlives the
+deploy attempt that started it.
+"""
+import os
+import time
+import base64
+import shutil
+import filecmp
+import functools
+import threading
+import subprocess
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from dist_scan import scan_dist
+
+WORKTREE_DIR = '.deploy-cache/gh-pages'
+BRANCH = os.getenv('GH_PAGES_BRANCH', 'gh-pages')
+GIT_TIMEOUT = 60  # seconds per git command, and never past the publish deadline
+
+DEFAULT_AUTHOR = ('Office OS Deploy', 'deploy@office-os.local')
+
+
+class GitHubPagesError(Exception):
+    """Raised when a git step of the publish fails."""
+
+
+@dataclass
+class PublishResult:
+    """Outcome of one publish."""
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    commit: Optional[str] = None  # None when nothing changed
+    duration: float = 0.0
+
+    @property
+    def changed(self) -> int:
+        return len(self.added) + len(self.updated) + len(self.deleted)
+
+
+def git_env(remote: str) -> Dict[str, str]:
+    """Environment for git: no prompts, token auth for HTTPS remotes."""
+    env = os.environ.copy()
+    env['GIT_TERMINAL_PROMPT'] = '0'
+    token = os.getenv('GH_TOKEN')
+    if token and remote.startswith('https://'):
+        # Passed as config through the environment so it never lands in
+        # .git/config or on the command line
+        basic = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+        count = int(env.get('GIT_CONFIG_COUNT', '0'))
+        env['GIT_CONFIG_COUNT'] = str(count + 1)
+        env[f'GIT_CONFIG_KEY_{count}'] = 'http.extraheader'
+        env[f'GIT_CONFIG_VALUE_{count}'] = f"AUTHORIZATION: basic {basic}"
+    for var, value in zip(('NAME', 'EMAIL'), DEFAULT_AUTHOR):
+        env.setdefault(f'GIT_AUTHOR_{var}', value)
+        env.setdefault(f'GIT_COMMITTER_{var}', value)
+    return env
+
+
+def git(args: List[str], cwd: Path, env: Optional[Dict[str, str]] = None,
+        input: Optional[bytes] = None, check: bool = True,
+        deadline: Optional[float] = None) -> subprocess.CompletedProcess:
+    """Run a git command, raising GitHubPagesError on failure."""
+    timeout = GIT_TIMEOUT
+    if deadline is not None:
+        timeout = min(timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            raise GitHubPagesError(f"git {args[0]} not started: publish timed out")
+    try:
+        result = subprocess.run(['git', *args], cwd=cwd, env=env, input=input,
+                                capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise GitHubPagesError(f"git {args[0]} timed out after {timeout:.0f}s")
+    except FileNotFoundError:
+        raise GitHubPagesError("git not installed")
+    if check and result.returncode != 0:
+        output = (result.stderr or result.stdout).decode(errors='replace').strip()
+        raise GitHubPagesError(f"git {args[0]} failed: {output}")
+    return result
+
+
+def resolve_remote(project_root: Path) -> Optional[str]:
+    """GH_PAGES_REPO, or the project's origin remote."""
+    remote = os.getenv('GH_PAGES_REPO')
+    if remote:
+        return remote
+    result = subprocess.run(['git', 'remote', 'get-url', 'origin'], cwd=project_root,
+                            capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def source_revision(project_root: Path) -> Optional[str]:
+    """Short SHA of the project checkout being published, if any."""
+    result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root,
+                            capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def prepare_worktree(worktree: Path, remote: str, branch: str, env: Dict[str, str],
+                     deadline: Optional[float] = None):
+    """Create or reuse the checkout and reset it to the remote branch tip."""
+    run = functools.partial(git, cwd=worktree, env=env, deadline=deadline)
+    if not (worktree / '.git').is_dir():
+        shutil.rmtree(worktree, ignore_errors=True)
+        worktree.mkdir(parents=True)
+        run(['init', '-q'])
+        run(['remote', 'add', 'origin', remote])
+    else:
+        # A git killed at the deadline leaves its lock behind; the deploy
+        # waits for a timed-out publish, so no other git is using it
+        (worktree / '.git' / 'index.lock').unlink(missing_ok=True)
+        run(['remote', 'set-url', 'origin', remote])
+
+    run(['symbolic-ref', 'HEAD', f'refs/heads/{branch}'])
+    fetch = run(['fetch', '-q', '--depth', '1', '--no-tags', 'origin', branch], check=False)
+    if fetch.returncode == 0:
+        run(['reset', '-q', '--hard', 'FETCH_HEAD'])
+        # Leftovers from an interrupted run
+        run(['clean', '-q', '-f', '-d', '-x'])
+        return
+
+    output = fetch.stderr.decode(errors='replace')
+    if "couldn't find remote ref" not in output:
+        raise GitHubPagesError(f"git fetch failed: {output.strip()}")
+    # First publish: start the branch from an empty tree
+    run(['update-ref', '-d', f'refs/heads/{branch}'], check=False)
+    run(['read-tree', '--empty'])
+    run(['clean', '-q', '-f', '-d', '-x'])
+
+
+def tracked_files(worktree: Path, env: Dict[str, str],
+                  deadline: Optional[float] = None) -> Dict[str, Path]:
+    """Files in the checkout, read from the index instead of walking it."""
+    output = git(['ls-files', '-z'], worktree, env, deadline=deadline).stdout.decode()
+    return {relative: worktree / relative for relative in output.split('\0') if relative}
+
+
+def sync_tree(source_dir: Path, worktree: Path, current: Dict[str, Path]) -> PublishResult:
+    """Make the checkout's files match `source_dir`, by content."""
+    result = PublishResult()
+    source = scan_dist(source_dir)
+
+    for relative, path in source.items():
+        target = worktree / relative
+        existing = current.get(relative)
+        if existing is None:
+            result.added.append(relative)
+        elif existing.stat().st_size != path.stat().st_size or not filecmp.cmp(path, existing, shallow=False):
+            result.updated.append(relative)
+        else:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+
+    for relative in sorted(set(current) - set(source)):
+        (worktree / relative).unlink()
+        result.deleted.append(relative)
+        parent = (worktree / relative).parent
+        while parent != worktree and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    return result
+
+
+def publish(project_root: Path, source_dir: Path, remote: str, branch: str = BRANCH,
+            message: Optional[str] = None,
+            cancel: Optional[threading.Event] = None,
+            deadline: Optional[float] = None) -> PublishResult:
+    """Sync `source_dir` into the pages branch, committing and pushing only real changes.
+
+    `deadline` (time.monotonic()) bounds every git command; `cancel` stops
+    the publish before it commits or pushes.
+    """
+    start = time.time()
+    worktree = project_root / WORKTREE_DIR
+    env = git_env(remote)
+    run = functools.partial(git, cwd=worktree, env=env, deadline=deadline)
+
+    prepare_worktree(worktree, remote, branch, env, deadline)
+    result = sync_tree(source_dir, worktree, tracked_files(worktree, env, deadline))
+
+    if not result.changed or (cancel and cancel.is_set()):
+        result.duration = time.time() - start
+        return result
+
+    # Stage only the touched paths so git never rescans the whole tree
+    paths = result.added + result.updated + result.deleted
+    run(['add', '-A', '--pathspec-from-file=-', '--pathspec-file-nul'],
+        input=b'\0'.join(p.encode() for p in paths))
+    if run(['diff', '--cached', '--quiet'], check=False).returncode == 0:
+        # Content matched after all (e.g. only file modes differed)
+        result.duration = time.time() - start
+        return result
+
+    revision = source_revision(project_root)
+    message = message or (f"Deploy {revision}" if revision else "Deploy")
+    run(['commit', '-q', '--no-verify', '-m', message])
+    result.commit = run(['rev-parse', 'HEAD']).stdout.decode().strip()
+
+    if cancel and cancel.is_set():
+        result.duration = time.time() - start
+        return result
+    run(['push', '-q', 'origin', f'HEAD:refs/heads/{branch}'])
+    result.duration = time.time() - start
+    return result
@@ -0,0 +1,352 @@
+"""
+Office OS - HTTP Client
+One HTTP layer for every API the ops scripts call.
+
+Each client keeps a pooled keep-alive session. Requests to the same host
+share a token bucket across all clients and threads, so parallel uploads
+stay under the provider's rate limit instead of tripping it. A 429 (or a
+503 with Retry-After) pauses the whole host for the time the server asks
+for, then the request is sent again; other 5xx answers are retried with
+backoff only where repeating the request is safe.
+
+Every 429 also lowers the host's rate to below what was getting through,
+and each quiet second raises it again (additive increase, multiplicative
+decrease), so a host converges on its real limit even when none is
+configured.
+
+Limits per provider are in PROVIDER_LIMITS and can be overridden with
+HTTP_RATE_LIMITS ("host=rate/burst,..."; rate 0 disables throttling).
+Request counts, retries and latency percentiles per host are kept in
+`host_stats()` for the run summary.
+
+Uploads reserve their body size from `upload_budget` while they are sent,
+so the bytes in flight across all clients and threads stay under
+HTTP_INFLIGHT_BYTES no matter how many uploads run at once.
+"""
+import os
+import time
+import random
+import threading
+import requests
+from collections import deque
+from email.utils import parsedate_to_datetime
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+# Requests per second and burst size, matched against the host name suffix
+PROVIDER_LIMITS: Dict[str, Tuple[float, int]] = {
+    'api.cloudflare.com': (4.0, 20),  # 1200 requests per 5 minutes per user
+    'api.netlify.com': (8.0, 40),  # 500 requests per minute
+    'neocities.org': (4.0, 10),
+}
+
+MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '4'))
+MAX_RETRY_AFTER = 120.0  # seconds; longer waits fail instead of stalling the deploy
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 10.0
+LATENCY_SAMPLES = 2000  # latencies kept per host for percentiles
+INFLIGHT_BYTES = int(os.getenv('HTTP_INFLIGHT_BYTES', str(64 * 1024 * 1024)))
+
+# Rate adaptation after a 429
+DECREASE = 0.8  # new rate as a share of what was getting through
+INCREASE = 1.0  # requests per second added per second without a 429
+MIN_RATE = 0.5
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'}
+RETRY_STATUSES = {502, 503, 504}
+
+
+def parse_limits(value: str) -> Dict[str, Tuple[float, int]]:
+    """"host=rate/burst,..." -> {host: (rate, burst)}."""
+    limits = {}
+    for item in value.split(','):
+        host, _, spec = item.partition('=')
+        if not host.strip() or not spec.strip():
+            continue
+        rate, _, burst = spec.partition('/')
+        limits[host.strip()] = (float(rate), int(burst or max(1, float(rate))))
+    return limits
+
+
+LIMITS = {**PROVIDER_LIMITS, **parse_limits(os.getenv('HTTP_RATE_LIMITS', ''))}
+
+
+class TokenBucket:
+    """Blocking token bucket with a host-wide pause and AIMD rate adaptation.
+
+    A rate of 0 means unthrottled until the host first answers 429.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.ceiling = rate or float('inf')
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.adjusted = 0.0
+        self.successes = deque(maxlen=10000)  # monotonic times of recent answers
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping as needed. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.rate <= 0:
+                    return waited
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Hold every request to this host for `seconds`."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def succeeded(self):
+        """Count an accepted request; raise an adapted rate after a quiet second."""
+        with self.lock:
+            now = time.monotonic()
+            self.successes.append(now)
+            if 0 < self.rate < self.ceiling and now - self.adjusted >= 1.0:
+                self.rate = min(self.ceiling, self.rate + INCREASE)
+                self.adjusted = now
+
+    def throttled(self):
+        """Drop the rate below what the host accepted in the last second."""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.adjusted < 1.0 and self.rate > 0:
+                return  # one decrease per burst of 429s
+            while self.successes and now - self.successes[0] > 1.0:
+                self.successes.popleft()
+            accepted = max(MIN_RATE, float(len(self.successes)))
+            current = self.rate if self.rate > 0 else accepted
+            self.rate = max(MIN_RATE, min(current, accepted) * DECREASE)
+            self.adjusted = now
+
+
+class ByteBudget:
+    """Caps the bytes of request bodies being sent at once, across threads."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        self.peak = 0
+        self.condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, size: int):
+        """Hold `size` bytes of the budget for the duration of the block.
+
+        A body larger than the whole budget waits until nothing else is in
+        flight and then goes alone.
+        """
+        size = min(max(0, size), self.limit)
+        with self.condition:
+            while self.in_flight and self.in_flight + size > self.limit:
+                self.condition.wait()
+            self.in_flight += size
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.in_flight -= size
+                self.condition.notify_all()
+
+    def reset_peak(self):
+        """Start measuring the peak afresh (e.g. for the next push in watch mode)."""
+        with self.condition:
+            self.peak = self.in_flight
+
+
+upload_budget = ByteBudget(INFLIGHT_BYTES)
+
+
+@dataclass
+class HostStats:
+    """Requests made to one host during this run."""
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0  # 429 answers
+    errors: int = 0  # connection errors
+    waited: float = 0.0  # seconds spent waiting for the rate limit
+    latencies: deque = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        values = sorted(self.latencies)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+_registry_lock = threading.Lock()
+_buckets: Dict[str, TokenBucket] = {}
+_stats: Dict[str, HostStats] = {}
+
+
+def limits_for(netloc: str) -> Tuple[float, int]:
+    """Configured (rate, burst) for a host; (0, 0) means unthrottled."""
+    hostname = netloc.rsplit(':', 1)[0] if ':' in netloc and not netloc.endswith(']') else netloc
+    for key in (netloc, hostname):
+        if key in LIMITS:
+            return LIMITS[key]
+    for suffix, limit in LIMITS.items():
+        if hostname.endswith('.' + suffix):
+            return limit
+    return 0.0, 0
+
+
+def bucket_for(netloc: str) -> TokenBucket:
+    with _registry_lock:
+        if netloc not in _buckets:
+            _buckets[netloc] = TokenBucket(*limits_for(netloc))
+            _stats[netloc] = HostStats()
+        return _buckets[netloc]
+
+
+def host_stats() -> Dict[str, HostStats]:
+    """Stats for every host contacted so far."""
+    with _registry_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    """Zero the per-host stats and the upload peak, keeping the rate limiters."""
+    with _registry_lock:
+        for netloc in _stats:
+            _stats[netloc] = HostStats()
+    upload_budget.reset_peak()
+
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _rewind(kwargs: dict) -> bool:
+    """Seek file bodies back to the start so a request can be sent again."""
+    bodies = [kwargs.get('data')]
+    bodies += [part[1] if isinstance(part, tuple) else part for part in (kwargs.get('files') or {}).values()]
+    for body in bodies:
+        if hasattr(body, 'read'):
+            if not hasattr(body, 'seek'):
+                return False
+            body.seek(0)
+    return True
+
+
+class HttpClient:
+    """A pooled session whose requests are throttled and retried per host."""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, auth: Optional[Tuple[str, str]] = None,
+                 pool_size: int = 8, max_retries: int = MAX_RETRIES):
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        if auth:
+            self.session.auth = auth
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs) -> requests.Response:
+        """Send a request under the host's rate limit, retrying throttled answers.
+
+        5xx answers are retried only for idempotent requests; pass
+        `idempotent=True` for POSTs that are safe to repeat.
+        """
+        method = method.upper()
+        netloc = urlparse(url).netloc
+        bucket = bucket_for(netloc)
+        stats = _stats[netloc]
+        safe = method in IDEMPOTENT_METHODS if idempotent is None else idempotent
+
+        for attempt in range(self.max_retries + 1):
+            waited = bucket.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                with bucket.lock:
+                    stats.requests += 1
+                    stats.errors += 1
+                    stats.waited += waited
+                if not safe or attempt == self.max_retries or not _rewind(kwargs):
+                    raise
+                time.sleep(self._backoff(attempt))
+                with bucket.lock:
+                    stats.retries += 1
+                continue
+
+            with bucket.lock:
+                stats.requests += 1
+                stats.waited += waited
+                stats.latencies.append(time.perf_counter() - start)
+                if response.status_code == 429:
+                    stats.throttled += 1
+            if response.status_code == 429:
+                bucket.throttled()
+            else:
+                bucket.succeeded()
+
+            delay = retry_after(response)
+            retryable = response.status_code == 429 or (
+                response.status_code in RETRY_STATUSES and (safe or delay is not None)
+            )
+            if not retryable or attempt == self.max_retries or not _rewind(kwargs):
+                return response
+            if delay is None:
+                delay = self._backoff(attempt)
+            if delay > MAX_RETRY_AFTER:
+                return response
+            bucket.pause(delay)
+            response.close()
+            with bucket.lock:
+                stats.retries += 1
+        return response
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
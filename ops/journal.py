@@ -0,0 +1,121 @@
+"""
+Office OS - Deploy Journal
+Records what a deploy finished, so a failed run can be resumed instead of
+repeated.
+
+The journal lives in .deploy-cache/journal-<build fingerprint>.json and
+holds the platforms that deployed successfully (with their URLs) and, for
+per-file uploads, every file sent with its hash. It is written as work
+completes, so an interrupted run leaves an accurate record behind.
+
+Uploaded files arrive in many small batches, so each batch is appended to a
+side log (journal-<fingerprint>.files.jsonl) rather than rewriting the
+journal. The log is folded into the journal whenever a platform completes
+and when a journal is reopened; a line cut short by a crash is ignored.
+
+A normal run starts a fresh journal for its build. `--resume` keeps the
+journal of the same build and skips everything it lists: finished
+platforms are not deployed again, and files whose hash still matches are
+not uploaded again. A different build fingerprint never matches, so a
+resume after changing the inputs redoes everything.
+"""
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+JOURNAL_DIR = '.deploy-cache'
+JOURNAL_PREFIX = 'journal-'
+
+
+def journal_path(project_root: Path, fingerprint: str) -> Path:
+    return project_root / JOURNAL_DIR / f"{JOURNAL_PREFIX}{fingerprint[:16]}.json"
+
+
+def files_log_path(path: Path) -> Path:
+    return path.with_suffix('.files.jsonl')
+
+
+class DeployJournal:
+    """Finished platforms and uploaded files for one build, saved on every change."""
+
+    def __init__(self, path: Path, fingerprint: str, data: Optional[dict] = None):
+        self.path = path
+        self.log_path = files_log_path(path)
+        self.fingerprint = fingerprint
+        self.data = data or {'fingerprint': fingerprint, 'started_at': time.time(),
+                             'platforms': {}, 'files': {}}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def open(cls, project_root: Path, fingerprint: str, resume: bool = False) -> 'DeployJournal':
+        """The journal for this build: kept if resuming, otherwise started over.
+
+        Journals of other builds are removed; they can never be resumed.
+        """
+        path = journal_path(project_root, fingerprint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for other in path.parent.glob(f"{JOURNAL_PREFIX}*"):
+            if other not in (path, files_log_path(path)):
+                other.unlink()
+
+        data = None
+        if resume:
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                data = None
+            if data and data.get('fingerprint') != fingerprint:
+                data = None
+        journal = cls(path, fingerprint, data)
+        if data:
+            journal.replay_files()
+        journal.save()
+        return journal
+
+    def replay_files(self):
+        """Fold batches from the side log into the loaded journal."""
+        try:
+            lines = self.log_path.read_text().splitlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                batch = json.loads(line)
+            except ValueError:
+                continue  # cut short by a crash; those files just upload again
+            self.data['files'].setdefault(batch['platform'], {}).update(batch['files'])
+
+    def save(self):
+        """Write the whole journal and empty the side log it now contains."""
+        # Written to a side file and renamed, so a crash never leaves half a journal
+        partial = self.path.with_suffix('.partial')
+        partial.write_text(json.dumps(self.data, indent=2, sort_keys=True))
+        os.replace(partial, self.path)
+        self.log_path.unlink(missing_ok=True)
+
+    def completed(self, platform: str) -> Optional[dict]:
+        """{'url', 'finished_at'} if the platform already deployed this build."""
+        with self.lock:
+            return self.data['platforms'].get(platform)
+
+    def complete(self, platform: str, url: Optional[str]):
+        with self.lock:
+            if platform in self.data['platforms']:
+                return
+            self.data['platforms'][platform] = {'url': url, 'finished_at': time.time()}
+            self.save()
+
+    def files(self, platform: str) -> Dict[str, str]:
+        """{path: hash} of every file already uploaded to the platform."""
+        with self.lock:
+            return dict(self.data['files'].get(platform, {}))
+
+    def add_files(self, platform: str, files: Dict[str, str]):
+        """Record a batch of uploads by appending it to the side log."""
+        with self.lock:
+            self.data['files'].setdefault(platform, {}).update(files)
+            with open(self.log_path, 'a') as log:
+                log.write(json.dumps({'platform': platform, 'files': files}) + '\n')
@@ -5,26 +5,50 @@ Office OS - Multi-Platform Deployment Script
 Deploys to all configured hosting platforms with proper timeouts and retry logic.
 
 Supported Platforms:
-- Cloudflare Pages (wrangler)
+- Cloudflare Pages (direct upload API, wrangler fallback)
 - Vercel (vercel-cli)
-- Netlify (netlify-cli)
+- Netlify (API)
 - Surge (surge)
 - Neocities (API)
-- GitHub Pages (gh-pages)
+- GitHub Pages (git)
 - Render (Static Site - API trigger)
 """
 
 import os
+import re
 import sys
 import time
 import subprocess
 import shutil
-import requests
-import base64
-import concurrent.futures
+import signal
+import asyncio
+import argparse
+import statistics
+import threading
+from collections import deque
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Optional, Dict, List, Tuple
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Dict, List, Tuple
+
+import build_cache
+import bundle_budget
+import cache_headers
+import cloudflare_pages
+import neocities
+import netlify_api
+import precompress
+import retry
+import staging
+import telemetry
+import toolchain
+import verify
+import watch
+import dns_manager
+import gh_pages
+import http_client
+import journal
+import pipeline
+from dist_scan import scan_dist, PRECOMPRESSED_SUFFIXES
 
 # Try to load .env
 try:
@@ -41,8 +65,8 @@ except ImportError:
 try:
     from rich.console import Console
     from rich.table import Table
-    from rich.progress import Progress, SpinnerColumn, TextColumn
     from rich import print as rprint
+    from rich.markup import escape
     console = Console()
     HAS_RICH = True
 except ImportError:
@@ -61,25 +85,39 @@ class DeploymentResult:
     url: Optional[str] = None
     error: Optional[str] = None
     duration: float = 0.0
+    attempts: int = 1
+    exit_code: Optional[int] = None
+    resumed: bool = False  # finished by an earlier run of this build (see journal)
 
 @dataclass
 class PlatformConfig:
     """Configuration for a deployment platform."""
     name: str
     enabled_var: str
-    timeout: int  # seconds
+    timeout: int  # seconds, per attempt
     deploy_func: str  # method name
+    retry_policy: retry.RetryPolicy = field(default_factory=retry.RetryPolicy)
+    needs_dist: bool = True  # False for deploys that only trigger a remote build
 
 PLATFORMS = {
     'cloudflare': PlatformConfig('Cloudflare Pages', 'ENABLE_CLOUDFLARE', 120, 'deploy_cloudflare'),
     'vercel': PlatformConfig('Vercel', 'ENABLE_VERCEL', 120, 'deploy_vercel'),
     'netlify': PlatformConfig('Netlify', 'ENABLE_NETLIFY', 120, 'deploy_netlify'),
     'surge': PlatformConfig('Surge', 'ENABLE_SURGE', 60, 'deploy_surge'),
-    'neocities': PlatformConfig('Neocities', 'ENABLE_NEOCITIES', 180, 'deploy_neocities'),
+    'neocities': PlatformConfig('Neocities', 'ENABLE_NEOCITIES', 180, 'deploy_neocities',
+                                retry.RetryPolicy(max_attempts=4)),
     'github': PlatformConfig('GitHub Pages', 'ENABLE_GITHUB_PAGES', 60, 'deploy_github_pages'),
-    'render': PlatformConfig('Render', 'ENABLE_RENDER', 120, 'deploy_render'),
+    'render': PlatformConfig('Render', 'ENABLE_RENDER', 120, 'deploy_render', needs_dist=False),
 }
 
+# Total retries allowed across all platforms in one run
+RETRY_BUDGET = int(os.getenv('DEPLOY_RETRY_BUDGET', '6'))
+
+# Watch mode: quiet seconds before a batch of changes is deployed, and the
+# longest a continuous stream of changes can hold a deploy back
+WATCH_DEBOUNCE = float(os.getenv('WATCH_DEBOUNCE', '0.5'))
+WATCH_MAX_DELAY = float(os.getenv('WATCH_MAX_DELAY', '10'))
+
 # ============================================================================
 # Utility Functions
 # ============================================================================
@@ -113,17 +151,171 @@ def run_command(cmd: str, cwd: Optional[Path] = None, timeout: int = 60) -> Tupl
     except Exception as e:
         return False, str(e)
 
+# Deploy URLs printed by the platform CLIs, compiled once
+URL_PATTERNS = {
+    'cloudflare': re.compile(r'https://[^\s\'"]+\.pages\.dev'),
+    'vercel': re.compile(r'https://[^\s\'"]+\.vercel\.app'),
+    'netlify': re.compile(r'https://[^\s\'"]+\.netlify\.app'),
+}
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+# CLI output kept for error reporting: last N lines, each clipped
+OUTPUT_TAIL_LINES = 200
+OUTPUT_LINE_CHARS = 1000
+STREAM_LIMIT = 1024 * 1024  # longest line read in one piece
+STREAM_OUTPUT = os.getenv('DEPLOY_STREAM_OUTPUT', 'True').lower() in ('true', '1', 'yes')
+
+@dataclass
+class CommandResult:
+    """Outcome of a streamed command."""
+    success: bool
+    returncode: Optional[int]
+    output: str  # last OUTPUT_TAIL_LINES lines
+    url: Optional[str] = None
+    url_seen_at: Optional[float] = None  # seconds after start
+    duration: float = 0.0
+
+def _kill_process_tree(process: asyncio.subprocess.Process):
+    """Kill a shell and everything it started."""
+    if process.returncode is not None:
+        return
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+def _forward(prefix: str, line: str):
+    """Echo one line of CLI output to the console."""
+    if HAS_RICH:
+        console.print(f"[dim]{escape(prefix)} {escape(line)}[/dim]", highlight=False)
+    else:
+        print(f"{prefix} {line}")
+
+async def stream_command(cmd: str, cwd: Optional[Path] = None, timeout: Optional[float] = None,
+                         env: Optional[Dict[str, str]] = None, url_pattern: Optional[re.Pattern] = None,
+                         prefix: Optional[str] = None) -> CommandResult:
+    """Run a shell command, reading its output line by line as it arrives.
+
+    Lines are matched against `url_pattern` (the last match wins, since CLIs
+    print the final alias after intermediate URLs), echoed live under
+    `prefix` and kept in a bounded ring buffer for error reporting. The
+    command runs in its own process group so a timeout or cancellation
+    (e.g. the platform deadline expiring) kills the CLI and its children.
+    """
+    start = time.time()
+    try:
+        process = await asyncio.create_subprocess_shell(
+            cmd,
+            cwd=cwd,
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+            start_new_session=True
+        )
+    except Exception as e:
+        return CommandResult(False, None, str(e))
+
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    result = CommandResult(False, None, '')
+
+    async def pump(stream: asyncio.StreamReader):
+        while True:
+            try:
+                raw = await stream.readline()
+            except ValueError:
+                # Longer than STREAM_LIMIT; the oversized line is dropped
+                tail.append('[line truncated]')
+                continue
+            if not raw:
+                break
+            line = ANSI_ESCAPE.sub('', raw.decode(errors='replace')).rstrip()
+            if not line:
+                continue
+            if len(line) > OUTPUT_LINE_CHARS:
+                line = line[:OUTPUT_LINE_CHARS] + ' [...]'
+            tail.append(line)
+            if url_pattern:
+                match = url_pattern.search(line)
+                if match:
+                    if result.url is None:
+                        result.url_seen_at = time.time() - start
+                    result.url = match.group(0)
+            if prefix and STREAM_OUTPUT:
+                _forward(prefix, line)
+
+    async def run():
+        await asyncio.gather(pump(process.stdout), pump(process.stderr))
+        return await process.wait()
+
+    try:
+        result.returncode = await asyncio.wait_for(run(), timeout=timeout)
+    except asyncio.TimeoutError:
+        _kill_process_tree(process)
+        await process.wait()
+        tail.append(f"Command timed out after {timeout}s")
+        result.returncode = process.returncode
+    except asyncio.CancelledError:
+        _kill_process_tree(process)
+        await process.wait()
+        raise
+
+    result.success = result.returncode == 0
+    result.output = '\n'.join(tail)
+    result.duration = time.time() - start
+    return result
+
+async def run_in_thread(cancel: threading.Event, func: Callable, /, *args, **kwargs):
+    """Run a blocking deploy in a worker thread.
+
+    A thread cannot be killed, so when the caller is cancelled (e.g. the
+    platform deadline expiring) `cancel` tells it to stop and it is waited
+    for before the cancellation goes on. A retry therefore never runs beside
+    the attempt it replaces.
+    """
+    worker = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+    try:
+        return await asyncio.shield(worker)
+    except asyncio.CancelledError:
+        cancel.set()
+        await asyncio.wait([worker])
+        raise
+
+def get_enabled_platforms() -> List[Tuple[str, PlatformConfig]]:
+    """Return (key, config) for every platform enabled in the environment."""
+    return [
+        (key, config) for key, config in PLATFORMS.items()
+        if os.getenv(config.enabled_var, 'False').lower() in ('true', '1', 'yes')
+    ]
+
+def cli_platforms(platforms: List[str]) -> List[str]:
+    """Platforms that deploy through a CLI (Cloudflare and Netlify only without their APIs)."""
+    native = {'cloudflare': cloudflare_pages.native_available(), 'netlify': netlify_api.native_available()}
+    return [p for p in platforms if not native.get(p)]
+
+def announce_platforms() -> List[Tuple[str, PlatformConfig]]:
+    """Log which platforms are enabled and return them."""
+    enabled_platforms = get_enabled_platforms()
+    for key, config in PLATFORMS.items():
+        if (key, config) in enabled_platforms:
+            log(f"  {config.name}: enabled", 'info')
+        else:
+            log(f"  {config.name}: disabled", 'warning')
+    if not enabled_platforms:
+        log("No platforms enabled!", 'error')
+    return enabled_platforms
+
+def deploy_limit(platforms: int, parallel: bool, concurrency: Optional[int]) -> int:
+    """Platforms deployed at once: all by default; sequential is a limit of one."""
+    return (concurrency or platforms) if parallel else 1
+
 def check_cli(name: str) -> bool:
     """Check if a CLI tool is installed."""
     return shutil.which(name) is not None
 
-def install_cli(name: str, npm_package: Optional[str] = None):
-    """Install a CLI tool globally via npm."""
-    package = npm_package or name
-    log(f"Installing {name}...", 'warning')
-    success, _ = run_command(f"npm install -g {package}", timeout=120)
-    return success
-
 # ============================================================================
 # Deployment Functions
 # ============================================================================
@@ -134,21 +326,124 @@ class Deployer:
     def __init__(self, project_root: Path):
         self.project_root = project_root
         self.dist_dir = project_root / 'dist'
+        # Resolved CLI binaries by tool name (see preflight)
+        self.tools: Dict[str, Optional[str]] = {}
+        self.telemetry = telemetry.Telemetry()
+        # Per-platform views of dist/ (see stage)
+        self.stages: Dict[str, Path] = {}
+        # API clients kept across deploys so watch mode reuses their
+        # connections and hash caches
+        self.clients: Dict[str, object] = {}
+        # Fingerprint of the build in dist/ and what has been deployed from it
+        self.fingerprint: Optional[str] = None
+        self.journal: Optional[journal.DeployJournal] = None
+        self.bundle_report: Optional[bundle_budget.BundleReport] = None
+        self.resume = False
+
+    def client(self, key: str, factory):
+        """The cached API client for `key`, created by `factory` on first use."""
+        if key not in self.clients:
+            self.clients[key] = factory()
+        return self.clients[key]
+
+    def record_command(self, platform: str, run: CommandResult):
+        """Record upload time and time-to-URL for a CLI deploy."""
+        self.telemetry.record('upload', run.duration, platform)
+        if run.url_seen_at is not None:
+            self.telemetry.record('url', run.url_seen_at, platform)
+
+    async def resolve_tool(self, name: str) -> Optional[str]:
+        """Return the pinned tool from the local cache, installing it if needed."""
+        if toolchain.USE_PATH_TOOLS:
+            return toolchain.path_binary(name)
+
+        cached = toolchain.cached_binary(self.project_root, name)
+        if cached:
+            return str(cached)
+
+        # Install into a scratch prefix and move it into place only when
+        # complete, so an interrupted install never looks cached
+        prefix = toolchain.tool_prefix(self.project_root, name)
+        partial = prefix.with_name(prefix.name + '.partial')
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+
+        spec = toolchain.PINNED_TOOLS[name]
+        log(f"Installing {spec.key} into the tool cache...", 'warning')
+        run = await stream_command(
+            toolchain.install_command(partial, name), self.project_root,
+            timeout=300, prefix=f"[{name}]"
+        )
+        if run.success and toolchain.local_binary(partial, name).exists():
+            shutil.rmtree(prefix, ignore_errors=True)
+            partial.rename(prefix)
+            return str(toolchain.local_binary(prefix, name))
+
+        shutil.rmtree(partial, ignore_errors=True)
+        fallback = toolchain.path_binary(name)
+        if fallback:
+            log(f"Could not install {spec.key}, falling back to {fallback}", 'warning')
+        return fallback
+
+    async def preflight_async(self, platforms: List[str]) -> Dict[str, Optional[str]]:
+        """Resolve every CLI the given platforms need, in parallel."""
+        names = [name for name in toolchain.required_tools(cli_platforms(platforms)) if name not in self.tools]
+        paths = await asyncio.gather(*(self.resolve_tool(name) for name in names))
+        self.tools.update(zip(names, paths))
+        return self.tools
+
+    def preflight(self) -> bool:
+        """Resolve the deploy CLIs for all enabled platforms before deploying."""
+        return asyncio.run(self.check_tools())
+
+    async def check_tools(self) -> bool:
+        """Resolve and report the deploy CLIs for all enabled platforms."""
+        platforms = [key for key, _ in get_enabled_platforms()]
+        if not toolchain.required_tools(cli_platforms(platforms)):
+            return True
+
+        log("Resolving deploy tools...", 'deploy')
+        with self.telemetry.phase('preflight'):
+            tools = await self.preflight_async(platforms)
+        for name, path in tools.items():
+            if path:
+                log(f"  {name}: {path}", 'info')
+            else:
+                log(f"  {name}: not available", 'error')
+        return all(tools.values())
 
-    def build(self) -> bool:
-        """Build the project."""
+    def build(self, force: bool = False) -> bool:
+        """Build the project, reusing dist/ when the inputs are unchanged."""
         log("Building project...", 'deploy')
 
-        # Install dependencies if needed
-        if not (self.project_root / 'node_modules').exists():
-            log("Installing dependencies...")
-            success, _ = run_command("npm install", self.project_root, timeout=180)
-            if not success:
-                log("Failed to install dependencies", 'error')
-                return False
-
-        # Build
-        success, output = run_command("npm run build", self.project_root, timeout=120)
+        # Install dependencies if the lockfile or toolchain changed
+        with self.telemetry.phase('install') as phase:
+            if build_cache.deps_up_to_date(self.project_root):
+                log("Dependencies up to date, skipping install")
+                phase['skipped'] = True
+            else:
+                install = build_cache.install_command(self.project_root)
+                log(f"Installing dependencies ({install})...")
+                success, _ = run_command(install, self.project_root, timeout=180)
+                if not success:
+                    log("Failed to install dependencies", 'error')
+                    return False
+                build_cache.save_deps_fingerprint(self.project_root)
+
+        # Skip the build when nothing that feeds it has changed
+        with self.telemetry.phase('fingerprint'):
+            fingerprint = build_cache.build_fingerprint(self.project_root)
+        self.fingerprint = fingerprint
+        if not force and build_cache.is_build_current(self.project_root, fingerprint):
+            log("Build inputs unchanged, reusing cached dist/", 'success')
+            self.telemetry.record('build', 0.0, skipped=True)
+            self.count_dist()
+            return True
+
+        # Build (npm runs the script with its pre/post hooks)
+        build_cache.clear_fingerprint(self.project_root)
+        with self.telemetry.phase('build'):
+            success, output = run_command("npm run build", self.project_root, timeout=120)
         if not success:
             log(f"Build failed: {output}", 'error')
             return False
@@ -157,114 +452,322 @@ class Deployer:
             log("Build directory not found", 'error')
             return False
 
+        build_cache.save_fingerprint(self.project_root, fingerprint)
+        self.count_dist()
         log("Build successful!", 'success')
         return True
 
-    def deploy_cloudflare(self) -> DeploymentResult:
+    def open_journal(self, resume: bool = False) -> bool:
+        """Start the deploy journal for this build, or pick it up again with `resume`."""
+        if self.fingerprint is None:
+            self.fingerprint = build_cache.build_fingerprint(self.project_root)
+        self.journal = journal.DeployJournal.open(self.project_root, self.fingerprint, resume)
+        self.resume = resume
+        if resume:
+            platforms = len(self.journal.data['platforms'])
+            files = sum(len(f) for f in self.journal.data['files'].values())
+            log(f"Resuming build {self.fingerprint[:12]}: {platforms} platforms deployed, "
+                f"{files} files uploaded before", 'info')
+        return True
+
+    def count_dist(self):
+        """Record how many files and bytes the build produced."""
+        files = scan_dist(self.dist_dir)
+        self.telemetry.count('dist_files', len(files))
+        self.telemetry.count('dist_bytes', sum(f.stat().st_size for f in files.values()))
+
+    def check_bundle(self, allow_regression: bool = False) -> bool:
+        """Measure first-load bytes per route and check them against the pinned
+        baseline, or the last deployed sizes until one is pinned.
+
+        The report is kept for save_bundle_report() once the deploy succeeds.
+        """
+        self.bundle_report = None
+        if not (self.dist_dir / bundle_budget.MANIFEST_FILE).exists():
+            log("No Vite manifest in dist/, skipping bundle budgets.", 'warning')
+            return True
+
+        try:
+            with self.telemetry.phase('bundle'):
+                report = bundle_budget.analyze(self.project_root, self.dist_dir)
+                previous = bundle_budget.load_previous(self.project_root)
+                budgets, baseline = bundle_budget.load_budgets(), bundle_budget.load_baseline()
+                violations = bundle_budget.check(report, budgets, baseline, previous)
+        except Exception as e:
+            log(f"Bundle analysis failed: {e}", 'error')
+            return False
+        self.bundle_report = report
+
+        self.telemetry.count('bundle_entry_bytes', report.entry)
+        if report.routes:
+            self.telemetry.count('bundle_max_route_bytes', max(report.routes.values()))
+        print_bundle_report(report, previous)
+        if not bundle_budget.enforced(budgets, baseline, previous):
+            log("No pinned bundle baseline or deployed report; sizes are not enforced. "
+                "Run ops/bundle_budget.py --pin after a release build.", 'warning')
+        elif not baseline:
+            log("No pinned bundle baseline; checking against the last deployed sizes.", 'info')
+        for violation in violations:
+            log(f"Bundle {violation.describe()}", 'warning' if allow_regression else 'error')
+        return not violations or allow_regression
+
+    def save_bundle_report(self):
+        """Remember the checked bundle sizes as the last deployed ones."""
+        if self.bundle_report is not None:
+            bundle_budget.save_report(self.project_root, self.bundle_report)
+
+    def precompress(self) -> bool:
+        """Write .gz/.br siblings for compressible assets in dist/.
+
+        Off by default: none of the hosts here serve the siblings (see
+        staging.SERVES_PRECOMPRESSED), so they only help when dist/ itself is
+        served, e.g. by nginx with gzip_static.
+        """
+        if os.getenv('ENABLE_PRECOMPRESS', 'False').lower() not in ('true', '1', 'yes'):
+            return True
+
+        log("Precompressing assets...", 'deploy')
+        if not precompress.HAS_BROTLI:
+            log("brotli not installed. Writing .gz siblings only.", 'warning')
+        try:
+            with self.telemetry.phase('precompress'):
+                stats = precompress.precompress_dist(self.project_root)
+        except Exception as e:
+            log(f"Precompression failed: {e}", 'error')
+            return False
+
+        print_compression_report(stats)
+        return True
+
+    def platform_overlays(self, platforms: List[str]) -> Dict[str, Dict[str, bytes]]:
+        """Platform-specific files to lay over each platform's view of dist/."""
+        rules, headers = cache_headers.render_cache_headers(self.dist_dir, platforms)
+        overlays = {
+            platform: {name: content.encode() for name, content in headers.get(platform, {}).items()}
+            for platform in platforms
+        }
+        if headers:
+            written = sorted({name for files in headers.values() for name in files})
+            log(f"Cache headers: {len(rules.hashed)} immutable assets, {len(rules.html)} HTML paths "
+                f"({', '.join(written)})", 'info')
+
+        if 'github' in overlays:
+            # Keep GitHub from running the site through Jekyll
+            overlays['github']['.nojekyll'] = b''
+            cname = self.project_root / 'CNAME'
+            if cname.exists():
+                overlays['github']['CNAME'] = cname.read_bytes()
+        return overlays
+
+    def stage(self) -> bool:
+        """Build each enabled platform's own view of dist/ with its overlay files."""
+        platforms = [key for key, _ in get_enabled_platforms() if key in staging.STAGED_PLATFORMS]
+        try:
+            with self.telemetry.phase('stage'):
+                overlays = self.platform_overlays(platforms)
+                self.stages, stats = staging.stage_all(self.project_root, self.dist_dir, overlays)
+        except Exception as e:
+            log(f"Failed to stage platform trees: {e}", 'error')
+            return False
+
+        if stats:
+            linked = sum(st.linked for st in stats)
+            reused = sum(st.reused for st in stats)
+            copied = sum(st.copied for st in stats)
+            log(f"Staged {len(stats)} platform trees: {linked} linked, {reused} reused"
+                + (f", {copied} copied" if copied else ""), 'info')
+        return True
+
+    def prefetch_listings(self) -> bool:
+        """List remote files for the diffing deploys while dist/ is still being built.
+
+        Never fails: without a listing the sync fetches one itself.
+        """
+        enabled = {key for key, _ in get_enabled_platforms()}
+        api_key = os.getenv('NEOCITIES_API_KEY')
+        if 'neocities' not in enabled or not api_key or \
+                os.getenv('NEOCITIES_SYNC_MODE', 'diff').lower() == 'full':
+            return True
+
+        client = self.client('neocities', lambda: neocities.NeocitiesClient(api_key))
+        if client.remote is None:
+            try:
+                with self.telemetry.phase('listing', 'neocities'):
+                    client.remote = client.list_files()
+            except Exception as e:
+                log(f"Neocities: could not list files ahead of the deploy ({e})", 'warning')
+        return True
+
+    def stage_path(self, platform: str) -> Path:
+        """The directory a platform deploys from (dist/ if it was not staged)."""
+        return self.stages.get(platform, self.dist_dir)
+
+    async def deploy_cloudflare(self) -> DeploymentResult:
         """Deploy to Cloudflare Pages."""
+        if cloudflare_pages.native_available():
+            return await self.deploy_cloudflare_direct()
+
         start = time.time()
 
-        if not check_cli('wrangler'):
-            if not install_cli('wrangler'):
-                return DeploymentResult('Cloudflare Pages', False, error="Failed to install wrangler")
+        wrangler = self.tools.get('wrangler')
+        if not wrangler:
+            return DeploymentResult('Cloudflare Pages', False, error="wrangler CLI not installed")
 
         project = os.getenv('CF_PAGES_PROJECT', 'office-os')
         branch = os.getenv('CF_PAGES_BRANCH', 'main')
 
-        cmd = f"wrangler pages deploy dist --project-name={project} --branch={branch} --commit-dirty=true"
-        success, output = run_command(cmd, self.project_root, timeout=120)
+        cmd = f"{toolchain.command(wrangler)} pages deploy \"{self.stage_path('cloudflare')}\" --project-name={project} --branch={branch} --commit-dirty=true"
+        run = await stream_command(cmd, self.project_root, url_pattern=URL_PATTERNS['cloudflare'],
+                                   prefix='[cloudflare]')
+        self.record_command('cloudflare', run)
 
         url = None
-        if success:
-            # Extract URL from output
-            for line in output.split('\n'):
-                if 'pages.dev' in line:
-                    import re
-                    match = re.search(r'https://[^\s]+\.pages\.dev', line)
-                    if match:
-                        url = match.group(0)
-                        break
-            if not url:
-                url = f"https://{project}.pages.dev"
+        if run.success:
+            url = run.url or f"https://{project}.pages.dev"
 
         return DeploymentResult(
-            'Cloudflare Pages', success, url,
-            error=output if not success else None,
-            duration=time.time() - start
+            'Cloudflare Pages', run.success, url,
+            error=run.output if not run.success else None,
+            duration=time.time() - start,
+            exit_code=run.returncode
         )
 
-    def deploy_vercel(self) -> DeploymentResult:
+    async def deploy_cloudflare_direct(self) -> DeploymentResult:
+        """Deploy to Cloudflare Pages via direct upload, sending only missing assets."""
+        start = time.time()
+
+        project = os.getenv('CF_PAGES_PROJECT', 'office-os')
+        branch = os.getenv('CF_PAGES_BRANCH', 'main')
+
+        # requests is blocking, so the upload runs in a worker thread and is
+        # told to stop between buckets if the platform deadline passes
+        cancel = threading.Event()
+        try:
+            client = self.client('cloudflare', lambda: cloudflare_pages.PagesClient(
+                os.getenv('CLOUDFLARE_API_TOKEN'), os.getenv('CLOUDFLARE_ACCOUNT_ID'), project
+            ))
+            deploy = await run_in_thread(cancel, cloudflare_pages.deploy, client,
+                                         self.stage_path('cloudflare'), branch, cancel)
+
+            if deploy.errors:
+                return DeploymentResult(
+                    'Cloudflare Pages', False,
+                    error=f"Failed to upload {len(deploy.errors)} buckets: {deploy.errors[:3]}",
+                    duration=time.time() - start
+                )
+
+            self.telemetry.record('upload', deploy.duration, 'cloudflare')
+            self.telemetry.count('files', deploy.uploaded, 'cloudflare')
+            self.telemetry.count('bytes', deploy.bytes_uploaded, 'cloudflare')
+            log(f"Cloudflare Pages: {deploy.uploaded} uploaded, {deploy.unchanged} unchanged "
+                f"({deploy.files_per_sec:.1f} files/s, {deploy.bytes_per_sec / 1024:.0f} KiB/s)", 'info')
+            return DeploymentResult(
+                'Cloudflare Pages', True, deploy.url or f"https://{project}.pages.dev",
+                duration=time.time() - start
+            )
+
+        except Exception as e:
+            return DeploymentResult(
+                'Cloudflare Pages', False, error=str(e),
+                duration=time.time() - start
+            )
+
+    async def deploy_vercel(self) -> DeploymentResult:
         """Deploy to Vercel."""
         start = time.time()
 
-        if not check_cli('vercel'):
-            if not install_cli('vercel'):
-                return DeploymentResult('Vercel', False, error="Failed to install vercel CLI")
+        vercel = self.tools.get('vercel')
+        if not vercel:
+            return DeploymentResult('Vercel', False, error="vercel CLI not installed")
 
         token = os.getenv('VERCEL_TOKEN')
         if not token:
             return DeploymentResult('Vercel', False, error="VERCEL_TOKEN not set")
 
-        cmd = f"vercel deploy --prod --yes --token={token} dist"
-        success, output = run_command(cmd, self.project_root, timeout=120)
-
-        url = None
-        if success:
-            for line in output.split('\n'):
-                if 'vercel.app' in line or 'https://' in line:
-                    import re
-                    match = re.search(r'https://[^\s]+', line)
-                    if match:
-                        url = match.group(0)
-                        break
+        cmd = f"{toolchain.command(vercel)} deploy --prod --yes --token={token} \"{self.stage_path('vercel')}\""
+        run = await stream_command(cmd, self.project_root, url_pattern=URL_PATTERNS['vercel'],
+                                   prefix='[vercel]')
+        self.record_command('vercel', run)
 
         return DeploymentResult(
-            'Vercel', success, url,
-            error=output if not success else None,
-            duration=time.time() - start
+            'Vercel', run.success, run.url if run.success else None,
+            error=run.output if not run.success else None,
+            duration=time.time() - start,
+            exit_code=run.returncode
         )
 
-    def deploy_netlify(self) -> DeploymentResult:
-        """Deploy to Netlify."""
+    async def deploy_netlify(self) -> DeploymentResult:
+        """Deploy to Netlify: the API with a site ID, else netlify-cli and the linked site."""
+        if netlify_api.native_available():
+            return await self.deploy_netlify_api()
+
         start = time.time()
 
-        if not check_cli('netlify'):
-            if not install_cli('netlify', 'netlify-cli'):
-                return DeploymentResult('Netlify', False, error="Failed to install netlify CLI")
+        netlify = self.tools.get('netlify')
+        if not netlify:
+            return DeploymentResult('Netlify', False, error="netlify CLI not installed")
 
         token = os.getenv('NETLIFY_AUTH_TOKEN')
-        site_id = os.getenv('NETLIFY_SITE_ID')
-
         if not token:
             return DeploymentResult('Netlify', False, error="NETLIFY_AUTH_TOKEN not set")
 
-        site_flag = f"--site={site_id}" if site_id else ""
-        cmd = f"netlify deploy --prod --dir=dist {site_flag} --auth={token}"
-        success, output = run_command(cmd, self.project_root, timeout=120)
-
-        url = None
-        if success:
-            for line in output.split('\n'):
-                if 'netlify.app' in line or 'Website URL' in line:
-                    import re
-                    match = re.search(r'https://[^\s]+', line)
-                    if match:
-                        url = match.group(0)
-                        break
+        cmd = f"{toolchain.command(netlify)} deploy --prod --dir=\"{self.stage_path('netlify')}\" --auth={token}"
+        run = await stream_command(cmd, self.project_root, url_pattern=URL_PATTERNS['netlify'],
+                                   prefix='[netlify]')
+        self.record_command('netlify', run)
 
         return DeploymentResult(
-            'Netlify', success, url,
-            error=output if not success else None,
-            duration=time.time() - start
+            'Netlify', run.success, run.url if run.success else None,
+            error=run.output if not run.success else None,
+            duration=time.time() - start,
+            exit_code=run.returncode
         )
 
-    def deploy_surge(self) -> DeploymentResult:
+    async def deploy_netlify_api(self) -> DeploymentResult:
+        """Deploy to Netlify via the API, uploading only files it does not have."""
+        start = time.time()
+
+        token = os.getenv('NETLIFY_AUTH_TOKEN')
+        site_id = os.getenv('NETLIFY_SITE_ID')
+
+        # requests is blocking, so the deploy runs in a worker thread and is
+        # told to stop if the platform deadline passes
+        cancel = threading.Event()
+        try:
+            client = self.client('netlify', lambda: netlify_api.NetlifyClient(token))
+            deploy = await run_in_thread(cancel, netlify_api.deploy, client, site_id,
+                                         self.stage_path('netlify'), cancel)
+
+            if deploy.errors:
+                return DeploymentResult(
+                    'Netlify', False,
+                    error=f"Failed to upload {len(deploy.errors)} files: {deploy.errors[:3]}",
+                    duration=time.time() - start
+                )
+
+            self.telemetry.record('upload', deploy.duration, 'netlify')
+            self.telemetry.count('files', deploy.uploaded, 'netlify')
+            self.telemetry.count('bytes', deploy.bytes_uploaded, 'netlify')
+            log(f"Netlify: {deploy.uploaded} uploaded, {deploy.unchanged} unchanged "
+                f"({deploy.files_per_sec:.1f} files/s, {deploy.bytes_per_sec / 1024:.0f} KiB/s)", 'info')
+            return DeploymentResult(
+                'Netlify', True, deploy.url,
+                duration=time.time() - start
+            )
+
+        except Exception as e:
+            return DeploymentResult(
+                'Netlify', False, error=str(e),
+                duration=time.time() - start
+            )
+
+    async def deploy_surge(self) -> DeploymentResult:
         """Deploy to Surge."""
         start = time.time()
 
-        if not check_cli('surge'):
-            if not install_cli('surge'):
-                return DeploymentResult('Surge', False, error="Failed to install surge CLI")
+        surge = self.tools.get('surge')
+        if not surge:
+            return DeploymentResult('Surge', False, error="surge CLI not installed")
 
         token = os.getenv('SURGE_TOKEN')
         domain = os.getenv('SURGE_DOMAIN', 'office-os.surge.sh')
@@ -276,27 +779,21 @@ class Deployer:
         env = os.environ.copy()
         env['SURGE_TOKEN'] = token
 
-        cmd = f"surge dist {domain}"
-        try:
-            result = subprocess.run(
-                cmd, shell=True, cwd=self.project_root,
-                capture_output=True, text=True, timeout=60, env=env
-            )
-            success = result.returncode == 0
-            output = result.stdout + result.stderr
-        except Exception as e:
-            return DeploymentResult('Surge', False, error=str(e), duration=time.time() - start)
+        cmd = f"{toolchain.command(surge)} \"{self.stage_path('surge')}\" {domain}"
+        run = await stream_command(cmd, self.project_root, env=env, prefix='[surge]')
+        self.record_command('surge', run)
 
-        url = f"https://{domain}" if success else None
+        url = f"https://{domain}" if run.success else None
 
         return DeploymentResult(
-            'Surge', success, url,
-            error=output if not success else None,
-            duration=time.time() - start
+            'Surge', run.success, url,
+            error=run.output if not run.success else None,
+            duration=time.time() - start,
+            exit_code=run.returncode
         )
 
-    def deploy_neocities(self) -> DeploymentResult:
-        """Deploy to Neocities via API."""
+    async def deploy_neocities(self) -> DeploymentResult:
+        """Deploy to Neocities via API, uploading only changed files."""
         start = time.time()
 
         api_key = os.getenv('NEOCITIES_API_KEY')
@@ -305,36 +802,36 @@ class Deployer:
         if not api_key:
             return DeploymentResult('Neocities', False, error="NEOCITIES_API_KEY not set")
 
+        full = os.getenv('NEOCITIES_SYNC_MODE', 'diff').lower() == 'full'
+        delete_stale = os.getenv('NEOCITIES_DELETE_STALE', 'True').lower() in ('true', '1', 'yes')
+
+        # requests is blocking, so the sync runs in a worker thread and is
+        # told to stop between batches if the platform deadline passes
+        cancel = threading.Event()
         try:
-            # Upload all files from dist
-            uploaded = 0
-            errors = []
-
-            for file_path in self.dist_dir.rglob('*'):
-                if file_path.is_file():
-                    relative = file_path.relative_to(self.dist_dir)
-
-                    with open(file_path, 'rb') as f:
-                        files = {str(relative): (str(relative), f)}
-                        response = requests.post(
-                            'https://neocities.org/api/upload',
-                            files=files,
-                            auth=(api_key, ''),
-                            timeout=30
-                        )
-
-                        if response.status_code == 200:
-                            uploaded += 1
-                        else:
-                            errors.append(f"{relative}: {response.text}")
-
-            if errors:
+            client = self.client('neocities', lambda: neocities.NeocitiesClient(api_key))
+            # Files uploaded before an interrupted run need not go again
+            uploaded = self.journal.files('neocities') if self.journal and self.resume else None
+            on_uploaded = (lambda files: self.journal.add_files('neocities', files)) if self.journal else None
+            sync = await run_in_thread(
+                cancel, neocities.sync, client, self.stage_path('neocities'),
+                full=full, delete_stale=delete_stale, cancel=cancel,
+                uploaded=uploaded, on_uploaded=on_uploaded
+            )
+
+            if sync.errors:
                 return DeploymentResult(
                     'Neocities', False,
-                    error=f"Failed to upload {len(errors)} files: {errors[:3]}",
+                    error=f"Failed to sync {len(sync.errors)} files: {sync.errors[:3]}",
                     duration=time.time() - start
                 )
 
+            self.telemetry.record('upload', sync.duration, 'neocities')
+            self.telemetry.count('files', sync.uploaded, 'neocities')
+            self.telemetry.count('bytes', sync.bytes_uploaded, 'neocities')
+            log(f"Neocities: {sync.uploaded} uploaded, {sync.deleted} deleted, "
+                f"{sync.unchanged} unchanged ({sync.files_per_sec:.1f} files/s, "
+                f"{sync.bytes_per_sec / 1024:.0f} KiB/s)", 'info')
             url = f"https://{sitename}.neocities.org" if sitename else "https://neocities.org"
             return DeploymentResult(
                 'Neocities', True, url,
@@ -347,47 +844,46 @@ class Deployer:
                 duration=time.time() - start
             )
 
-    def deploy_github_pages(self) -> DeploymentResult:
-        """Deploy to GitHub Pages."""
+    async def deploy_github_pages(self) -> DeploymentResult:
+        """Deploy to GitHub Pages from the persistent pages checkout."""
         start = time.time()
 
-        if not check_cli('gh'):
-            return DeploymentResult('GitHub Pages', False, error="gh CLI not installed")
+        remote = gh_pages.resolve_remote(self.project_root)
+        if not remote:
+            return DeploymentResult('GitHub Pages', False, error="GH_PAGES_REPO not set and no origin remote")
 
         username = os.getenv('GH_USERNAME', 'chirag127')
 
-        # Use gh-pages package or git commands
+        # git runs in a worker thread; every git command is bounded by the
+        # platform deadline, and the publish stops before committing or
+        # pushing once it passes
+        cancel = threading.Event()
+        deadline = time.monotonic() + PLATFORMS['github'].timeout
         try:
-            # Create .nojekyll to prevent Jekyll processing
-            (self.dist_dir / '.nojekyll').touch()
-
-            # Copy CNAME if exists
-            cname = self.project_root / 'CNAME'
-            if cname.exists():
-                shutil.copy(cname, self.dist_dir / 'CNAME')
-
-            # Deploy using gh-pages or manual git
-            if check_cli('npx'):
-                cmd = "npx gh-pages -d dist"
-                success, output = run_command(cmd, self.project_root, timeout=60)
+            publish = await run_in_thread(
+                cancel, gh_pages.publish, self.project_root, self.stage_path('github'), remote,
+                cancel=cancel, deadline=deadline
+            )
+            self.telemetry.record('upload', publish.duration, 'github')
+            self.telemetry.count('files', publish.changed, 'github')
+            if publish.commit:
+                log(f"GitHub Pages: {len(publish.added)} added, {len(publish.updated)} updated, "
+                    f"{len(publish.deleted)} deleted ({publish.commit[:8]})", 'info')
             else:
-                success, output = False, "npx not available"
-
-            url = f"https://{username}.github.io/office-os" if success else None
+                log("GitHub Pages: no changes, nothing to push", 'info')
 
             return DeploymentResult(
-                'GitHub Pages', success, url,
-                error=output if not success else None,
+                'GitHub Pages', True, f"https://{username}.github.io/office-os",
                 duration=time.time() - start
             )
 
-        except Exception as e:
+        except gh_pages.GitHubPagesError as e:
             return DeploymentResult(
                 'GitHub Pages', False, error=str(e),
                 duration=time.time() - start
             )
 
-    def deploy_render(self) -> DeploymentResult:
+    async def deploy_render(self) -> DeploymentResult:
         """Trigger Render static site deployment."""
         start = time.time()
 
@@ -404,59 +900,217 @@ class Deployer:
             duration=time.time() - start
         )
 
-    def deploy_all(self, parallel: bool = True) -> List[DeploymentResult]:
-        """Deploy to all enabled platforms."""
-        results = []
-
-        # Determine which platforms are enabled
-        enabled_platforms = []
-        for key, config in PLATFORMS.items():
-            env_var = os.getenv(config.enabled_var, 'False')
-            if env_var.lower() in ('true', '1', 'yes'):
-                enabled_platforms.append((key, config))
-                log(f"  {config.name}: enabled", 'info')
-            else:
-                log(f"  {config.name}: disabled", 'warning')
+    async def attempt_deploy(self, config: PlatformConfig) -> DeploymentResult:
+        """Run one deploy attempt under the platform's deadline."""
+        start = time.time()
+        deploy_method = getattr(self, config.deploy_func)
+        try:
+            # On timeout wait_for cancels the deploy and waits until it has
+            # stopped (worker threads included, see run_in_thread), so the
+            # retry below never overlaps it
+            return await asyncio.wait_for(deploy_method(), timeout=config.timeout)
+        except asyncio.TimeoutError:
+            return DeploymentResult(
+                config.name, False, error=f"Timed out after {config.timeout}s",
+                duration=time.time() - start
+            )
+        except Exception as e:
+            return DeploymentResult(config.name, False, error=str(e), duration=time.time() - start)
+
+    async def deploy_platform(self, key: str, config: PlatformConfig, semaphore: asyncio.Semaphore,
+                              breaker: retry.CircuitBreaker, budget: retry.RetryBudget) -> DeploymentResult:
+        """Deploy one platform, retrying transient failures with backoff."""
+        done = self.journal.completed(key) if self.journal and self.resume else None
+        if done:
+            log(f"{config.name}: already deployed from this build, skipping", 'info')
+            return DeploymentResult(config.name, True, done.get('url'), attempts=0, resumed=True)
+
+        policy = config.retry_policy
+        async with semaphore:
+            log(f"Deploying to {config.name}...", 'deploy')
+            start = time.time()
+            attempt = 0
+            while True:
+                attempt += 1
+                result = await self.attempt_deploy(config)
+                if result.success:
+                    breaker.record_success()
+                    break
+
+                breaker.record_failure()
+                if not retry.is_retryable(result.error, result.exit_code):
+                    break
+                if attempt >= policy.max_attempts:
+                    break
+                if breaker.is_open:
+                    log(f"{config.name}: circuit open after {breaker.failures} failures, not retrying", 'warning')
+                    break
+                if not budget.take():
+                    log(f"{config.name}: retry budget exhausted", 'warning')
+                    break
+
+                delay = policy.backoff(attempt)
+                log(f"{config.name}: transient failure, retrying in {delay:.1f}s "
+                    f"(attempt {attempt + 1}/{policy.max_attempts})", 'warning')
+                await asyncio.sleep(delay)
+
+        result.attempts = attempt
+        result.duration = time.time() - start
+        self.telemetry.record('deploy', result.duration, key)
+        self.telemetry.platform_result(key, result.success, result.duration, attempt)
+        if result.success and self.journal:
+            self.journal.complete(key, result.url)
+        if result.success:
+            log(f"{config.name}: {result.url} ({result.duration:.1f}s)", 'success')
+        else:
+            log(f"{config.name}: {result.error}", 'error')
+        return result
 
+    def load_breakers(self, enabled_platforms: List[Tuple[str, PlatformConfig]]) -> Dict[str, retry.CircuitBreaker]:
+        """Circuit breakers for the given platforms, as the last runs left them."""
+        breakers = retry.load_breakers(
+            self.project_root, {key: config.retry_policy for key, config in enabled_platforms}
+        )
+        for key, config in enabled_platforms:
+            if breakers[key].is_open:
+                log(f"  {config.name}: circuit open, single attempt only", 'warning')
+        return breakers
+
+    async def deploy_all_async(self, enabled_platforms: List[Tuple[str, PlatformConfig]],
+                               concurrency: int) -> List[DeploymentResult]:
+        """Run every enabled platform concurrently, bounded by `concurrency`."""
+        # Normally done by preflight(); covers callers that skipped it
+        await self.preflight_async([key for key, _ in enabled_platforms])
+
+        semaphore = asyncio.Semaphore(concurrency)
+        budget = retry.RetryBudget(RETRY_BUDGET)
+        breakers = self.load_breakers(enabled_platforms)
+        tasks = [
+            asyncio.create_task(self.deploy_platform(key, config, semaphore, breakers[key], budget))
+            for key, config in enabled_platforms
+        ]
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            # On interrupt, cancel whatever is still running (kills CLI process groups)
+            for task in tasks:
+                task.cancel()
+            retry.save_breakers(self.project_root, breakers)
+
+    def deploy_all(self, parallel: bool = True, concurrency: Optional[int] = None) -> List[DeploymentResult]:
+        """Deploy to all enabled platforms."""
+        enabled_platforms = announce_platforms()
         if not enabled_platforms:
-            log("No platforms enabled!", 'error')
-            return results
+            return []
 
         log(f"\nDeploying to {len(enabled_platforms)} platforms...", 'deploy')
+        limit = deploy_limit(len(enabled_platforms), parallel, concurrency)
+        return asyncio.run(self.deploy_all_async(enabled_platforms, limit))
 
-        if parallel:
-            # Deploy in parallel
-            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-                futures = {}
-                for key, config in enabled_platforms:
-                    deploy_method = getattr(self, config.deploy_func)
-                    futures[executor.submit(deploy_method)] = config.name
-
-                for future in concurrent.futures.as_completed(futures):
-                    platform_name = futures[future]
-                    try:
-                        result = future.result()
-                        results.append(result)
-                        if result.success:
-                            log(f"{platform_name}: {result.url} ({result.duration:.1f}s)", 'success')
-                        else:
-                            log(f"{platform_name}: {result.error}", 'error')
-                    except Exception as e:
-                        log(f"{platform_name}: {str(e)}", 'error')
-                        results.append(DeploymentResult(platform_name, False, error=str(e)))
-        else:
-            # Deploy sequentially
-            for key, config in enabled_platforms:
-                deploy_method = getattr(self, config.deploy_func)
-                log(f"Deploying to {config.name}...", 'deploy')
-                result = deploy_method()
-                results.append(result)
-                if result.success:
-                    log(f"{config.name}: {result.url} ({result.duration:.1f}s)", 'success')
-                else:
-                    log(f"{config.name}: {result.error}", 'error')
+    def verify(self, results: List[DeploymentResult]) -> List[verify.HostReport]:
+        """Check that every deployed URL serves this build, and how fast.
+
+        Only platforms that published this dist are checked; the others
+        (Render builds from git) serve their own build ID.
+        """
+        keys = {config.name: key for key, config in PLATFORMS.items()}
+        targets = {}
+        for r in results:
+            if not (r.success and r.url):
+                continue
+            if PLATFORMS[keys[r.platform]].needs_dist:
+                targets[keys[r.platform]] = r.url
+            else:
+                log(f"{r.platform}: builds from git, not verified against this build ({r.url})", 'info')
+        if not targets:
+            return []
+
+        log(f"Verifying {len(targets)} hosts...", 'deploy')
+        with self.telemetry.phase('verify'):
+            reports = verify.verify_all(targets, self.project_root, self.dist_dir)
+        for report in reports:
+            for name in ('ttfb_p50', 'ttfb_p95', 'transfer_p50', 'transfer_p95'):
+                value = getattr(report, name)
+                if value is not None:
+                    self.telemetry.count(f"verify_{name}", value, report.platform)
+        print_verification(reports)
+        return reports
+
+def print_compression_report(stats: List[precompress.CompressionStat], top: int = 10):
+    """Print the largest precompressed assets and overall savings."""
+    def fmt(size: Optional[int]) -> str:
+        return f"{size / 1024:.1f} KiB" if size is not None else "-"
+
+    if HAS_RICH:
+        table = Table(title="Precompression")
+        table.add_column("Asset", style="cyan")
+        table.add_column("Original", justify="right")
+        table.add_column("gzip", justify="right", style="green")
+        table.add_column("brotli", justify="right", style="green")
+        for s in stats[:top]:
+            name = f"{s.path} [dim](cached)[/dim]" if s.cached else s.path
+            table.add_row(name, fmt(s.size), fmt(s.gzip_size), fmt(s.brotli_size))
+        console.print(table)
+    else:
+        for s in stats[:top]:
+            cached = " (cached)" if s.cached else ""
+            print(f"  {s.path}{cached}: {fmt(s.size)} -> gz {fmt(s.gzip_size)}, br {fmt(s.brotli_size)}")
+
+    original = sum(s.size for s in stats)
+    gzipped = sum(s.gzip_size or s.size for s in stats)
+    brotlied = sum(s.brotli_size or s.size for s in stats)
+    compressed = sum(1 for s in stats if not s.cached)
+    log(f"{len(stats)} assets ({compressed} compressed, {len(stats) - compressed} cached): "
+        f"{fmt(original)} -> gz {fmt(gzipped)}, br {fmt(brotlied)}", 'info')
+
+def print_bundle_report(report: bundle_budget.BundleReport, previous: Optional[dict], top: int = 10):
+    """Print the heaviest routes and every named chunk, with change since last deploy."""
+    if not HAS_RICH:
+        bundle_budget.print_report(report, previous, top)
+        return
+
+    previous = previous or {}
+
+    def fmt(size: int, before: Optional[int]) -> Tuple[str, str]:
+        change = f"{(size - before) / 1024:+.1f} KiB" if before else "-"
+        return f"{size / 1024:.1f} KiB", change
+
+    table = Table(title=f"Bundle (gzip, entry {report.entry / 1024:.1f} KiB)")
+    table.add_column("Route / chunk", style="cyan")
+    table.add_column("First load", justify="right")
+    table.add_column("Change", justify="right", style="dim")
+    for path, size in sorted(report.routes.items(), key=lambda item: -item[1])[:top]:
+        table.add_row(path, *fmt(size, previous.get('routes', {}).get(path)))
+    for name, size in sorted(report.chunks.items(), key=lambda item: -item[1]):
+        table.add_row(f"[dim]chunk[/dim] {name}", *fmt(size, previous.get('chunks', {}).get(name)))
+    console.print(table)
+    if report.unresolved:
+        log(f"Routes not found in the Vite manifest: {', '.join(report.unresolved)}", 'warning')
+
+def print_verification(reports: List[verify.HostReport]):
+    """Print build status and latency percentiles per host."""
+    if not HAS_RICH:
+        verify.print_reports(reports)
+    else:
+        def ms(value: Optional[float]) -> str:
+            return f"{value * 1000:.0f} ms" if value is not None else "-"
 
-        return results
+        table = Table(title="Verification")
+        table.add_column("Platform", style="cyan")
+        table.add_column("Build", style="bold")
+        table.add_column("Requests", justify="right")
+        table.add_column("TTFB p50", justify="right")
+        table.add_column("TTFB p95", justify="right")
+        table.add_column("Total p50", justify="right")
+        table.add_column("Total p95", justify="right")
+        for r in reports:
+            build = "[green]✅ current[/green]" if r.build_ok else "[red]❌ stale[/red]"
+            table.add_row(r.platform, build, str(len(r.probes)), ms(r.ttfb_p50), ms(r.ttfb_p95),
+                          ms(r.transfer_p50), ms(r.transfer_p95))
+        console.print(table)
+        for r in reports:
+            if not r.healthy:
+                log(f"{r.platform}: {r.describe_problem()}", 'error')
 
 def print_summary(results: List[DeploymentResult]):
     """Print deployment summary."""
@@ -471,6 +1125,10 @@ def print_summary(results: List[DeploymentResult]):
             status = "[green]✅ Success[/green]" if r.success else "[red]❌ Failed[/red]"
             url = r.url or r.error or "-"
             duration = f"{r.duration:.1f}s"
+            if r.resumed:
+                duration = "resumed"
+            elif r.attempts > 1:
+                duration += f" ({r.attempts} tries)"
             table.add_row(r.platform, status, url, duration)
 
         console.print(table)
@@ -481,13 +1139,21 @@ def print_summary(results: List[DeploymentResult]):
         for r in results:
             status = "✅" if r.success else "❌"
             url = r.url or r.error or "-"
-            print(f"{status} {r.platform}: {url} ({r.duration:.1f}s)")
+            tries = f", {r.attempts} tries" if r.attempts > 1 else ""
+            timing = "resumed" if r.resumed else f"{r.duration:.1f}s{tries}"
+            print(f"{status} {r.platform}: {url} ({timing})")
         print("=" * 60)
 
     # Count successes
     successes = sum(1 for r in results if r.success)
     log(f"\n{successes}/{len(results)} deployments successful!", 'success' if successes == len(results) else 'warning')
 
+    peak = telemetry.peak_rss_mib()
+    if peak is not None:
+        in_flight = http_client.upload_budget.peak / (1024 * 1024)
+        log(f"Peak memory: {peak:.0f} MiB RSS ({in_flight:.1f} MiB of uploads in flight at most, "
+            f"cap {http_client.INFLIGHT_BYTES / (1024 * 1024):.0f} MiB)", 'info')
+
     # Print URLs for README
     print("\n📋 URLs for README.md:")
     print("-" * 40)
@@ -495,39 +1161,385 @@ def print_summary(results: List[DeploymentResult]):
         if r.success and r.url:
             print(f"- {r.platform}: {r.url}")
 
+def print_http_stats():
+    """Print API requests, throttling and latency per host for this run."""
+    stats = http_client.host_stats()
+    if not stats:
+        return
+    print("\n🌐 HTTP requests per host:")
+    for host, s in sorted(stats.items(), key=lambda item: -item[1].requests):
+        p50, p95 = s.percentile(0.50), s.percentile(0.95)
+        latency = f"p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms" if p50 is not None else "no responses"
+        extra = []
+        if s.retries:
+            extra.append(f"{s.retries} retried")
+        if s.throttled:
+            extra.append(f"{s.throttled} throttled")
+        if s.waited >= 0.1:
+            extra.append(f"{s.waited:.1f}s rate-limit wait")
+        print(f"  {host}: {s.requests} requests, {latency}" + (f" ({', '.join(extra)})" if extra else ""))
+
 # ============================================================================
 # Main Entry Point
 # ============================================================================
 
+def print_history(project_root: Path, window: int = 10, limit: int = 20):
+    """Show per-phase trends from the deploy history and flag regressions."""
+    runs = telemetry.load_history(project_root)[-limit:]
+    if not runs:
+        log("No deploy history recorded yet.", 'warning')
+        return
+
+    series = telemetry.phase_series(runs)
+    if HAS_RICH:
+        table = Table(title=f"Deploy History (last {len(runs)} runs)")
+        table.add_column("Phase", style="cyan")
+        table.add_column("Platform", style="blue")
+        table.add_column("Last", justify="right")
+        table.add_column("Median", justify="right", style="dim")
+        table.add_column("Trend")
+    for (phase, platform), values in series.items():
+        present = [v for v in values if v is not None]
+        if not present:
+            continue
+        last = f"{values[-1]:.1f}s" if values[-1] is not None else "-"
+        median = f"{statistics.median(present):.1f}s"
+        trend = telemetry.sparkline(values)
+        if HAS_RICH:
+            table.add_row(phase, platform or "-", last, median, trend)
+        else:
+            print(f"  {phase:<12} {platform or '-':<12} {last:>8} {median:>8}  {trend}")
+    if HAS_RICH:
+        console.print(table)
+
+    totals = [run['total'] for run in runs]
+    log(f"Total run time: last {totals[-1]:.1f}s, median {statistics.median(totals):.1f}s", 'info')
+    report_regressions(telemetry.find_regressions(runs, window))
+
+def report_regressions(regressions: List[telemetry.Regression]):
+    """Warn about phases that got slower than their rolling baseline."""
+    if not regressions:
+        log("No phase regressions against the rolling baseline.", 'success')
+    for r in regressions:
+        where = f"{r.platform} {r.phase}" if r.platform else r.phase
+        log(f"Regression: {where} took {r.latest:.1f}s (baseline {r.baseline:.1f}s)", 'warning')
+
+def fastest_dns_target(reports: List[verify.HostReport], current: Optional[str] = None) -> Optional[str]:
+    """CNAME target of the fastest healthy host, unless `current` is not clearly slower."""
+    owner = next((p for p, t in dns_manager.PLATFORM_TARGETS.items() if t == current), None)
+    best = verify.choose_host(reports, dns_manager.PLATFORM_TARGETS, owner)
+    if best is None:
+        log("No healthy host with a DNS target; leaving DNS unchanged.", 'warning')
+        return None
+    target = dns_manager.PLATFORM_TARGETS[best.platform]
+    if best.platform == owner:
+        log(f"Keeping DNS on {best.platform} (p95 {best.transfer_p95 * 1000:.0f} ms); "
+            f"no host is {verify.SWITCH_MARGIN:.0%} faster over {verify.MIN_SAMPLES}+ requests", 'info')
+    else:
+        log(f"Fastest healthy host: {best.platform} (p95 {best.transfer_p95 * 1000:.0f} ms) -> {target}", 'info')
+    return target
+
+def lookup_dns(deployer: Deployer) -> Optional[str]:
+    """Zone ID, which does not depend on the deploy (records do, so they are listed later)."""
+    if not (dns_manager.CF_API_TOKEN or (dns_manager.CF_GLOBAL_API_KEY and dns_manager.CF_EMAIL)):
+        log("Cloudflare credentials not set, skipping DNS", 'warning')
+        return None
+
+    with deployer.telemetry.phase('dns_lookup'):
+        cache = dns_manager.load_cache()
+        zone_id = dns_manager.resolve_zone_id(dns_manager.DOMAIN, cache)
+        if zone_id:
+            dns_manager.save_cache(cache)
+    return zone_id
+
+def reconcile_dns(deployer: Deployer, target: str = dns_manager.TARGET_CNAME,
+                  zone_id: Optional[str] = None, records: Optional[list] = None) -> bool:
+    """Run the DNS manager against the configured zone after deploying.
+
+    `zone_id` is a result of lookup_dns() made earlier in the run; `records`
+    a listing made just now, if the caller needed one to pick the target.
+    """
+    zone_id = zone_id or lookup_dns(deployer)
+    if zone_id is None:
+        return False
+
+    log("Reconciling DNS...", 'deploy')
+    with deployer.telemetry.phase('dns'):
+        ok = dns_manager.reconcile(zone_id, target, records=records)
+    deployer.telemetry.count('dns_api_calls', dns_manager.api_calls)
+    return ok
+
+def finish_run(deployer: Deployer, args):
+    """Persist this run's telemetry and flag regressions."""
+    for host, s in http_client.host_stats().items():
+        deployer.telemetry.count('http_requests', s.requests, host)
+        deployer.telemetry.count('http_throttled', s.throttled, host)
+        if s.latencies:
+            deployer.telemetry.count('http_latency_p95', s.percentile(0.95), host)
+    peak = telemetry.peak_rss_mib()
+    if peak is not None:
+        deployer.telemetry.count('peak_rss_mib', peak)
+    deployer.telemetry.count('upload_inflight_peak_bytes', http_client.upload_budget.peak)
+    deployer.telemetry.write_history(deployer.project_root)
+    if args.metrics_file:
+        deployer.telemetry.write_openmetrics(Path(args.metrics_file))
+    report_regressions(telemetry.find_regressions(telemetry.load_history(deployer.project_root)))
+
+def dist_steps(deployer: Deployer, args, build: bool = True) -> List[Tuple[str, Tuple[str, ...], Callable[[], bool], str]]:
+    """(name, steps it needs, step, message on failure) for producing dist/.
+
+    The bundle check only reads dist/, so it can run beside staging.
+    Precompression is not among them: no host here serves the siblings, so
+    no deploy waits for it (see Deployer.precompress).
+    """
+    steps = []
+    if build:
+        steps.append(('build', (), lambda: deployer.build(force=args.force_build),
+                      "Build failed. Aborting deployment."))
+    after_build = ('build',) if build else ()
+    steps += [
+        ('bundle', after_build, lambda: deployer.check_bundle(allow_regression=args.allow_bundle_regression),
+         "Bundle budgets exceeded. Rerun with --allow-bundle-regression to deploy anyway."),
+        ('stage', after_build, deployer.stage, "Staging failed. Aborting deployment."),
+    ]
+    return steps
+
+def prepare_dist(deployer: Deployer, args, build: bool = True) -> Optional[str]:
+    """Build, check and stage dist/, then precompress it. Returns an error message or None."""
+    for _, _, step, message in dist_steps(deployer, args, build):
+        if not step():
+            return message
+    deployer.precompress()  # logs its own failure; nothing deployed depends on it
+    return None
+
+async def run_pipeline(deployer: Deployer, args, enabled_platforms: List[Tuple[str, PlatformConfig]],
+                       build: bool = True) -> Dict[str, pipeline.TaskRun]:
+    """Build, deploy, verify and reconcile DNS as one dependency graph.
+
+    CLI preflight, remote listings, the DNS lookup and deploys that do not
+    upload dist/ (Render) start right away instead of waiting for the build.
+    With build=False an existing dist/ is deployed as it is.
+    """
+    graph = pipeline.Pipeline()
+
+    async def preflight() -> bool:
+        # Missing tools fail their own platforms, not the whole graph
+        if not await deployer.check_tools():
+            log("Some deploy tools are unavailable; those platforms will fail.", 'warning')
+        return True
+    graph.add('preflight', preflight)
+    graph.add('listings', deployer.prefetch_listings)
+    if args.dns:
+        graph.add('dns_lookup', lambda: lookup_dns(deployer))
+    after_build = ['build'] if build else []
+    for name, deps, step, _ in dist_steps(deployer, args, build):
+        graph.add(name, step, deps)
+    graph.add('precompress', deployer.precompress, after_build)
+    graph.add('journal', lambda: deployer.open_journal(args.resume), after_build)
+
+    semaphore = asyncio.Semaphore(deploy_limit(len(enabled_platforms), not args.sequential, args.concurrency))
+    budget = retry.RetryBudget(RETRY_BUDGET)
+    breakers = deployer.load_breakers(enabled_platforms)
+    cli = set(cli_platforms([key for key, _ in enabled_platforms]))
+    deploys = []
+    for key, config in enabled_platforms:
+        deps = ['bundle', 'stage', 'journal'] if config.needs_dist else []
+        if args.resume and not config.needs_dist:
+            deps.append('journal')  # the skip decision needs the journal
+        if key in cli:
+            deps.append('preflight')
+        if key == 'neocities':
+            deps.append('listings')
+
+        async def deploy(key=key, config=config) -> DeploymentResult:
+            return await deployer.deploy_platform(key, config, semaphore, breakers[key], budget)
+        deploys.append(graph.add(f'deploy:{key}', deploy, deps))
+
+    if not args.no_verify:
+        graph.add('verify', lambda: deployer.verify([graph.value(name) for name in deploys]), deploys)
+
+    if args.dns:
+        if args.dns_fastest:
+            deps = ['verify'] if 'verify' in graph else deploys
+
+            def target(zone_id: str) -> Tuple[Optional[str], Optional[list]]:
+                # Listed now, after the deploys, and reused for the apply
+                records = dns_manager.get_dns_records(zone_id)
+                if records is None:
+                    return None, None
+                reports = graph.value('verify') if 'verify' in graph else []
+                return fastest_dns_target(reports, dns_manager.current_target(records)), records
+        else:
+            # A fixed target only has to wait for the platform it points at
+            owner = next((f'deploy:{p}' for p, t in dns_manager.PLATFORM_TARGETS.items()
+                          if t == dns_manager.TARGET_CNAME and f'deploy:{p}' in graph), None)
+            deps = [owner] if owner else deploys
+
+            def target(zone_id: str) -> Tuple[Optional[str], Optional[list]]:
+                return dns_manager.TARGET_CNAME, None
+
+        def dns() -> bool:
+            zone_id = graph.value('dns_lookup')
+            chosen, records = target(zone_id) if zone_id else (None, None)
+            return chosen is not None and reconcile_dns(deployer, chosen, zone_id, records)
+        graph.add('dns', dns, ['dns_lookup'] + deps)
+
+    try:
+        return await graph.run()
+    finally:
+        retry.save_breakers(deployer.project_root, breakers)
+
+def watch_deploy(deployer: Deployer, args):
+    """Deploy, then redeploy every settled batch of changes until interrupted.
+
+    The deployer stays alive between pushes, so resolved CLIs, API
+    connections and file hashes are reused and only changed files move.
+    """
+    inputs = [deployer.project_root / name for name in build_cache.BUILD_INPUTS]
+    watcher = watch.make_watcher(inputs + [deployer.dist_dir])
+    mode = 'polling' if isinstance(watcher, watch.PollingWatcher) else 'inotify'
+    log(f"Watching {', '.join(build_cache.BUILD_INPUTS)} and dist/ ({mode}). Press Ctrl+C to stop.", 'info')
+
+    rebuild = True
+    pending = set()
+    try:
+        while True:
+            start = time.time()
+            deployer.telemetry = telemetry.Telemetry()
+            http_client.reset_stats()  # each push's history entry counts only its own requests
+            error = prepare_dist(deployer, args, build=rebuild)
+            if error:
+                log(error, 'error')
+            else:
+                results = deployer.deploy_all(parallel=not args.sequential, concurrency=args.concurrency)
+                reports = [] if args.no_verify else deployer.verify(results)
+                ok = all(r.success for r in results) and all(r.healthy for r in reports)
+                if ok:
+                    deployer.save_bundle_report()
+                for r in results:
+                    if not r.success:
+                        log(f"{r.platform}: {r.error}", 'error')
+                log(f"{'Live' if ok else 'Pushed with failures'} in {time.time() - start:.1f}s "
+                    f"({sum(r.success for r in results)}/{len(results)} platforms)", 'success' if ok else 'warning')
+            finish_run(deployer, args)
+
+            # A rebuild rewrote dist/ itself, so its events are ours. Otherwise
+            # dist/ was written elsewhere (e.g. `vite build --watch`) and only
+            # our own precompressed siblings are dropped.
+            pending = {path for path in watcher.poll(0)
+                       if not watch.under(path, deployer.dist_dir)
+                       or not (rebuild or path.endswith(PRECOMPRESSED_SUFFIXES))}
+            changed = watch.collect(watcher, args.debounce, WATCH_MAX_DELAY, pending=pending)
+            rebuild, _ = watch.classify(changed, inputs, deployer.dist_dir)
+            log(f"\n{len(changed)} changed files, "
+                f"{'rebuilding' if rebuild else 'deploying the new dist/'}...", 'deploy')
+    except KeyboardInterrupt:
+        log("Stopped watching.", 'info')
+    finally:
+        watcher.close()
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Office OS multi-platform deployment")
+    parser.add_argument('command', nargs='?', choices=['deploy', 'watch', 'history'], default='deploy',
+                        help="deploy (default), redeploy on every change, or show timing history")
+    parser.add_argument('--force-build', action='store_true',
+                        help="rebuild even if the build inputs are unchanged")
+    parser.add_argument('--concurrency', type=int,
+                        default=int(os.getenv('DEPLOY_CONCURRENCY', '0')) or None,
+                        help="maximum platforms deployed at once (default: all)")
+    parser.add_argument('--sequential', action='store_true',
+                        help="deploy one platform at a time")
+    parser.add_argument('--dns', action='store_true',
+                        help="reconcile DNS records after deploying")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip platforms and files the last run of this build finished")
+    parser.add_argument('--allow-bundle-regression', action='store_true',
+                        help="deploy even if a route or chunk outgrew its budget, the pinned baseline "
+                             "or the last deployed sizes")
+    parser.add_argument('--no-verify', action='store_true',
+                        default=os.getenv('VERIFY_DEPLOYS', 'True').lower() not in ('true', '1', 'yes'),
+                        help="skip checking the deployed hosts")
+    parser.add_argument('--dns-fastest', action='store_true',
+                        help="with --dns, point subdomains at the fastest verified host "
+                             "(the current one stays unless clearly slower)")
+    parser.add_argument('--metrics-file', default=os.getenv('DEPLOY_METRICS_FILE'),
+                        help="also write this run's timings as OpenMetrics text")
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE,
+                        help="watch: seconds without changes before deploying")
+    parser.add_argument('--window', type=int, default=10,
+                        help="runs in the rolling baseline for history/regressions")
+    return parser.parse_args()
+
 def main():
     """Main entry point."""
+    args = parse_args()
+    project_root = Path(__file__).parent.parent.absolute()
+
+    if args.command == 'history':
+        print_history(project_root, args.window)
+        return
+
     print("""
 ╔═══════════════════════════════════════════════════════════╗
 ║     🚀 Office OS Multi-Platform Deployment System 🚀       ║
 ╚═══════════════════════════════════════════════════════════╝
     """)
 
-    project_root = Path(__file__).parent.parent.absolute()
     log(f"Project root: {project_root}", 'info')
 
     deployer = Deployer(project_root)
 
-    # Check enabled platforms
-    log("\nChecking enabled platforms...", 'info')
-
-    # Build first
-    if not deployer.build():
-        log("Build failed. Aborting deployment.", 'error')
+    def abort(message: str):
+        log(message, 'error')
+        finish_run(deployer, args)
         sys.exit(1)
 
-    # Deploy to all platforms
-    results = deployer.deploy_all(parallel=True)
+    if args.command == 'watch':
+        # Resolve deploy CLIs once, before any deploy starts
+        if not deployer.preflight():
+            log("Some deploy tools are unavailable; those platforms will fail.", 'warning')
+        watch_deploy(deployer, args)
+        return
+
+    # Check enabled platforms
+    log("\nChecking enabled platforms...", 'info')
+    enabled_platforms = announce_platforms()
+
+    # Build, deploy, verify and DNS, each step as soon as its inputs are ready
+    runs = asyncio.run(run_pipeline(deployer, args, enabled_platforms))
+    pipeline.print_report(runs)
+    for name, _, _, message in dist_steps(deployer, args):
+        if not runs[name].ok:
+            abort(message)
+
+    results = [
+        runs[f'deploy:{key}'].value if runs[f'deploy:{key}'].ok
+        else DeploymentResult(config.name, False, error=runs[f'deploy:{key}'].error)
+        for key, config in enabled_platforms
+    ]
+    # A verify that failed or was skipped (no deploy succeeded) proves nothing
+    verified = 'verify' not in runs or (runs['verify'].ok and all(r.healthy for r in runs['verify'].value))
+    dns_ok = runs['dns'].ok if 'dns' in runs else True
+
+    # Deploys that finished before the journal was open (Render) go in now
+    if deployer.journal:
+        for (key, _), r in zip(enabled_platforms, results):
+            if r.success:
+                deployer.journal.complete(key, r.url)
+
+    if all(r.success for r in results) and verified:
+        deployer.save_bundle_report()
 
     # Print summary
     print_summary(results)
+    print_http_stats()
+    finish_run(deployer, args)
 
     # Exit with error if any failed
-    if not all(r.success for r in results):
+    if not all(r.success for r in results) or not verified or not dns_ok:
+        if not all(r.success for r in results):
+            log("Rerun with --resume to retry only the platforms and files that failed.", 'info')
         sys.exit(1)
 
 if __name__ == "__main__":
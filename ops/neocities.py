@@ -0,0 +1,218 @@
+"""
+Office OS - Neocities Sync
+Diff-based sync of dist/ against a Neocities site via the public API.
+
+Only new or changed files (by SHA1) are uploaded and files that no longer
+exist locally are deleted. Uploads are grouped into multi-file requests and
+sent concurrently through the shared, rate-limited HTTP client. Request
+bodies are streamed from disk, so a batch of large assets costs a fixed
+buffer instead of its size in memory. Point NEOCITIES_API_URL at a local
+server to test.
+"""
+import os
+import time
+import requests
+import threading
+import concurrent.futures
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dist_scan import scan_dist, hash_dist, PRECOMPRESSED_SUFFIXES
+from cache_headers import GENERATED_FILES
+from http_client import HttpClient, upload_budget
+from streaming import multipart_body
+
+API_BASE = os.getenv('NEOCITIES_API_URL', 'https://neocities.org/api')
+
+# Neocities refuses to delete the site root document
+PROTECTED_PATHS = {'index.html'}
+
+# Upload batching: files per multipart request and a soft cap on its size
+BATCH_MAX_FILES = int(os.getenv('NEOCITIES_BATCH_FILES', '20'))
+BATCH_MAX_BYTES = 8 * 1024 * 1024
+UPLOAD_WORKERS = int(os.getenv('NEOCITIES_UPLOAD_WORKERS', '4'))
+
+
+class NeocitiesError(Exception):
+    """Raised when the Neocities API rejects a request."""
+
+
+@dataclass
+class SyncPlan:
+    """Files to upload and delete to make the remote match dist."""
+    upload: List[str] = field(default_factory=list)
+    delete: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+
+@dataclass
+class SyncResult:
+    """Outcome of a sync run."""
+    uploaded: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    bytes_uploaded: int = 0
+    duration: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.uploaded / self.duration if self.duration else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes_uploaded / self.duration if self.duration else 0.0
+
+
+class NeocitiesClient:
+    """Minimal client for the Neocities site API."""
+
+    def __init__(self, api_key: str, api_base: str = API_BASE,
+                 timeout: Tuple[int, int] = (10, 120), workers: int = UPLOAD_WORKERS):
+        self.api_base = api_base.rstrip('/')
+        self.timeout = timeout
+        self.workers = workers
+        # One keep-alive pool shared by all upload threads
+        self.http = HttpClient(auth=(api_key, ''), pool_size=workers)
+        # SHA1s by file stat, and the site as this client last left (or
+        # listed) it; both let a long-lived client skip rehashing and relisting
+        self.hash_cache: Dict[str, tuple] = {}
+        self.remote: Optional[Dict[str, str]] = None
+
+    def _check(self, response: requests.Response) -> dict:
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        if response.status_code != 200 or payload.get('result') != 'success':
+            message = payload.get('message') or response.text
+            raise NeocitiesError(f"HTTP {response.status_code}: {message}")
+        return payload
+
+    def list_files(self) -> Dict[str, str]:
+        """Return {path: sha1} for every file on the site."""
+        response = self.http.get(f"{self.api_base}/list", timeout=self.timeout)
+        payload = self._check(response)
+        return {
+            entry['path']: entry.get('sha1_hash')
+            for entry in payload.get('files', [])
+            if not entry.get('is_directory')
+        }
+
+    def upload(self, files: Dict[str, Path]):
+        """Upload several files in one multipart request, streamed from disk."""
+        with multipart_body(files) as body, upload_budget.reserve(len(body)):
+            # Re-uploading a file just overwrites it, so retries are safe
+            response = self.http.post(
+                f"{self.api_base}/upload", data=body, headers={'Content-Type': body.content_type},
+                timeout=self.timeout, idempotent=True
+            )
+        self._check(response)
+
+    def delete(self, paths: List[str]):
+        """Delete files from the site."""
+        response = self.http.post(
+            f"{self.api_base}/delete",
+            data={'filenames[]': paths},
+            timeout=self.timeout,
+            idempotent=True
+        )
+        self._check(response)
+
+
+def plan_sync(local: Dict[str, str], remote: Dict[str, str], delete_stale: bool = True) -> SyncPlan:
+    """Compare local and remote hashes and work out the minimal change set."""
+    plan = SyncPlan()
+    for path, sha1 in local.items():
+        if remote.get(path) == sha1:
+            plan.unchanged += 1
+        else:
+            plan.upload.append(path)
+    if delete_stale:
+        plan.delete = sorted(
+            path for path in remote
+            if path not in local and path not in PROTECTED_PATHS
+        )
+    return plan
+
+
+def make_batches(files: Dict[str, Path], max_files: int = BATCH_MAX_FILES,
+                 max_bytes: int = BATCH_MAX_BYTES) -> List[Dict[str, Path]]:
+    """Group files into upload batches bounded by count and total size."""
+    batches = []
+    batch, batch_bytes = {}, 0
+    for relative, file_path in files.items():
+        size = file_path.stat().st_size
+        if batch and (len(batch) >= max_files or batch_bytes + size > max_bytes):
+            batches.append(batch)
+            batch, batch_bytes = {}, 0
+        batch[relative] = file_path
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def sync(client: NeocitiesClient, dist_dir: Path, full: bool = False,
+         delete_stale: bool = True, cancel: Optional[threading.Event] = None,
+         uploaded: Optional[Dict[str, str]] = None,
+         on_uploaded: Optional[Callable[[Dict[str, str]], None]] = None) -> SyncResult:
+    """Make the Neocities site match dist, uploading only what changed.
+
+    Setting `cancel` stops any batch that has not started yet. `uploaded`
+    is {path: sha1} already sent by an earlier, interrupted run (see
+    journal); those files are skipped even in full mode. `on_uploaded` is
+    called with {path: sha1} after every batch that went through.
+    """
+    # Neocities serves its own compression and rejects .gz/.br uploads,
+    # and other hosts' header files are meaningless there
+    files = scan_dist(dist_dir, PRECOMPRESSED_SUFFIXES, GENERATED_FILES)
+    local = {}
+    if not full or uploaded or on_uploaded:
+        local = hash_dist(dist_dir, PRECOMPRESSED_SUFFIXES, GENERATED_FILES, cache=client.hash_cache)
+    if full:
+        plan = SyncPlan(upload=list(files))
+    else:
+        remote = client.remote if client.remote is not None else client.list_files()
+        plan = plan_sync(local, remote, delete_stale)
+    if uploaded:
+        done = [relative for relative in plan.upload if uploaded.get(relative) == local[relative]]
+        plan.upload = [relative for relative in plan.upload if uploaded.get(relative) != local[relative]]
+        plan.unchanged += len(done)
+
+    result = SyncResult(unchanged=plan.unchanged)
+    batches = make_batches({relative: files[relative] for relative in plan.upload})
+    start = time.time()
+
+    def upload_batch(batch: Dict[str, Path]) -> int:
+        if cancel is not None and cancel.is_set():
+            raise NeocitiesError("sync cancelled")
+        client.upload(batch)
+        if on_uploaded is not None:
+            on_uploaded({relative: local[relative] for relative in batch})
+        return sum(file_path.stat().st_size for file_path in batch.values())
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=client.workers) as executor:
+        futures = {executor.submit(upload_batch, batch): batch for batch in batches}
+        for future in concurrent.futures.as_completed(futures):
+            batch = futures[future]
+            try:
+                result.bytes_uploaded += future.result()
+                result.uploaded += len(batch)
+            except (NeocitiesError, requests.RequestException, OSError) as e:
+                result.errors.extend(f"{relative}: {e}" for relative in batch)
+    result.duration = time.time() - start
+
+    if plan.delete and not result.errors and not (cancel and cancel.is_set()):
+        try:
+            client.delete(plan.delete)
+            result.deleted = len(plan.delete)
+        except (NeocitiesError, requests.RequestException) as e:
+            result.errors.append(f"delete: {e}")
+
+    # Trust our own view of the site only after a complete, clean sync
+    client.remote = None
+    if not full and not result.errors and not (cancel and cancel.is_set()):
+        client.remote = {**{path: remote[path] for path in remote if path not in plan.delete}, **local}
+    return result
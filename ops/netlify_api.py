@@ -0,0 +1,175 @@
+"""
+Office OS - Netlify Deploy
+Digest-based deploys through the Netlify API, without netlify-cli.
+
+dist/ is hashed locally and posted as a SHA1 manifest. Netlify answers with
+the digests it does not already have; only those files are uploaded, with
+concurrent PUTs through the shared, rate-limited HTTP client, and the deploy is polled until it is
+live. Unchanged assets cost nothing. Point NETLIFY_API_URL at a local server
+to test.
+"""
+import os
+import time
+import requests
+import threading
+import concurrent.futures
+from urllib.parse import quote
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from dist_scan import scan_dist, hash_dist, PRECOMPRESSED_SUFFIXES
+from cache_headers import GENERATED_FILES, PLATFORM_FORMATS
+from http_client import HttpClient, upload_budget
+
+API_BASE = os.getenv('NETLIFY_API_URL', 'https://api.netlify.com/api/v1')
+UPLOAD_WORKERS = int(os.getenv('NETLIFY_UPLOAD_WORKERS', '8'))
+
+POLL_INTERVAL = 1.0  # seconds between deploy state checks
+READY_STATES = {'ready'}
+FAILED_STATES = {'error', 'rejected'}
+
+# Netlify compresses on its own edge and only reads its own header file
+EXCLUDE_PATHS = tuple(name for name in GENERATED_FILES if name != PLATFORM_FORMATS['netlify'])
+
+
+def native_available() -> bool:
+    """True when the API can be used instead of netlify-cli (it needs the site ID)."""
+    return bool(os.getenv('NETLIFY_AUTH_TOKEN')) and bool(os.getenv('NETLIFY_SITE_ID'))
+
+
+class NetlifyError(Exception):
+    """Raised when the Netlify API rejects a request or a deploy fails."""
+
+
+@dataclass
+class DeployResult:
+    """Outcome of a digest deploy."""
+    deploy_id: Optional[str] = None
+    url: Optional[str] = None
+    uploaded: int = 0
+    unchanged: int = 0
+    bytes_uploaded: int = 0
+    duration: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.uploaded / self.duration if self.duration else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes_uploaded / self.duration if self.duration else 0.0
+
+
+class NetlifyClient:
+    """Minimal client for the Netlify deploy API."""
+
+    def __init__(self, token: str, api_base: str = API_BASE,
+                 timeout: Tuple[int, int] = (10, 120), workers: int = UPLOAD_WORKERS):
+        self.api_base = api_base.rstrip('/')
+        self.timeout = timeout
+        self.workers = workers
+        # One keep-alive pool shared by all upload threads
+        self.http = HttpClient(headers={'Authorization': f"Bearer {token}"}, pool_size=workers)
+        # SHA1s by file stat, reused while the client stays alive
+        self.hash_cache: Dict[str, tuple] = {}
+
+    def _check(self, response: requests.Response) -> dict:
+        if response.status_code not in (200, 201):
+            try:
+                message = response.json().get('message') or response.text
+            except ValueError:
+                message = response.text
+            raise NetlifyError(f"HTTP {response.status_code}: {message}")
+        return response.json()
+
+    def create_deploy(self, site_id: str, files: Dict[str, str]) -> dict:
+        """Post the {"/path": sha1} manifest; returns the deploy with `required` digests."""
+        response = self.http.post(
+            f"{self.api_base}/sites/{site_id}/deploys",
+            json={'files': files, 'draft': False},
+            timeout=self.timeout
+        )
+        return self._check(response)
+
+    def get_deploy(self, deploy_id: str) -> dict:
+        response = self.http.get(f"{self.api_base}/deploys/{deploy_id}", timeout=self.timeout)
+        return self._check(response)
+
+    def upload_file(self, deploy_id: str, relative: str, file_path: Path) -> int:
+        """PUT one file into the deploy. Returns the bytes sent."""
+        size = file_path.stat().st_size
+        with open(file_path, 'rb') as f, upload_budget.reserve(size):
+            response = self.http.put(
+                f"{self.api_base}/deploys/{deploy_id}/files/{quote(relative)}",
+                data=f,
+                headers={'Content-Type': 'application/octet-stream'},
+                timeout=self.timeout
+            )
+        self._check(response)
+        return size
+
+
+def wait_until_ready(client: NetlifyClient, deploy_id: str,
+                     cancel: Optional[threading.Event] = None) -> dict:
+    """Poll the deploy until Netlify reports it live."""
+    stop = cancel or threading.Event()
+    while True:
+        deploy = client.get_deploy(deploy_id)
+        state = deploy.get('state')
+        if state in READY_STATES:
+            return deploy
+        if state in FAILED_STATES:
+            raise NetlifyError(f"deploy {deploy_id} {state}: {deploy.get('error_message') or 'no details'}")
+        if stop.wait(POLL_INTERVAL):
+            raise NetlifyError("deploy cancelled")
+
+
+def deploy(client: NetlifyClient, site_id: str, dist_dir: Path,
+           cancel: Optional[threading.Event] = None) -> DeployResult:
+    """Deploy dist to the site, uploading only files Netlify does not have.
+
+    Setting `cancel` stops any upload that has not started yet.
+    """
+    files = scan_dist(dist_dir, PRECOMPRESSED_SUFFIXES, EXCLUDE_PATHS)
+    hashes = hash_dist(dist_dir, PRECOMPRESSED_SUFFIXES, EXCLUDE_PATHS, cache=client.hash_cache)
+    created = client.create_deploy(site_id, {f"/{relative}": sha1 for relative, sha1 in hashes.items()})
+    deploy_id = created['id']
+
+    # Identical files share a digest, so one upload satisfies all of them
+    required = set(created.get('required') or [])
+    pending = set(required)
+    uploads = []
+    for relative, sha1 in hashes.items():
+        if sha1 in pending:
+            uploads.append(relative)
+            pending.discard(sha1)
+
+    # Per path: a new file is not unchanged just because its content is shared
+    result = DeployResult(deploy_id=deploy_id,
+                          unchanged=sum(1 for sha1 in hashes.values() if sha1 not in required))
+    start = time.time()
+
+    def upload(relative: str) -> int:
+        if cancel is not None and cancel.is_set():
+            raise NetlifyError("deploy cancelled")
+        return client.upload_file(deploy_id, relative, files[relative])
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=client.workers) as executor:
+        futures = {executor.submit(upload, relative): relative for relative in uploads}
+        for future in concurrent.futures.as_completed(futures):
+            relative = futures[future]
+            try:
+                result.bytes_uploaded += future.result()
+                result.uploaded += 1
+            except (NetlifyError, requests.RequestException, OSError) as e:
+                result.errors.append(f"{relative}: {e}")
+    result.duration = time.time() - start
+
+    if result.errors:
+        return result
+
+    ready = wait_until_ready(client, deploy_id, cancel)
+    result.url = ready.get('ssl_url') or ready.get('url')
+    return result
@@ -0,0 +1,145 @@
+"""
+Office OS - Deploy Pipeline
+Runs the deploy as a graph of tasks instead of a fixed sequence.
+
+Each task names the tasks whose output it needs. The scheduler starts a
+task as soon as all of those have finished, so work that does not need
+dist/ (CLI preflight, the DNS zone lookup, remote file listings, the Render
+trigger) overlaps the build instead of queueing behind it. Blocking
+functions run in worker threads; coroutine functions run on the loop.
+
+A task fails when it raises or returns False. Tasks that depend on a
+failed task are skipped; everything else still runs to completion.
+
+After a run, `critical_path()` walks back from the task that finished last
+through the dependency each task waited on longest. That chain is what
+bounds the wall time: speeding up anything off it does not make the deploy
+any faster.
+"""
+import time
+import asyncio
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+OK = 'ok'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+@dataclass
+class Task:
+    """One unit of work and the tasks it has to wait for."""
+    name: str
+    func: Callable[[], Any]
+    deps: Tuple[str, ...] = ()
+
+
+@dataclass
+class TaskRun:
+    """When a task ran, relative to the start of the pipeline, and how it ended."""
+    name: str
+    deps: Tuple[str, ...]
+    status: str = SKIPPED
+    start: float = 0.0
+    end: float = 0.0
+    value: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Pipeline:
+    """A DAG of tasks. Dependencies must be added before the tasks that use them."""
+
+    def __init__(self):
+        self.tasks: Dict[str, Task] = {}
+        self.runs: Dict[str, TaskRun] = {}
+
+    def add(self, name: str, func: Callable[[], Any], deps: Sequence[str] = ()) -> str:
+        if name in self.tasks:
+            raise ValueError(f"duplicate task {name}")
+        missing = [dep for dep in deps if dep not in self.tasks]
+        if missing:
+            raise ValueError(f"{name} depends on unknown tasks: {', '.join(missing)}")
+        self.tasks[name] = Task(name, func, tuple(deps))
+        return name
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.tasks
+
+    def value(self, name: str) -> Any:
+        """What a finished task returned; for tasks to read their dependencies' output."""
+        return self.runs[name].value
+
+    async def run(self) -> Dict[str, TaskRun]:
+        """Run every task as soon as its dependencies are done. Returns runs by name."""
+        origin = time.perf_counter()
+        self.runs = {}
+        pending: Dict[str, asyncio.Task] = {}
+
+        async def execute(task: Task) -> TaskRun:
+            run = self.runs[task.name] = TaskRun(task.name, task.deps)
+            deps = await asyncio.gather(*(pending[dep] for dep in task.deps))
+            run.start = run.end = time.perf_counter() - origin
+            if not all(dep.ok for dep in deps):
+                run.error = 'needs ' + ', '.join(dep.name for dep in deps if not dep.ok)
+                return run
+            try:
+                if inspect.iscoroutinefunction(task.func):
+                    run.value = await task.func()
+                else:
+                    run.value = await asyncio.to_thread(task.func)
+                run.status = FAILED if run.value is False else OK
+            except Exception as e:
+                run.status, run.error = FAILED, str(e) or type(e).__name__
+            run.end = time.perf_counter() - origin
+            return run
+
+        # Insertion order is a topological order, so every dependency
+        # already has its asyncio task when a dependent is created
+        for task in self.tasks.values():
+            pending[task.name] = asyncio.create_task(execute(task))
+        try:
+            runs = await asyncio.gather(*pending.values())
+        finally:
+            for future in pending.values():
+                future.cancel()
+        return {run.name: run for run in runs}
+
+
+def critical_path(runs: Dict[str, TaskRun]) -> List[TaskRun]:
+    """The chain of tasks that bounded the wall time, first task first."""
+    if not runs:
+        return []
+    current = max(runs.values(), key=lambda run: run.end)
+    path = [current]
+    while current.deps:
+        current = max((runs[dep] for dep in current.deps), key=lambda run: run.end)
+        path.append(current)
+    return path[::-1]
+
+
+def print_report(runs: Dict[str, TaskRun]):
+    """Plain-text timeline with the critical path marked."""
+    if not runs:
+        return
+    critical = {run.name for run in critical_path(runs)}
+    wall = max(run.end for run in runs.values())
+    busy = sum(run.duration for run in runs.values())
+    width = max(len(name) for name in runs)
+
+    print(f"\n🧭 Pipeline ({wall:.1f}s wall, {busy:.1f}s of task time, * = critical path):")
+    for run in sorted(runs.values(), key=lambda run: (run.start, run.end)):
+        marker = '*' if run.name in critical else ' '
+        status = '' if run.ok else f"  {run.status}" + (f": {run.error}" if run.error else '')
+        print(f"  {marker} {run.name:<{width}} {run.start:>7.1f}s → {run.end:>7.1f}s "
+              f"{run.duration:>7.1f}s{status}")
+    chain = ' → '.join(run.name for run in critical_path(runs))
+    print(f"  Critical path: {chain}")
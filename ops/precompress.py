@@ -0,0 +1,145 @@
+"""
+Office OS - Precompression
+Writes .gz and .br siblings next to compressible dist assets so hosts that
+serve precompressed files can skip on-the-fly compression.
+
+Compression runs in a pool of spawned processes across all cores. A small cache keyed by
+mtime/size (falling back to SHA1) skips assets that were already compressed.
+Brotli output needs the optional `brotli` package; without it only gzip is
+written.
+"""
+import os
+import gzip
+import json
+import multiprocessing
+import concurrent.futures
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from dist_scan import scan_dist, sha1_file
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.html', '.js', '.mjs', '.css', '.svg', '.json', '.wasm',
+    '.txt', '.xml', '.map', '.ico', '.webmanifest',
+}
+MIN_SIZE = 1024  # bytes; smaller files are not worth a sibling
+CACHE_FILE = '.deploy-cache/precompress.json'
+
+
+@dataclass
+class CompressionStat:
+    """Sizes for one compressed asset (None when no sibling was written)."""
+    path: str
+    size: int
+    gzip_size: Optional[int] = None
+    brotli_size: Optional[int] = None
+    cached: bool = False
+
+
+def _write_sibling(target: Path, data: bytes, original_size: int) -> Optional[int]:
+    """Write a compressed sibling only if it is actually smaller."""
+    if len(data) >= original_size:
+        target.unlink(missing_ok=True)
+        return None
+    target.write_bytes(data)
+    return len(data)
+
+
+def compress_file(path: str, relative: str, use_brotli: bool) -> CompressionStat:
+    """Compress one file to .gz (and .br). Runs in a worker process."""
+    file_path = Path(path)
+    data = file_path.read_bytes()
+    stat = CompressionStat(relative, len(data))
+    # mtime=0 keeps the gzip output byte-identical across builds
+    stat.gzip_size = _write_sibling(
+        file_path.with_name(file_path.name + '.gz'),
+        gzip.compress(data, compresslevel=9, mtime=0), len(data)
+    )
+    if use_brotli:
+        stat.brotli_size = _write_sibling(
+            file_path.with_name(file_path.name + '.br'),
+            brotli.compress(data, quality=11), len(data)
+        )
+    return stat
+
+
+def _load_cache(cache_path: Path) -> Dict[str, dict]:
+    try:
+        return json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _siblings_present(file_path: Path, entry: dict) -> bool:
+    for suffix, key in (('.gz', 'gzip_size'), ('.br', 'brotli_size')):
+        if entry.get(key) is not None and not file_path.with_name(file_path.name + suffix).exists():
+            return False
+    return True
+
+
+def precompress_dist(project_root: Path, workers: Optional[int] = None) -> List[CompressionStat]:
+    """Precompress every compressible asset in dist/, reusing cached results."""
+    dist_dir = project_root / 'dist'
+    cache_path = project_root / CACHE_FILE
+    cache = _load_cache(cache_path)
+    use_brotli = HAS_BROTLI
+
+    stats, pending = [], {}
+    for relative, file_path in scan_dist(dist_dir).items():
+        if file_path.suffix.lower() not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        st = file_path.stat()
+        if st.st_size < MIN_SIZE:
+            continue
+
+        entry = cache.get(relative)
+        if entry and entry.get('brotli') == use_brotli and _siblings_present(file_path, entry):
+            unchanged = entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size
+            if not unchanged and entry['size'] == st.st_size:
+                # Rebuilt with identical content: only the mtime moved
+                unchanged = entry['sha1'] == sha1_file(file_path)
+                if unchanged:
+                    entry['mtime_ns'] = st.st_mtime_ns
+            if unchanged:
+                stats.append(CompressionStat(
+                    relative, st.st_size, entry.get('gzip_size'), entry.get('brotli_size'), cached=True
+                ))
+                continue
+        pending[relative] = file_path
+
+    # Spawned, not forked: the deploy pipeline calls this from a worker thread
+    # while other threads hold locks a forked child would inherit
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                                mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {
+            executor.submit(compress_file, str(file_path), relative, use_brotli): relative
+            for relative, file_path in pending.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            stat = future.result()
+            file_path = pending[stat.path]
+            st = file_path.stat()
+            cache[stat.path] = {
+                'mtime_ns': st.st_mtime_ns,
+                'size': st.st_size,
+                'sha1': sha1_file(file_path),
+                'gzip_size': stat.gzip_size,
+                'brotli_size': stat.brotli_size,
+                'brotli': use_brotli,
+            }
+            stats.append(stat)
+
+    # Drop entries for assets that no longer exist
+    current = {stat.path for stat in stats}
+    cache = {path: entry for path, entry in cache.items() if path in current}
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+
+    return sorted(stats, key=lambda s: s.size, reverse=True)
@@ -0,0 +1,138 @@
+"""
+Office OS - Retry Policy
+Error classification, exponential backoff with jitter, a run-wide retry
+budget and per-platform circuit breakers for the deploy engine.
+
+Circuit breaker state is persisted between runs so a platform that keeps
+failing is tried once per run (no retries) until its cooldown expires.
+"""
+import re
+import json
+import time
+import random
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+BREAKER_FILE = '.deploy-cache/circuit-breakers.json'
+
+# Only the end of a CLI's output says why it failed; earlier lines are progress
+ERROR_TAIL_LINES = 5
+
+# A status code only counts next to a word that says it is one, so
+# "Uploaded 512 files" is not a server error
+STATUS = r"\b(?:HTTP(?:/[\d.]+)?|status(?: code)?|code|error)[\s:=/]*"
+
+# Checked first: retrying these can never succeed
+FATAL_PATTERNS = re.compile(
+    r"not set|not installed|failed to install|unauthori[sz]ed|forbidden|"
+    rf"{STATUS}40[13]\b|invalid (api )?(token|key)|authentication (error|failed)|"
+    r"permission denied|project not found|no such file",
+    re.IGNORECASE
+)
+
+# Transient upstream or network trouble
+RETRYABLE_PATTERNS = re.compile(
+    rf"{STATUS}(5\d\d|429)\b|too many requests|rate.?limit|timed? ?out|"
+    r"ETIMEDOUT|ECONNRESET|ECONNREFUSED|EAI_AGAIN|ENOTFOUND|EPIPE|socket hang up|"
+    r"service unavailable|bad gateway|gateway timeout|internal server error|"
+    r"temporar(il)?y|connection (reset|aborted|refused)|network error|"
+    r"non-fast-forward|fetch first",
+    re.IGNORECASE
+)
+
+# Exit codes that mean the process was killed rather than failing on its own
+RETRYABLE_EXIT_CODES = {124, 137, 143, -9, -15}
+
+
+@dataclass
+class RetryPolicy:
+    """How a platform is retried after a retryable failure."""
+    max_attempts: int = 3
+    base_delay: float = 2.0  # seconds
+    max_delay: float = 30.0  # seconds
+    breaker_threshold: int = 3  # consecutive failed attempts before the circuit opens
+    breaker_cooldown: float = 3600.0  # seconds the circuit stays open
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) attempt."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+def error_lines(output: Optional[str]) -> str:
+    """The last few non-blank lines of a failure's output."""
+    lines = [line for line in (output or '').splitlines() if line.strip()]
+    return '\n'.join(lines[-ERROR_TAIL_LINES:])
+
+
+def is_retryable(error: Optional[str], exit_code: Optional[int] = None) -> bool:
+    """Classify a failure from the final lines of its output and, if known, the exit code."""
+    error = error_lines(error)
+    if FATAL_PATTERNS.search(error):
+        return False
+    if exit_code in RETRYABLE_EXIT_CODES:
+        return True
+    return bool(RETRYABLE_PATTERNS.search(error))
+
+
+class RetryBudget:
+    """Caps the total number of retries across all platforms in one run."""
+
+    def __init__(self, total: int):
+        self.remaining = total
+
+    def take(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class CircuitBreaker:
+    """Tracks consecutive failures for one platform."""
+
+    def __init__(self, policy: RetryPolicy, failures: int = 0, opened_at: float = 0.0):
+        self.policy = policy
+        self.failures = failures
+        self.opened_at = opened_at
+
+    @property
+    def is_open(self) -> bool:
+        if self.failures < self.policy.breaker_threshold:
+            return False
+        return time.time() - self.opened_at < self.policy.breaker_cooldown
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.policy.breaker_threshold:
+            self.opened_at = time.time()
+
+
+def load_breakers(project_root: Path, policies: Dict[str, RetryPolicy]) -> Dict[str, CircuitBreaker]:
+    """Restore breaker state for each platform key."""
+    try:
+        state = json.loads((project_root / BREAKER_FILE).read_text())
+    except (OSError, ValueError):
+        state = {}
+    return {
+        key: CircuitBreaker(policy, **state.get(key, {}))
+        for key, policy in policies.items()
+    }
+
+
+def save_breakers(project_root: Path, breakers: Dict[str, CircuitBreaker]):
+    """Persist breaker state for the next run."""
+    path = project_root / BREAKER_FILE
+    try:
+        state = json.loads(path.read_text())
+    except (OSError, ValueError):
+        state = {}
+    for key, breaker in breakers.items():
+        state[key] = {'failures': breaker.failures, 'opened_at': breaker.opened_at}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(state, indent=2, sort_keys=True))
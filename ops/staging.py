@@ -0,0 +1,173 @@
+"""
+Office OS - Staging Trees
+Gives every platform its own view of dist/ so deploys never write into the
+shared build output.
+
+Each view lives in .deploy-cache/staging/<platform> and mirrors dist/ with
+hardlinks, so no asset bytes are copied. A small overlay of platform files
+(`_headers`, `vercel.json`, `.nojekyll`, `CNAME`) is written on top as
+regular files. Build metadata is left out, and so are precompressed siblings
+for hosts that do not serve them. Views are updated in place: files still
+linked to the current build are kept, so refreshing an unchanged view only
+reads directories.
+
+Where hardlinks are impossible (another filesystem, no permission) files are
+copied instead; shutil's copy clones the file on filesystems that support it.
+"""
+import os
+import errno
+import shutil
+import concurrent.futures
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from dist_scan import PRECOMPRESSED_SUFFIXES
+
+STAGING_DIR = '.deploy-cache/staging'
+
+# Platforms that deploy from a directory, keyed like PLATFORMS in multi_deploy
+STAGED_PLATFORMS = ('cloudflare', 'vercel', 'netlify', 'surge', 'neocities', 'github')
+
+# Hosts that serve .gz/.br siblings as-is. None do: the others compress on
+# their own edge (or, like Neocities, reject the uploads), which is why
+# precompression is off by default (ENABLE_PRECOMPRESS)
+SERVES_PRECOMPRESSED = set()
+
+# Build metadata (the Vite manifest) that is read by ops tools, never served
+METADATA_PREFIXES = ('.vite/',)
+
+# errno values that mean "cannot hardlink here", not "something is broken"
+LINK_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES}
+
+
+@dataclass
+class StageStats:
+    """What building one view did."""
+    platform: str
+    linked: int = 0
+    copied: int = 0
+    reused: int = 0
+    removed: int = 0
+    overlay: int = 0
+
+
+def stage_dir(project_root: Path, platform: str) -> Path:
+    return project_root / STAGING_DIR / platform
+
+
+def walk_inodes(root: Path) -> Dict[str, int]:
+    """{relative path: inode} for every file under root.
+
+    os.scandir reports inodes without a stat call per file, so comparing two
+    trees costs one directory read per folder.
+    """
+    files = {}
+    pending = [('', str(root))]
+    while pending:
+        prefix, directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                relative = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((relative + '/', entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    files[relative] = entry.inode()
+    return files
+
+
+def _link_or_copy(source: Path, target: Path, stats: StageStats):
+    try:
+        os.link(source, target)
+        stats.linked += 1
+    except OSError as e:
+        if e.errno not in LINK_UNSUPPORTED:
+            raise
+        shutil.copy2(source, target)
+        stats.copied += 1
+
+
+def _is_current(source: Path, staged: Path, source_inode: int, staged_inode: int, same_device: bool) -> bool:
+    if same_device:
+        return source_inode == staged_inode
+    # Copies across filesystems: copy2 preserved size and mtime
+    a, b = source.stat(), staged.stat()
+    return a.st_size == b.st_size and a.st_mtime_ns == b.st_mtime_ns
+
+
+def build_tree(platform: str, dist_dir: Path, target: Path, overlay: Dict[str, bytes],
+               precompressed: bool = False, source: Optional[Dict[str, int]] = None) -> StageStats:
+    """Make `target` mirror dist/ plus `overlay`, reusing what is already linked.
+
+    `source` is dist/'s walk_inodes(), when the caller already has it.
+    """
+    stats = StageStats(platform)
+    source = walk_inodes(dist_dir) if source is None else source
+    target.mkdir(parents=True, exist_ok=True)
+    existing = walk_inodes(target)
+    same_device = dist_dir.stat().st_dev == target.stat().st_dev
+
+    made_dirs = set()
+    for relative, inode in source.items():
+        if relative in overlay or relative.startswith(METADATA_PREFIXES) or \
+                (not precompressed and relative.endswith(PRECOMPRESSED_SUFFIXES)):
+            continue
+        path, staged = dist_dir / relative, target / relative
+        if relative in existing:
+            if _is_current(path, staged, inode, existing[relative], same_device):
+                stats.reused += 1
+                continue
+            staged.unlink()
+        elif staged.parent not in made_dirs:
+            staged.parent.mkdir(parents=True, exist_ok=True)
+            made_dirs.add(staged.parent)
+        _link_or_copy(path, staged, stats)
+
+    for relative, content in overlay.items():
+        staged = target / relative
+        if relative in existing:
+            # Never write through a link into dist/
+            if staged.stat().st_nlink == 1 and staged.read_bytes() == content:
+                continue
+            staged.unlink()
+        staged.parent.mkdir(parents=True, exist_ok=True)
+        staged.write_bytes(content)
+        stats.overlay += 1
+
+    for relative in existing:
+        if relative in overlay:
+            continue
+        if relative not in source or relative.startswith(METADATA_PREFIXES) or \
+                (not precompressed and relative.endswith(PRECOMPRESSED_SUFFIXES)):
+            (target / relative).unlink()
+            stats.removed += 1
+    if stats.removed:
+        for directory, _, _ in sorted(os.walk(target), reverse=True):
+            if directory != str(target) and not os.listdir(directory):
+                os.rmdir(directory)
+    return stats
+
+
+def stage_all(project_root: Path, dist_dir: Path,
+              overlays: Dict[str, Dict[str, bytes]]) -> Tuple[Dict[str, Path], List[StageStats]]:
+    """Build one view per platform in `overlays`, in parallel.
+
+    Views of platforms not in `overlays` are removed so they stop pinning
+    old build files.
+    """
+    root = project_root / STAGING_DIR
+    if root.exists():
+        for entry in root.iterdir():
+            if entry.name not in overlays:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    paths = {platform: stage_dir(project_root, platform) for platform in overlays}
+    source = walk_inodes(dist_dir)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(overlays))) as executor:
+        futures = [
+            executor.submit(build_tree, platform, dist_dir, paths[platform], overlay,
+                            platform in SERVES_PRECOMPRESSED, source)
+            for platform, overlay in overlays.items()
+        ]
+        stats = [future.result() for future in futures]
+    return paths, stats
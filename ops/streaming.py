@@ -0,0 +1,157 @@
+"""
+Office OS - Streaming Request Bodies
+Upload bodies that are read from disk while they are sent, instead of being
+built in memory first.
+
+A body is a list of segments: literal bytes (multipart headers, JSON
+punctuation), a file's raw content, or a file's content base64-encoded on
+the fly. Its length is known up front, so requests sends it with a
+Content-Length, and `read()` never holds more than one CHUNK_SIZE buffer of
+a file, however large the asset. `seek(0)` restarts it, which is what the
+HTTP client does before a retry.
+
+Memory per upload is therefore a fixed buffer, and the bytes of all uploads
+in flight at once are capped by http_client.upload_budget.
+"""
+import os
+import json
+import uuid
+import base64
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+# Bytes read from a file per step; a multiple of 3 so base64 chunks join cleanly
+CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(3 * 64 * 1024))) // 3 * 3 or 3
+
+RAW = 'raw'
+BASE64 = 'base64'
+
+Segment = Union[bytes, Tuple[str, Path, int]]  # literal, or (encoding, file, raw size)
+
+
+def encoded_length(size: int) -> int:
+    return (size + 2) // 3 * 4
+
+
+class StreamBody:
+    """A file-like request body assembled from literal and file segments."""
+
+    def __init__(self, segments: List[Segment], content_type: str):
+        self.segments = segments
+        self.content_type = content_type
+        self.length = sum(
+            len(s) if isinstance(s, bytes) else (s[2] if s[0] == RAW else encoded_length(s[2]))
+            for s in segments
+        )
+        self.seek(0)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        # Only rewinding and end-relative probes (for the length) are needed
+        if whence == os.SEEK_END and offset == 0:
+            self.close()
+            self.index, self.pending, self.position = len(self.segments), b'', self.length
+        elif whence == os.SEEK_SET and offset == 0:
+            self.close()
+            self.index, self.pending, self.position = 0, b'', 0
+        elif not (whence == os.SEEK_CUR and offset == 0):
+            raise OSError("StreamBody can only seek to the start or end")
+        return self.position
+
+    def close(self):
+        handle = getattr(self, 'handle', None)
+        if handle is not None:
+            handle.close()
+        self.handle = None
+        self.remaining = 0
+
+    def _fill(self) -> bool:
+        """Load the next buffer into `pending`. False once everything was read."""
+        while self.index < len(self.segments):
+            segment = self.segments[self.index]
+            if isinstance(segment, bytes):
+                self.index += 1
+                if segment:
+                    self.pending = segment
+                    return True
+                continue
+
+            encoding, path, size = segment
+            if self.handle is None:
+                self.handle = open(path, 'rb')
+                self.remaining = size
+            if self.remaining:
+                data = self.handle.read(min(CHUNK_SIZE, self.remaining))
+                if not data:
+                    raise OSError(f"{path} shrank while it was being uploaded")
+                self.remaining -= len(data)
+                self.pending = base64.b64encode(data) if encoding == BASE64 else data
+                return True
+            self.close()
+            self.index += 1
+        return False
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.length - self.position
+        parts = []
+        wanted = size
+        while wanted > 0 and (self.pending or self._fill()):
+            part, self.pending = self.pending[:wanted], self.pending[wanted:]
+            parts.append(part)
+            wanted -= len(part)
+        data = b''.join(parts)
+        self.position += len(data)
+        return data
+
+
+def _quote(name: str) -> str:
+    """Escape a form field or file name the way browsers (and urllib3) do."""
+    return name.replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+
+def multipart_body(files: Dict[str, Path], boundary: Optional[str] = None) -> StreamBody:
+    """multipart/form-data with one file part per {field name: path}.
+
+    Each part is named and filenamed after its key, like requests' `files=`.
+    """
+    boundary = boundary or uuid.uuid4().hex
+    segments: List[Segment] = []
+    for name, path in files.items():
+        quoted = _quote(name)
+        segments.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{quoted}"; '
+            f'filename="{quoted}"\r\n\r\n'.encode()
+        )
+        segments.append((RAW, path, path.stat().st_size))
+        segments.append(b'\r\n')
+    segments.append(f'--{boundary}--\r\n'.encode())
+    return StreamBody(segments, f'multipart/form-data; boundary={boundary}')
+
+
+def base64_json_body(entries: List[Tuple[dict, Path]], field: str = 'value') -> StreamBody:
+    """A JSON array of objects, each with `field` set to a file's base64 content.
+
+    Equivalent to json.dumps([{**entry, field: b64(file)}...]) without the
+    encoded files ever being in memory.
+    """
+    segments: List[Segment] = [b'[']
+    for index, (entry, path) in enumerate(entries):
+        head = json.dumps(entry)[:-1]  # drop the closing brace
+        separator = ', ' if entry else ''
+        segments.append(f'{"," if index else ""}{head}{separator}"{field}": "'.encode())
+        segments.append((BASE64, path, path.stat().st_size))
+        segments.append(b'"}')
+    segments.append(b']')
+    return StreamBody(segments, 'application/json')
@@ -0,0 +1,216 @@
+"""
+Office OS - Deploy Telemetry
+Per-phase timings and counters for a deploy run, persisted as JSON lines.
+
+Every run appends one record to .deploy-cache/deploy-history.jsonl and can
+optionally write an OpenMetrics text file for scraping. The history is used
+to show trends and flag phases that regressed against a rolling baseline.
+"""
+import sys
+import json
+import time
+import uuid
+import statistics
+from pathlib import Path
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+HISTORY_FILE = '.deploy-cache/deploy-history.jsonl'
+METRIC_PREFIX = 'office_os_deploy'
+
+# A phase regresses when it is this much slower than its rolling median
+REGRESSION_RATIO = 1.5
+REGRESSION_MIN_SECONDS = 2.0
+
+
+@dataclass
+class Regression:
+    """A phase that got slower than its baseline."""
+    phase: str
+    platform: str
+    latest: float
+    baseline: float
+
+
+def phase_key(phase: str, platform: Optional[str]) -> str:
+    return f"{platform}/{phase}" if platform else phase
+
+
+def peak_rss_mib() -> Optional[float]:
+    """Peak resident set size of this process so far, or None where unknown."""
+    if not HAS_RESOURCE:
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+class Telemetry:
+    """Collects phase timings and counters for one run."""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.phases: List[dict] = []
+        self.counters: Dict[str, float] = {}
+        self.platforms: Dict[str, dict] = {}
+
+    @contextmanager
+    def phase(self, name: str, platform: Optional[str] = None):
+        """Time a block of work as a named phase."""
+        start = time.perf_counter()
+        entry = {'phase': name, 'platform': platform, 'ok': True}
+        try:
+            yield entry
+        except BaseException:
+            entry['ok'] = False
+            raise
+        finally:
+            entry['duration'] = time.perf_counter() - start
+            self.phases.append(entry)
+
+    def record(self, name: str, duration: float, platform: Optional[str] = None, **extra):
+        """Record a phase measured elsewhere."""
+        self.phases.append({'phase': name, 'platform': platform, 'duration': duration, 'ok': True, **extra})
+
+    def count(self, name: str, value: float, platform: Optional[str] = None):
+        """Add to a counter such as files or bytes uploaded."""
+        key = phase_key(name, platform)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def platform_result(self, platform: str, success: bool, duration: float, attempts: int):
+        self.platforms[platform] = {'success': success, 'duration': duration, 'attempts': attempts}
+
+    def to_record(self) -> dict:
+        return {
+            'run_id': self.run_id,
+            'started_at': self.started_at,
+            'total': time.time() - self.started_at,
+            'phases': self.phases,
+            'counters': self.counters,
+            'platforms': self.platforms,
+        }
+
+    def write_history(self, project_root: Path) -> dict:
+        """Append this run to the JSON lines history."""
+        record = self.to_record()
+        path = project_root / HISTORY_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        return record
+
+    def write_openmetrics(self, path: Path):
+        """Write this run as OpenMetrics text.
+
+        A phase that ran more than once (a retried listing, say) is one
+        series with the summed duration, since a label set may only appear
+        once per family.
+        """
+        def labels(**values) -> str:
+            return ','.join(f'{k}="{v}"' for k, v in values.items() if v is not None)
+
+        phase_seconds: Dict[Tuple[str, Optional[str]], float] = {}
+        for p in self.phases:
+            key = (p['phase'], p['platform'])
+            phase_seconds[key] = phase_seconds.get(key, 0.0) + p['duration']
+
+        lines = [
+            f"# TYPE {METRIC_PREFIX}_phase_seconds gauge",
+            f"# UNIT {METRIC_PREFIX}_phase_seconds seconds",
+        ]
+        for (phase, platform), seconds in phase_seconds.items():
+            lines.append(f"{METRIC_PREFIX}_phase_seconds{{{labels(phase=phase, platform=platform)}}} "
+                         f"{seconds:.6f}")
+        # Not "_count": that suffix is reserved for counter/summary samples
+        lines.append(f"# TYPE {METRIC_PREFIX}_events gauge")
+        for key, value in self.counters.items():
+            platform, _, name = key.rpartition('/')
+            lines.append(f"{METRIC_PREFIX}_events{{{labels(name=name, platform=platform or None)}}} {value}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_platform_success gauge")
+        for platform, result in self.platforms.items():
+            lines.append(f"{METRIC_PREFIX}_platform_success{{{labels(platform=platform)}}} "
+                         f"{1 if result['success'] else 0}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_seconds {time.time() - self.started_at:.6f}")
+        lines.append("# EOF")
+        path.write_text('\n'.join(lines) + '\n')
+
+
+# ============================================================================
+# History
+# ============================================================================
+
+def load_history(project_root: Path) -> List[dict]:
+    """All recorded runs, oldest first."""
+    path = project_root / HISTORY_FILE
+    runs = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return runs
+
+
+def phase_series(runs: List[dict]) -> Dict[Tuple[str, str], List[Optional[float]]]:
+    """Duration of each (phase, platform) per run; None where it did not run."""
+    keys = []
+    for run in runs:
+        for p in run.get('phases', []):
+            key = (p['phase'], p.get('platform') or '')
+            if key not in keys:
+                keys.append(key)
+
+    series = {key: [] for key in keys}
+    for run in runs:
+        durations = {}
+        for p in run.get('phases', []):
+            if p.get('skipped'):
+                continue
+            key = (p['phase'], p.get('platform') or '')
+            durations[key] = durations.get(key, 0.0) + p['duration']
+        for key in keys:
+            series[key].append(durations.get(key))
+    return series
+
+
+def find_regressions(runs: List[dict], window: int = 10) -> List[Regression]:
+    """Compare the latest run with the median of the `window` runs before it."""
+    regressions = []
+    for (phase, platform), values in phase_series(runs).items():
+        latest = values[-1] if values else None
+        previous = [v for v in values[:-1][-window:] if v is not None]
+        if latest is None or len(previous) < 3:
+            continue
+        baseline = statistics.median(previous)
+        if latest > baseline * REGRESSION_RATIO and latest - baseline > REGRESSION_MIN_SECONDS:
+            regressions.append(Regression(phase, platform, latest, baseline))
+    return regressions
+
+
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+def sparkline(values: List[Optional[float]]) -> str:
+    """Tiny trend chart; gaps for runs where the phase did not run."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return ''
+    low, high = min(present), max(present)
+    span = (high - low) or 1.0
+    return ''.join(
+        ' ' if v is None else SPARK_CHARS[int((v - low) / span * (len(SPARK_CHARS) - 1))]
+        for v in values
+    )
@@ -0,0 +1,54 @@
+"""
+Shared fixtures for the ops tests.
+
+The ops scripts import each other by plain module name (they run as
+`python ops/<script>.py`), so ops/ is put on sys.path here. API clients are
+driven against the stand-ins in fake_services, on 127.0.0.1.
+"""
+import sys
+from pathlib import Path
+from typing import Dict, Union
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fake_services  # noqa: E402
+
+
+def write_tree(root: Path, files: Dict[str, Union[str, bytes]]) -> Path:
+    """Create {relative path: content} under root and return root."""
+    for relative, content in files.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, str):
+            content = content.encode()
+        path.write_bytes(content)
+    return root
+
+
+@pytest.fixture
+def dist(tmp_path):
+    """A small dist/ with an index, hashed assets and a nested file."""
+    return write_tree(tmp_path / 'dist', {
+        'index.html': '<script type="module" src="/assets/index-abc.js"></script>',
+        'assets/index-abc.js': 'console.log("entry");' * 50,
+        'assets/style-def.css': 'body { margin: 0 }' * 20,
+        'assets/logo.svg': '<svg xmlns="http://www.w3.org/2000/svg"></svg>',
+        'fonts/inter.woff2': bytes(range(256)) * 4,
+    })
+
+
+@pytest.fixture
+def start_fake():
+    """Start fake_services stand-ins by class name; all are stopped afterwards."""
+    started = []
+
+    def start(name: str, **kwargs) -> fake_services.FakeService:
+        service = getattr(fake_services, name)(**kwargs).start()
+        started.append(service)
+        return service
+
+    yield start
+    for service in started:
+        service.stop()
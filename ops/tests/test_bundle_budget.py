@@ -0,0 +1,43 @@
+import bundle_budget
+from bundle_budget import BundleReport
+
+BUDGETS = {'headroom': {'ratio': 0.10, 'min_bytes': 2048}}
+
+
+def report(entry, routes=None, chunks=None):
+    return BundleReport(entry=entry, routes=routes or {}, chunks=chunks or {})
+
+
+def test_nothing_to_check_on_the_first_deploy():
+    assert not bundle_budget.enforced(BUDGETS, None, None)
+    assert bundle_budget.check(report(500_000), BUDGETS, None, None) == []
+
+
+def test_last_deployed_sizes_block_growth_until_a_baseline_is_pinned():
+    previous = report(100_000, {'/docs': 150_000}).to_json()
+    assert bundle_budget.enforced(BUDGETS, None, previous)
+
+    within = report(109_000, {'/docs': 160_000, '/new': 900_000})
+    assert bundle_budget.check(within, BUDGETS, None, previous) == []
+
+    grown = bundle_budget.check(report(120_000, {'/docs': 150_000}), BUDGETS, None, previous)
+    assert [(v.kind, v.scope, v.limit) for v in grown] == [('previous', 'entry', 110_000)]
+    assert 'last deployed' in grown[0].describe()
+
+
+def test_pinned_baseline_wins_over_the_last_deploy():
+    baseline = report(100_000).to_json()
+    previous = report(130_000).to_json()  # crept up past the headroom over several deploys
+
+    violations = bundle_budget.check(report(125_000), BUDGETS, baseline, previous)
+
+    assert [(v.kind, v.limit) for v in violations] == [('baseline', 110_000)]
+
+
+def test_explicit_budgets_take_precedence():
+    budgets = dict(BUDGETS, routes={'default': 200})
+    previous = report(0, {'/docs': 100_000}).to_json()
+
+    violations = bundle_budget.check(report(0, {'/docs': 210_000}), budgets, None, previous)
+
+    assert [(v.kind, v.limit) for v in violations] == [('budget', 200 * 1024)]
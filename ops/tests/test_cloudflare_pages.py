@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+import cloudflare_pages
+from conftest import write_tree
+
+
+@pytest.fixture
+def project(start_fake):
+    if not cloudflare_pages.HAS_BLAKE3:
+        pytest.skip('blake3 not installed')
+    service = start_fake('FakeCloudflare')
+    client = cloudflare_pages.PagesClient('test', 'account', 'office-os', api_base=service.url, workers=2)
+    return service, client
+
+
+def assets(service, endpoint):
+    return service.requests[f"POST /pages/assets/{endpoint}"]
+
+
+def test_buckets_split_on_count_and_encoded_size(tmp_path):
+    write_tree(tmp_path, {'a': b'1' * 300, 'b': b'2' * 30, 'c': b'3' * 30, 'd': b'4' * 30})
+    files = {name: tmp_path / name for name in 'abcd'}
+
+    by_count = cloudflare_pages.make_buckets(files, max_files=2)
+    assert [list(bucket) for bucket in by_count] == [['a', 'b'], ['c', 'd']]
+
+    # base64 grows 30 bytes to 40, so two small files fit in 100
+    by_size = cloudflare_pages.make_buckets(files, max_bytes=100)
+    assert [list(bucket) for bucket in by_size] == [['a'], ['b', 'c'], ['d']]
+
+
+def test_first_deploy_uploads_missing_assets_then_upserts(project, dist):
+    service, client = project
+    (dist / '_headers').write_text('/assets/*\n  Cache-Control: immutable\n')
+
+    result = cloudflare_pages.deploy(client, dist, 'main')
+
+    assert result.errors == []
+    assert (result.uploaded, result.unchanged) == (5, 0)
+    assert assets(service, 'check-missing') == 1
+    assert assets(service, 'upsert-hashes') == 1
+    deployment = service.deployments[-1]
+    assert sorted(deployment['manifest']) == sorted(f"/{p}" for p in (
+        'index.html', 'assets/index-abc.js', 'assets/style-def.css', 'assets/logo.svg', 'fonts/inter.woff2'))
+    assert deployment['files'] == ['_headers']
+    assert result.url == deployment['url']
+
+
+def test_redeploy_skips_uploads_but_still_upserts(project, dist):
+    service, client = project
+    cloudflare_pages.deploy(client, dist, 'main')
+    uploads = assets(service, 'upload')
+
+    result = cloudflare_pages.deploy(client, dist, 'main')
+
+    assert (result.uploaded, result.unchanged) == (0, 5)
+    assert assets(service, 'upload') == uploads
+    assert assets(service, 'upsert-hashes') == 2
+    assert len(service.deployments) == 2
+
+
+def test_identical_files_are_uploaded_once_and_counted_per_path(project, dist):
+    service, client = project
+    (dist / 'assets/copy.svg').write_bytes((dist / 'assets/logo.svg').read_bytes())
+
+    result = cloudflare_pages.deploy(client, dist, 'main')
+
+    assert result.uploaded == 5
+    assert service.files_uploaded == 5
+    assert len(service.deployments[-1]['manifest']) == 6
+
+    (dist / 'index.html').write_text('<p>changed</p>')
+    result = cloudflare_pages.deploy(client, dist, 'main')
+    assert (result.uploaded, result.unchanged) == (1, 5)
+
+
+def test_expired_upload_token_is_renewed(project, dist):
+    service, client = project
+    cloudflare_pages.deploy(client, dist, 'main')
+    service.jwt = 'rotated'
+
+    result = cloudflare_pages.deploy(client, dist, 'main')
+
+    assert result.errors == []
+    assert service.requests['GET /accounts/account/pages/projects/office-os/upload-token'] == 2
+
+
+def test_cancel_before_upload_reports_every_bucket(project, dist):
+    service, client = project
+    cancel = threading.Event()
+    cancel.set()
+
+    result = cloudflare_pages.deploy(client, dist, 'main', cancel)
+
+    assert result.uploaded == 0
+    assert result.errors
+    assert service.deployments == []
+
+
+def test_cancel_with_nothing_to_upload_raises(project, dist):
+    service, client = project
+    cloudflare_pages.deploy(client, dist, 'main')
+    cancel = threading.Event()
+    cancel.set()
+
+    with pytest.raises(cloudflare_pages.CloudflarePagesError, match='cancelled'):
+        cloudflare_pages.deploy(client, dist, 'main', cancel)
+    assert len(service.deployments) == 1
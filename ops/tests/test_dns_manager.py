@@ -0,0 +1,120 @@
+import pytest
+
+import dns_manager
+
+SUBDOMAINS = ['app', 'docs', 'www']
+TARGET = 'office-os.pages.dev'
+
+
+@pytest.fixture
+def zone(start_fake, monkeypatch):
+    """A fake zone with dns_manager pointed at it through a fresh session."""
+    def start(**kwargs):
+        service = start_fake('FakeCloudflare', domain=dns_manager.DOMAIN, **kwargs)
+        monkeypatch.setattr(dns_manager, 'API_BASE', service.url)
+        monkeypatch.setattr(dns_manager, 'CF_API_TOKEN', 'test')
+        monkeypatch.setattr(dns_manager, '_session', None)
+        monkeypatch.setattr(dns_manager, 'api_calls', 0)
+        return service
+    return start
+
+
+def cname(name, content):
+    return {'id': f"id-{name}", 'type': 'CNAME', 'name': f"{name}.{dns_manager.DOMAIN}",
+            'content': content, 'proxied': True}
+
+
+def targets(service):
+    return {r['name'].split('.')[0]: r['content'] for r in service.records if r['type'] == 'CNAME'}
+
+
+def test_compute_changes_sorts_records_into_create_update_unchanged_and_conflicts():
+    records = [
+        cname('app', TARGET),
+        cname('docs', 'old.netlify.app'),
+        {'id': 'a1', 'type': 'A', 'name': f"www.{dns_manager.DOMAIN}", 'content': '192.0.2.1'},
+    ]
+    changes = dns_manager.compute_changes(records, SUBDOMAINS + ['new'], TARGET)
+    assert changes.unchanged == ['app']
+    assert list(changes.update) == ['docs']
+    assert changes.conflicts == {'www': 'A'}
+    assert changes.create == ['new']
+    assert not changes.empty
+
+
+def test_current_target_is_the_majority_cname():
+    records = [cname('app', 'a.dev'), cname('docs', 'b.dev'), cname('www', 'b.dev'),
+               cname('unrelated', 'c.dev')]
+    assert dns_manager.current_target(records, SUBDOMAINS) == 'b.dev'
+    assert dns_manager.current_target([], SUBDOMAINS) is None
+
+
+def test_listing_follows_every_page(zone, monkeypatch):
+    service = zone()
+    service.add_filler_records(25)
+    monkeypatch.setattr(dns_manager, 'PER_PAGE', 10)
+
+    records = dns_manager.get_dns_records(service.zone_id)
+
+    assert len(records) == 25
+    assert len({r['id'] for r in records}) == 25
+    assert service.requests[f"GET /zones/{service.zone_id}/dns_records"] == 3
+
+
+def test_reconcile_applies_everything_in_one_batch(zone):
+    service = zone(records=[cname('docs', 'old.netlify.app')])
+
+    assert dns_manager.reconcile(service.zone_id, TARGET, SUBDOMAINS)
+
+    assert targets(service) == {sub: TARGET for sub in SUBDOMAINS}
+    assert service.requests[f"POST /zones/{service.zone_id}/dns_records/batch"] == 1
+    assert service.requests[f"POST /zones/{service.zone_id}/dns_records"] == 0
+    assert dns_manager.api_calls == 2  # list + batch
+
+
+def test_reconcile_falls_back_to_single_records_without_batch(zone):
+    service = zone(records=[cname('docs', 'old.netlify.app')], batch=False)
+
+    assert dns_manager.reconcile(service.zone_id, TARGET, SUBDOMAINS)
+
+    assert targets(service) == {sub: TARGET for sub in SUBDOMAINS}
+    assert service.requests[f"POST /zones/{service.zone_id}/dns_records"] == 2
+    assert sum(n for route, n in service.requests.items() if route.startswith('PUT ')) == 1
+
+
+def test_second_reconcile_only_lists(zone):
+    service = zone()
+    dns_manager.reconcile(service.zone_id, TARGET, SUBDOMAINS)
+    before = service.total_requests
+
+    assert dns_manager.reconcile(service.zone_id, TARGET, SUBDOMAINS)
+
+    assert service.total_requests == before + 1
+
+
+def test_passed_in_listing_saves_the_list_request(zone):
+    service = zone()
+    records = dns_manager.get_dns_records(service.zone_id)
+    before = service.total_requests
+
+    assert dns_manager.reconcile(service.zone_id, TARGET, SUBDOMAINS, records=records)
+
+    assert service.total_requests == before + 1  # the batch only
+
+
+def test_conflicting_records_fail_without_blocking_the_rest(zone):
+    www = {'id': 'a1', 'type': 'A', 'name': f"www.{dns_manager.DOMAIN}", 'content': '192.0.2.1'}
+    service = zone(records=[www])
+
+    assert not dns_manager.reconcile(service.zone_id, TARGET, SUBDOMAINS)
+
+    assert targets(service) == {'app': TARGET, 'docs': TARGET}
+
+
+def test_plan_mode_writes_nothing(zone):
+    service = zone()
+
+    assert dns_manager.reconcile(service.zone_id, TARGET, SUBDOMAINS, apply=False)
+
+    assert targets(service) == {}
+    assert service.total_requests == 1
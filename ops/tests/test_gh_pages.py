@@ -0,0 +1,118 @@
+import shutil
+import subprocess
+import threading
+import time
+
+import pytest
+
+import gh_pages
+
+
+@pytest.fixture
+def remote(tmp_path):
+    path = tmp_path / 'pages.git'
+    subprocess.run(['git', 'init', '-q', '--bare', str(path)], check=True)
+    return str(path)
+
+
+@pytest.fixture
+def project(tmp_path):
+    path = tmp_path / 'project'
+    path.mkdir()
+    return path
+
+
+def remote_files(remote, branch=gh_pages.BRANCH):
+    output = subprocess.run(['git', '--git-dir', remote, 'ls-tree', '-r', '--name-only', branch],
+                            capture_output=True, text=True, check=True).stdout
+    return sorted(output.split())
+
+
+def remote_head(remote, branch=gh_pages.BRANCH):
+    return subprocess.run(['git', '--git-dir', remote, 'rev-parse', branch],
+                          capture_output=True, text=True, check=True).stdout.strip()
+
+
+def test_first_publish_creates_the_branch(project, dist, remote):
+    result = gh_pages.publish(project, dist, remote)
+
+    assert result.changed == 5
+    assert sorted(result.added) == remote_files(remote)
+    assert result.commit == remote_head(remote)
+
+
+def test_republishing_the_same_tree_is_a_no_op(project, dist, remote):
+    first = gh_pages.publish(project, dist, remote)
+
+    result = gh_pages.publish(project, dist, remote)
+
+    assert result.changed == 0
+    assert result.commit is None
+    assert remote_head(remote) == first.commit
+
+
+def test_only_changed_paths_are_committed(project, dist, remote):
+    gh_pages.publish(project, dist, remote)
+    (dist / 'assets/style-def.css').write_text('body { margin: 1px }')
+    (dist / 'fonts/inter.woff2').unlink()
+    (dist / 'assets/new.js').write_text('export {}')
+
+    result = gh_pages.publish(project, dist, remote, message='Deploy test')
+
+    assert (result.added, result.updated, result.deleted) == (
+        ['assets/new.js'], ['assets/style-def.css'], ['fonts/inter.woff2'])
+    assert 'fonts/inter.woff2' not in remote_files(remote)
+    assert not (project / gh_pages.WORKTREE_DIR / 'fonts').exists()
+
+
+def test_lost_worktree_is_rebuilt_from_the_remote(project, dist, remote):
+    first = gh_pages.publish(project, dist, remote)
+    shutil.rmtree(project / gh_pages.WORKTREE_DIR)
+
+    result = gh_pages.publish(project, dist, remote)
+
+    assert result.commit is None
+    assert remote_head(remote) == first.commit
+
+
+def test_leftovers_in_the_worktree_are_cleaned(project, dist, remote):
+    gh_pages.publish(project, dist, remote)
+    (project / gh_pages.WORKTREE_DIR / 'stray.tmp').write_text('partial')
+
+    result = gh_pages.publish(project, dist, remote)
+
+    assert result.changed == 0
+    assert not (project / gh_pages.WORKTREE_DIR / 'stray.tmp').exists()
+
+
+def test_cancel_skips_the_push(project, dist, remote):
+    cancel = threading.Event()
+    cancel.set()
+
+    result = gh_pages.publish(project, dist, remote, cancel=cancel)
+
+    assert result.changed == 5
+    assert result.commit is None
+    with pytest.raises(subprocess.CalledProcessError):
+        remote_head(remote)
+
+
+def test_unreachable_remote_raises(project, dist, tmp_path):
+    with pytest.raises(gh_pages.GitHubPagesError):
+        gh_pages.publish(project, dist, str(tmp_path / 'missing.git'))
+
+
+def test_git_is_not_started_past_the_deadline(project, dist, remote):
+    with pytest.raises(gh_pages.GitHubPagesError, match='timed out'):
+        gh_pages.publish(project, dist, remote, deadline=time.monotonic() - 1)
+
+
+def test_lock_left_by_a_killed_git_is_cleared(project, dist, remote):
+    gh_pages.publish(project, dist, remote)
+    (project / gh_pages.WORKTREE_DIR / '.git' / 'index.lock').write_text('')
+    (dist / 'index.html').write_text('<p>next</p>')
+
+    result = gh_pages.publish(project, dist, remote, deadline=time.monotonic() + 60)
+
+    assert result.updated == ['index.html']
+    assert result.commit == remote_head(remote)
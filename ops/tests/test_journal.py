@@ -0,0 +1,105 @@
+import functools
+import json
+
+import neocities
+from journal import DeployJournal, files_log_path, journal_path
+
+FINGERPRINT = 'a' * 64
+
+
+def test_fresh_open_discards_an_earlier_run(tmp_path):
+    journal = DeployJournal.open(tmp_path, FINGERPRINT)
+    journal.complete('surge', 'https://office-os.surge.sh')
+
+    journal = DeployJournal.open(tmp_path, FINGERPRINT)
+
+    assert journal.completed('surge') is None
+
+
+def test_resume_keeps_finished_platforms(tmp_path):
+    journal = DeployJournal.open(tmp_path, FINGERPRINT)
+    journal.complete('surge', 'https://office-os.surge.sh')
+    journal.complete('surge', 'https://other.surge.sh')  # first result wins
+
+    journal = DeployJournal.open(tmp_path, FINGERPRINT, resume=True)
+
+    assert journal.completed('surge')['url'] == 'https://office-os.surge.sh'
+    assert journal.completed('vercel') is None
+
+
+def test_uploads_go_to_the_side_log_until_a_platform_completes(tmp_path):
+    journal = DeployJournal.open(tmp_path, FINGERPRINT)
+    journal.add_files('neocities', {'a.js': '1'})
+    journal.add_files('neocities', {'b.js': '2'})
+
+    assert len(journal.log_path.read_text().splitlines()) == 2
+    assert json.loads(journal.path.read_text())['files'] == {}
+
+    journal.complete('neocities', None)
+
+    assert not journal.log_path.exists()
+    assert json.loads(journal.path.read_text())['files'] == {'neocities': {'a.js': '1', 'b.js': '2'}}
+
+
+def test_resume_replays_the_side_log_and_skips_a_torn_line(tmp_path):
+    journal = DeployJournal.open(tmp_path, FINGERPRINT)
+    journal.add_files('neocities', {'a.js': '1'})
+    journal.add_files('neocities', {'a.js': '2', 'b.js': '3'})
+    with open(journal.log_path, 'a') as log:
+        log.write('{"platform": "neocities", "files": {"c.js"')  # crash mid-write
+
+    journal = DeployJournal.open(tmp_path, FINGERPRINT, resume=True)
+
+    assert journal.files('neocities') == {'a.js': '2', 'b.js': '3'}
+    assert not journal.log_path.exists()  # folded into the journal
+
+
+def test_other_builds_are_pruned_and_never_resumed(tmp_path):
+    old = DeployJournal.open(tmp_path, 'b' * 64)
+    old.complete('surge', 'https://office-os.surge.sh')
+    old.add_files('neocities', {'a.js': '1'})
+
+    journal = DeployJournal.open(tmp_path, FINGERPRINT, resume=True)
+
+    assert journal.completed('surge') is None
+    assert journal.files('neocities') == {}
+    assert sorted(p.name for p in journal.path.parent.iterdir()) == [journal.path.name]
+
+
+def test_corrupt_journal_starts_over(tmp_path):
+    path = journal_path(tmp_path, FINGERPRINT)
+    path.parent.mkdir(parents=True)
+    path.write_text('{"fingerprint": ')
+    files_log_path(path).write_text('{"platform": "neocities", "files": {"a.js": "1"}}\n')
+
+    journal = DeployJournal.open(tmp_path, FINGERPRINT, resume=True)
+
+    assert journal.files('neocities') == {}
+
+
+def test_interrupted_sync_resumes_with_the_remaining_files(tmp_path, dist, start_fake, monkeypatch):
+    service = start_fake('FakeNeocities')
+    api_base = f"{service.url}/api"
+    monkeypatch.setattr(neocities, 'make_batches', functools.partial(neocities.make_batches, max_files=1))
+    real_upload = neocities.NeocitiesClient.upload
+
+    def failing(self, files):
+        if 'fonts/inter.woff2' in files:
+            raise neocities.NeocitiesError('connection reset')
+        return real_upload(self, files)
+
+    journal = DeployJournal.open(tmp_path, FINGERPRINT)
+    record = functools.partial(journal.add_files, 'neocities')
+    monkeypatch.setattr(neocities.NeocitiesClient, 'upload', failing)
+    first = neocities.sync(neocities.NeocitiesClient('test', api_base=api_base), dist,
+                           full=True, on_uploaded=record)
+    assert first.errors and first.uploaded == 4
+
+    monkeypatch.setattr(neocities.NeocitiesClient, 'upload', real_upload)
+    journal = DeployJournal.open(tmp_path, FINGERPRINT, resume=True)
+    uploads = service.requests['POST /api/upload']
+    second = neocities.sync(neocities.NeocitiesClient('test', api_base=api_base), dist,
+                            full=True, uploaded=journal.files('neocities'))
+
+    assert (second.uploaded, second.unchanged) == (1, 4)
+    assert service.requests['POST /api/upload'] == uploads + 1
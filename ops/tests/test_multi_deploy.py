@@ -0,0 +1,39 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import multi_deploy
+
+
+def test_timed_out_worker_is_stopped_and_waited_for():
+    cancel = threading.Event()
+    finished = threading.Event()
+
+    def work():
+        cancel.wait(5)
+        time.sleep(0.2)  # e.g. the request in flight when cancel arrived
+        finished.set()
+
+    async def attempt():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(multi_deploy.run_in_thread(cancel, work), 0.1)
+        return finished.is_set()
+
+    assert asyncio.run(attempt())
+    assert cancel.is_set()
+
+
+def test_worker_result_and_errors_pass_through():
+    cancel = threading.Event()
+
+    def fail():
+        raise ValueError('boom')
+
+    assert asyncio.run(multi_deploy.run_in_thread(cancel, sum, [1, 2])) == 3
+    # The event is usually passed on to the deploy by keyword too
+    assert asyncio.run(multi_deploy.run_in_thread(cancel, lambda cancel: cancel, cancel=cancel)) is cancel
+    with pytest.raises(ValueError):
+        asyncio.run(multi_deploy.run_in_thread(cancel, fail))
+    assert not cancel.is_set()
@@ -0,0 +1,118 @@
+import functools
+import hashlib
+
+import pytest
+
+import neocities
+from conftest import write_tree
+
+
+@pytest.fixture
+def site(start_fake):
+    service = start_fake('FakeNeocities')
+    client = neocities.NeocitiesClient('test', api_base=f"{service.url}/api", workers=2)
+    return service, client
+
+
+def sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def limit_batches(monkeypatch, max_files: int):
+    monkeypatch.setattr(neocities, 'make_batches',
+                        functools.partial(neocities.make_batches, max_files=max_files))
+
+
+def test_plan_uploads_changed_and_deletes_stale_but_not_the_root():
+    local = {'index.html': 'a', 'app.js': 'b2', 'new.css': 'c'}
+    remote = {'index.html': 'a', 'app.js': 'b1', 'old.js': 'd'}
+    plan = neocities.plan_sync(local, remote)
+    assert sorted(plan.upload) == ['app.js', 'new.css']
+    assert plan.delete == ['old.js']
+    assert plan.unchanged == 1
+
+    assert neocities.plan_sync({}, {'index.html': 'a'}).delete == []
+    assert neocities.plan_sync(local, remote, delete_stale=False).delete == []
+
+
+def test_batches_split_on_file_count(tmp_path):
+    files = write_tree(tmp_path, {f"f{i}.txt": 'x' for i in range(7)})
+    batches = neocities.make_batches({p.name: p for p in sorted(files.iterdir())}, max_files=3)
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+
+def test_batches_split_on_size_but_keep_oversized_files_alone(tmp_path):
+    write_tree(tmp_path, {'a': b'1' * 40, 'b': b'2' * 40, 'big': b'3' * 500, 'c': b'4' * 10})
+    files = {name: tmp_path / name for name in ('a', 'b', 'big', 'c')}
+    batches = neocities.make_batches(files, max_files=10, max_bytes=100)
+    assert [list(batch) for batch in batches] == [['a', 'b'], ['big'], ['c']]
+    assert neocities.make_batches({}) == []
+
+
+def test_first_sync_uploads_everything_in_batches(site, dist, monkeypatch):
+    service, client = site
+    limit_batches(monkeypatch, 2)
+    result = neocities.sync(client, dist)
+
+    assert result.errors == []
+    assert (result.uploaded, result.unchanged, result.deleted) == (5, 0, 0)
+    assert service.requests['POST /api/upload'] == 3
+    assert service.files['assets/index-abc.js'] == sha1((dist / 'assets/index-abc.js').read_bytes())
+
+
+def test_second_sync_sends_only_the_change_and_deletes_stale(site, dist):
+    service, client = site
+    neocities.sync(client, dist)
+    (dist / 'assets/style-def.css').write_text('body { margin: 1px }')
+    (dist / 'assets/logo.svg').unlink()
+    uploads = service.requests['POST /api/upload']
+
+    result = neocities.sync(neocities.NeocitiesClient('test', api_base=client.api_base), dist)
+
+    assert (result.uploaded, result.unchanged, result.deleted) == (1, 3, 1)
+    assert service.requests['POST /api/upload'] == uploads + 1
+    assert 'assets/logo.svg' not in service.files
+
+
+def test_long_lived_client_reuses_its_view_of_the_site(site, dist):
+    service, client = site
+    neocities.sync(client, dist)
+    lists = service.requests['GET /api/list']
+
+    result = neocities.sync(client, dist)
+
+    assert result.uploaded == 0
+    assert service.requests['GET /api/list'] == lists
+
+
+def test_failed_batches_are_reported_and_block_deletes(site, dist, monkeypatch):
+    service, client = site
+    service.files['stale.js'] = 'x'
+    real = neocities.NeocitiesClient.upload
+
+    def flaky(self, files):
+        if 'fonts/inter.woff2' in files:
+            raise neocities.NeocitiesError('HTTP 500: boom')
+        return real(self, files)
+
+    limit_batches(monkeypatch, 1)
+    monkeypatch.setattr(neocities.NeocitiesClient, 'upload', flaky)
+    result = neocities.sync(client, dist)
+
+    assert result.uploaded == 4
+    assert result.errors == ['fonts/inter.woff2: HTTP 500: boom']
+    assert result.deleted == 0
+    assert 'stale.js' in service.files
+    assert client.remote is None  # relisted next time
+
+
+def test_journaled_uploads_are_skipped(site, dist):
+    service, client = site
+    done = {}
+    neocities.sync(client, dist, full=True, on_uploaded=done.update)
+    assert len(done) == 5
+
+    service.files.clear()
+    result = neocities.sync(neocities.NeocitiesClient('test', api_base=client.api_base), dist,
+                            full=True, uploaded=done)
+    assert (result.uploaded, result.unchanged) == (0, 5)
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+
+import pytest
+
+import multi_deploy
+import netlify_api
+
+
+@pytest.fixture
+def site(start_fake):
+    service = start_fake('FakeNetlify', site_id='office-os')
+    client = netlify_api.NetlifyClient('test', api_base=f"{service.url}/api/v1", workers=2)
+    return service, client
+
+
+def sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def test_first_deploy_uploads_every_required_digest(site, dist):
+    service, client = site
+    result = netlify_api.deploy(client, service.site_id, dist)
+
+    assert result.errors == []
+    assert (result.uploaded, result.unchanged) == (5, 0)
+    assert result.url == 'https://office-os.netlify.app'
+    assert service.files_uploaded == 5
+
+
+def test_redeploy_uploads_only_what_netlify_lacks(site, dist):
+    service, client = site
+    netlify_api.deploy(client, service.site_id, dist)
+    (dist / 'assets/index-abc.js').write_text('console.log("changed")')
+
+    result = netlify_api.deploy(client, service.site_id, dist)
+
+    assert (result.uploaded, result.unchanged) == (1, 4)
+    assert service.files_uploaded == 6
+    assert service.requests['PUT /api/v1/deploys/:id/files'] == 6
+
+
+def test_identical_files_share_one_upload(site, dist):
+    service, client = site
+    (dist / 'assets/copy.svg').write_bytes((dist / 'assets/logo.svg').read_bytes())
+
+    result = netlify_api.deploy(client, service.site_id, dist)
+
+    assert (result.uploaded, result.unchanged) == (5, 0)
+    assert service.files_uploaded == 5
+    assert sha1((dist / 'assets/copy.svg').read_bytes()) in service.blobs
+
+    # A new copy of content Netlify already has is unchanged
+    (dist / 'assets/copy2.svg').write_bytes((dist / 'assets/logo.svg').read_bytes())
+    result = netlify_api.deploy(client, service.site_id, dist)
+    assert (result.uploaded, result.unchanged) == (0, 7)
+
+
+def test_digests_already_on_netlify_are_not_sent(site, dist):
+    service, client = site
+    service.blobs.add(sha1((dist / 'fonts/inter.woff2').read_bytes()))
+
+    result = netlify_api.deploy(client, service.site_id, dist)
+
+    assert (result.uploaded, result.unchanged) == (4, 1)
+
+
+def test_sidecars_and_other_platforms_headers_are_excluded(site, dist):
+    service, client = site
+    (dist / 'assets/index-abc.js.br').write_bytes(b'compressed')
+    (dist / 'vercel.json').write_text('{}')
+    (dist / '_headers').write_text('/*\n  X-Frame-Options: DENY\n')
+
+    netlify_api.deploy(client, service.site_id, dist)
+
+    deploy = next(iter(service.deploys.values()))
+    assert '/_headers' in deploy['files']
+    assert '/vercel.json' not in deploy['files']
+    assert '/assets/index-abc.js.br' not in deploy['files']
+
+
+def test_cancelled_deploy_reports_errors_and_no_url(site, dist):
+    service, client = site
+    cancel = threading.Event()
+    cancel.set()
+
+    result = netlify_api.deploy(client, service.site_id, dist, cancel)
+
+    assert result.uploaded == 0
+    assert len(result.errors) == 5
+    assert result.url is None
+
+
+def test_unknown_site_raises(site, dist):
+    _, client = site
+    with pytest.raises(netlify_api.NetlifyError, match='404'):
+        netlify_api.deploy(client, 'missing', dist)
+
+
+@pytest.mark.parametrize('env, native', [
+    ({'NETLIFY_AUTH_TOKEN': 't', 'NETLIFY_SITE_ID': 's'}, True),
+    ({'NETLIFY_AUTH_TOKEN': 't'}, False),
+    ({'NETLIFY_SITE_ID': 's'}, False),
+])
+def test_cli_is_used_without_a_site_id(monkeypatch, env, native):
+    for var in ('NETLIFY_AUTH_TOKEN', 'NETLIFY_SITE_ID'):
+        monkeypatch.delenv(var, raising=False)
+    for var, value in env.items():
+        monkeypatch.setenv(var, value)
+
+    assert netlify_api.native_available() is native
+    assert ('netlify' in multi_deploy.cli_platforms(['netlify', 'surge'])) is not native
@@ -0,0 +1,103 @@
+import json
+import time
+
+import pytest
+
+import retry
+
+
+def test_fatal_errors_are_never_retried():
+    assert not retry.is_retryable("NETLIFY_AUTH_TOKEN not set")
+    assert not retry.is_retryable("HTTP 401: Unauthorized")
+    # Fatal wins even when the output also looks transient
+    assert not retry.is_retryable("503 after invalid token", exit_code=137)
+
+
+def test_transient_errors_and_killed_processes_are_retried():
+    assert retry.is_retryable("HTTP 503: Service Unavailable")
+    assert retry.is_retryable("Error: socket hang up")
+    assert retry.is_retryable("! [rejected] HEAD -> gh-pages (fetch first)")
+    assert retry.is_retryable("", exit_code=137)
+    assert not retry.is_retryable("build script exited", exit_code=1)
+
+
+def test_status_codes_only_count_in_context():
+    assert retry.is_retryable("Error: HTTP/1.1 502 Bad Gateway")
+    assert retry.is_retryable("request failed with status code 429")
+    assert not retry.is_retryable("Uploaded 512 files\nError: build failed")
+    assert not retry.is_retryable("Deploy failed: status 403")
+
+
+def test_only_the_final_lines_are_classified():
+    progress = "\n".join(f"Uploading chunk {i}" for i in range(20))
+    # A timeout mentioned early in a deterministic failure is not retried
+    assert not retry.is_retryable(f"retry after timeout\n{progress}\nError: invalid config")
+    # A fatal-looking word early in the log does not hide a transient failure
+    assert retry.is_retryable(f"SURGE_TOKEN not set, using login\n{progress}\nError: ECONNRESET")
+
+
+def test_backoff_stays_within_the_capped_ceiling():
+    policy = retry.RetryPolicy(base_delay=1.0, max_delay=5.0)
+    for attempt, ceiling in ((1, 1.0), (2, 2.0), (3, 4.0), (4, 5.0), (10, 5.0)):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+
+
+def test_budget_runs_out():
+    budget = retry.RetryBudget(2)
+    assert [budget.take() for _ in range(3)] == [True, True, False]
+    assert budget.remaining == 0
+
+
+def test_breaker_opens_at_threshold_and_closes_on_success():
+    breaker = retry.CircuitBreaker(retry.RetryPolicy(breaker_threshold=3))
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.is_open
+
+    breaker.record_failure()
+    assert breaker.is_open
+    assert breaker.opened_at > 0
+
+    breaker.record_success()
+    assert not breaker.is_open
+    assert (breaker.failures, breaker.opened_at) == (0, 0.0)
+
+
+def test_breaker_half_opens_after_cooldown():
+    policy = retry.RetryPolicy(breaker_threshold=1, breaker_cooldown=60)
+    assert retry.CircuitBreaker(policy, failures=1, opened_at=time.time()).is_open
+    assert not retry.CircuitBreaker(policy, failures=1, opened_at=time.time() - 61).is_open
+
+
+def test_breaker_state_survives_between_runs(tmp_path):
+    policies = {'netlify': retry.RetryPolicy(breaker_threshold=2), 'surge': retry.RetryPolicy()}
+    breakers = retry.load_breakers(tmp_path, policies)
+    breakers['netlify'].record_failure()
+    breakers['netlify'].record_failure()
+    retry.save_breakers(tmp_path, breakers)
+
+    restored = retry.load_breakers(tmp_path, policies)
+    assert restored['netlify'].is_open
+    assert not restored['surge'].is_open
+
+    # Saving a subset keeps the other platforms' state
+    restored['surge'].record_failure()
+    retry.save_breakers(tmp_path, {'surge': restored['surge']})
+    state = json.loads((tmp_path / retry.BREAKER_FILE).read_text())
+    assert state['netlify']['failures'] == 2
+    assert state['surge']['failures'] == 1
+
+
+def test_corrupt_breaker_file_starts_closed(tmp_path):
+    path = tmp_path / retry.BREAKER_FILE
+    path.parent.mkdir(parents=True)
+    path.write_text('{not json')
+    breakers = retry.load_breakers(tmp_path, {'github': retry.RetryPolicy()})
+    assert breakers['github'].failures == 0
+    assert not breakers['github'].is_open
+
+
+@pytest.mark.parametrize('attempt', [0, 1])
+def test_backoff_with_zero_base_never_waits(attempt):
+    assert retry.RetryPolicy(base_delay=0.0).backoff(attempt + 1) == 0.0
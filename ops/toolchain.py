@@ -0,0 +1,91 @@
+"""
+Office OS - Deploy Toolchain
+Pinned platform CLIs installed into a project-local tool cache.
+
+Each tool gets its own prefix under .deploy-cache/tools/<package>@<version>,
+so installs of different tools never race on a shared global prefix and a
+cached version is reused across runs. Versions can be overridden from the
+environment; OPS_USE_PATH_TOOLS=True uses whatever is on PATH instead.
+"""
+import os
+import sys
+import shutil
+from pathlib import Path
+from dataclasses import dataclass
+from typing import List, Optional
+
+TOOLS_DIR = '.deploy-cache/tools'
+USE_PATH_TOOLS = os.getenv('OPS_USE_PATH_TOOLS', 'False').lower() in ('true', '1', 'yes')
+
+
+@dataclass
+class ToolSpec:
+    """An npm-distributed CLI pinned to one version."""
+    binary: str
+    package: str
+    version: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.package}@{self.version}"
+
+
+PINNED_TOOLS = {
+    'wrangler': ToolSpec('wrangler', 'wrangler', os.getenv('WRANGLER_VERSION', '3.114.0')),
+    'vercel': ToolSpec('vercel', 'vercel', os.getenv('VERCEL_CLI_VERSION', '39.3.0')),
+    'surge': ToolSpec('surge', 'surge', os.getenv('SURGE_VERSION', '0.23.1')),
+    'netlify': ToolSpec('netlify', 'netlify-cli', os.getenv('NETLIFY_CLI_VERSION', '17.38.1')),
+}
+
+# Tools each platform (keyed like PLATFORMS in multi_deploy) needs
+PLATFORM_TOOLS = {
+    'cloudflare': ['wrangler'],
+    'vercel': ['vercel'],
+    'surge': ['surge'],
+    'netlify': ['netlify'],
+}
+
+
+def required_tools(platforms: List[str]) -> List[str]:
+    """Tools needed by the given platforms, without duplicates."""
+    tools = []
+    for platform in platforms:
+        for tool in PLATFORM_TOOLS.get(platform, []):
+            if tool not in tools:
+                tools.append(tool)
+    return tools
+
+
+def tool_prefix(project_root: Path, name: str) -> Path:
+    """Install prefix for a pinned tool."""
+    return project_root / TOOLS_DIR / PINNED_TOOLS[name].key
+
+
+def local_binary(prefix: Path, name: str) -> Path:
+    """Path of the tool's executable inside an install prefix."""
+    binary = PINNED_TOOLS[name].binary
+    if sys.platform == 'win32':
+        binary += '.cmd'
+    return prefix / 'node_modules' / '.bin' / binary
+
+
+def cached_binary(project_root: Path, name: str) -> Optional[Path]:
+    """The pinned binary if it is already in the tool cache."""
+    binary = local_binary(tool_prefix(project_root, name), name)
+    return binary if binary.exists() else None
+
+
+def install_command(prefix: Path, name: str) -> str:
+    """npm command that installs the pinned tool into `prefix`."""
+    return (f'npm install --prefix "{prefix}" --no-save --no-audit --no-fund '
+            f'{PINNED_TOOLS[name].key}')
+
+
+def path_binary(name: str) -> Optional[str]:
+    """The tool from PATH, if any."""
+    return shutil.which(PINNED_TOOLS[name].binary)
+
+
+def command(binary: str) -> str:
+    """Quote a resolved binary for use in a shell command."""
+    return f'"{binary}"'
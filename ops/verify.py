@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Office OS - Post-Deploy Verification
+Checks that every deployed host serves the new build and measures how fast.
+
+The app uses hash routing, so every route is served by the same index.html
+and differs only in the chunks it loads. For each host the verifier fetches
+`/` until its entry script matches the local build (the build ID), then
+requests every route's chunks from the Vite manifest concurrently. Each
+request records time to first byte and total transfer time; the report has
+p50/p95 of both per host.
+
+The fastest healthy host can be used as the DNS target for SUBDOMAINS,
+which gives the multi-host setup a latency-aware failover. Hosts map to
+CNAME targets through DNS_PLATFORM_TARGETS (see dns_manager). The current
+target is sticky: another host only takes over when the current one is
+unhealthy, or when it is faster by VERIFY_SWITCH_MARGIN with at least
+VERIFY_MIN_SAMPLES requests timed on both, so run-to-run noise does not
+flip DNS back and forth.
+
+Usage:
+    python ops/verify.py https://office-os.pages.dev https://office-os.netlify.app
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import requests
+import concurrent.futures
+from urllib.parse import urlparse
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import bundle_budget
+from http_client import HttpClient
+
+VERIFY_WORKERS = int(os.getenv('VERIFY_WORKERS', '8'))  # concurrent requests per host
+VERIFY_WAIT = float(os.getenv('VERIFY_WAIT', '60'))  # seconds to wait for the new build
+# A faster host replaces the current DNS target only if its p95 is this much
+# lower, measured over at least this many requests on both hosts
+SWITCH_MARGIN = float(os.getenv('VERIFY_SWITCH_MARGIN', '0.2'))
+MIN_SAMPLES = int(os.getenv('VERIFY_MIN_SAMPLES', '10'))
+POLL_INTERVAL = 2.0
+TIMEOUT = (10, 30)
+
+SCRIPT_TAG = re.compile(r'<script\b[^>]*>', re.IGNORECASE)
+SRC_ATTR = re.compile(r'\bsrc="([^"]+)"', re.IGNORECASE)
+
+
+@dataclass
+class Probe:
+    """One GET against a host."""
+    path: str
+    status: Optional[int] = None
+    ttfb: float = 0.0
+    total: float = 0.0
+    size: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+
+@dataclass
+class HostReport:
+    """Everything one host returned."""
+    platform: str
+    base_url: str
+    build_id: Optional[str] = None
+    expected: Optional[str] = None
+    probes: List[Probe] = field(default_factory=list)
+    failed_routes: List[str] = field(default_factory=list)
+    wait: float = 0.0
+
+    @property
+    def build_ok(self) -> bool:
+        return self.build_id is not None and self.build_id == self.expected
+
+    @property
+    def healthy(self) -> bool:
+        return self.build_ok and not self.failed_routes and all(p.ok for p in self.probes)
+
+    def percentile(self, attribute: str, fraction: float) -> Optional[float]:
+        values = sorted(getattr(p, attribute) for p in self.probes if p.ok)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+    @property
+    def samples(self) -> int:
+        return sum(1 for p in self.probes if p.ok)
+
+    @property
+    def ttfb_p50(self) -> Optional[float]:
+        return self.percentile('ttfb', 0.50)
+
+    @property
+    def ttfb_p95(self) -> Optional[float]:
+        return self.percentile('ttfb', 0.95)
+
+    @property
+    def transfer_p50(self) -> Optional[float]:
+        return self.percentile('total', 0.50)
+
+    @property
+    def transfer_p95(self) -> Optional[float]:
+        return self.percentile('total', 0.95)
+
+    def describe_problem(self) -> str:
+        if not self.build_ok:
+            return f"serves build {self.build_id or 'unknown'}, expected {self.expected}"
+        failed = [p for p in self.probes if not p.ok]
+        if failed:
+            first = failed[0]
+            return f"{len(failed)} requests failed ({first.path}: {first.error or first.status})"
+        return ''
+
+
+def build_id(index_html: str) -> Optional[str]:
+    """The entry module script of an index.html; its hashed name changes every build."""
+    for tag in SCRIPT_TAG.findall(index_html):
+        if 'module' in tag:
+            match = SRC_ATTR.search(tag)
+            if match:
+                return urlparse(match.group(1)).path.lstrip('/')
+    return None
+
+
+def route_assets(project_root: Path, dist_dir: Path) -> Dict[str, List[str]]:
+    """{route: asset paths it loads beyond index.html} from the Vite manifest.
+
+    Without a manifest only the entry is checked, as route '/'.
+    """
+    index = (dist_dir / 'index.html').read_text(errors='replace')
+    entry = build_id(index)
+    if not (dist_dir / bundle_budget.MANIFEST_FILE).exists():
+        return {'/': [entry] if entry else []}
+
+    manifest = bundle_budget.load_manifest(dist_dir)
+    entry_files = bundle_budget.static_closure(manifest, bundle_budget.ENTRY_KEY)
+    routes = {'/': sorted(entry_files)}
+    for path, module in bundle_budget.parse_routes(project_root).items():
+        key = bundle_budget.manifest_key(manifest, module)
+        if key is not None:
+            routes[path] = sorted(bundle_budget.static_closure(manifest, key) - entry_files)
+    return routes
+
+
+def probe(session: HttpClient, base_url: str, path: str) -> Tuple[Probe, bytes]:
+    """GET one path, timing the headers and the full body separately."""
+    result = Probe(path)
+    start = time.perf_counter()
+    try:
+        with session.get(f"{base_url}/{path}", stream=True, timeout=TIMEOUT) as response:
+            result.ttfb = time.perf_counter() - start
+            result.status = response.status_code
+            body = response.content
+        result.total = time.perf_counter() - start
+        result.size = len(body)
+        return result, body
+    except requests.RequestException as e:
+        result.error = str(e)
+        result.total = time.perf_counter() - start
+        return result, b''
+
+
+def verify_host(platform: str, base_url: str, expected: Optional[str], routes: Dict[str, List[str]],
+                workers: int = VERIFY_WORKERS, wait: float = VERIFY_WAIT) -> HostReport:
+    """Wait for the host to serve the expected build, then fetch every route's assets."""
+    base_url = base_url.rstrip('/')
+    report = HostReport(platform, base_url, expected=expected)
+    session = HttpClient(headers={'Cache-Control': 'no-cache'}, pool_size=workers)
+    start = time.perf_counter()
+
+    # CDNs may serve the previous build for a few seconds after a deploy
+    while True:
+        index, body = probe(session, base_url, '')
+        report.build_id = build_id(body.decode(errors='replace')) if index.ok else None
+        if report.build_ok or time.perf_counter() - start >= wait:
+            break
+        time.sleep(POLL_INTERVAL)
+    report.wait = time.perf_counter() - start
+    report.probes.append(index)
+    if not report.build_ok:
+        return report
+
+    assets = sorted({path for paths in routes.values() for path in paths})
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        probes = dict(zip(assets, (p for p, _ in executor.map(lambda a: probe(session, base_url, a), assets))))
+    report.probes.extend(probes.values())
+    report.failed_routes = [route for route, paths in routes.items()
+                            if not all(probes[path].ok for path in paths)]
+    return report
+
+
+def verify_all(targets: Dict[str, str], project_root: Path, dist_dir: Path,
+               workers: int = VERIFY_WORKERS, wait: float = VERIFY_WAIT) -> List[HostReport]:
+    """Verify {platform: base URL} concurrently against the local build."""
+    expected = build_id((dist_dir / 'index.html').read_text(errors='replace'))
+    routes = route_assets(project_root, dist_dir)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(targets))) as executor:
+        futures = [executor.submit(verify_host, platform, url, expected, routes, workers, wait)
+                   for platform, url in targets.items()]
+        return [future.result() for future in futures]
+
+
+def fastest_host(reports: List[HostReport], candidates: Optional[Dict[str, str]] = None) -> Optional[HostReport]:
+    """The healthy host with the lowest p95 transfer time, among `candidates` if given."""
+    healthy = [r for r in reports if r.healthy and (candidates is None or r.platform in candidates)]
+    return min(healthy, key=lambda r: r.transfer_p95, default=None)
+
+
+def choose_host(reports: List[HostReport], candidates: Optional[Dict[str, str]] = None,
+                current: Optional[str] = None, margin: float = SWITCH_MARGIN,
+                min_samples: int = MIN_SAMPLES) -> Optional[HostReport]:
+    """The host DNS should point at, preferring the `current` platform.
+
+    The fastest healthy host wins outright when there is no healthy current
+    host. Otherwise it has to beat the current host's p95 by `margin`, with
+    `min_samples` requests behind both numbers; if not, the current host stays.
+    """
+    best = fastest_host(reports, candidates)
+    incumbent = next((r for r in reports if r.platform == current and r.healthy
+                      and (candidates is None or r.platform in candidates)), None)
+    if best is None or incumbent is None or best is incumbent:
+        return best or incumbent
+    if (min(best.samples, incumbent.samples) >= min_samples
+            and best.transfer_p95 <= incumbent.transfer_p95 * (1 - margin)):
+        return best
+    return incumbent
+
+
+def print_reports(reports: List[HostReport]):
+    """Plain-text table of build status and latencies per host."""
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:.0f}" if value is not None else '-'
+
+    print(f"  {'Platform':<12} {'Build':<6} {'Requests':>8} {'TTFB p50':>9} {'p95':>6} "
+          f"{'Total p50':>10} {'p95':>6}  (ms)")
+    for r in reports:
+        print(f"  {r.platform:<12} {'✓' if r.build_ok else '✗':<6} {len(r.probes):>8} "
+              f"{ms(r.ttfb_p50):>9} {ms(r.ttfb_p95):>6} {ms(r.transfer_p50):>10} {ms(r.transfer_p95):>6}")
+        if not r.healthy:
+            print(f"    ❌ {r.describe_problem()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify deployed hosts against dist/")
+    parser.add_argument('urls', nargs='+', help="base URLs of the deployed sites")
+    parser.add_argument('--wait', type=float, default=VERIFY_WAIT,
+                        help="seconds to wait for a host to serve the new build")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).parent.parent.absolute()
+    targets = {urlparse(url).hostname or url: url for url in args.urls}
+    reports = verify_all(targets, project_root, project_root / 'dist', wait=args.wait)
+    print_reports(reports)
+    if not all(r.healthy for r in reports):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Office OS - File Watcher
+Reports settled changes under the build inputs and dist/ for watch mode.
+
+Uses inotify through the optional `inotify_simple` package on Linux and
+falls back to polling directory snapshots elsewhere. Changes are debounced:
+after the first event the watcher keeps collecting until the tree has been
+quiet for `debounce` seconds (or `max_delay` has passed), so a save burst or
+a running build becomes one batch. Events that arrive while a deploy is
+running queue up and are coalesced into the next batch.
+"""
+import os
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from inotify_simple import INotify, flags
+    HAS_INOTIFY = True
+except ImportError:
+    HAS_INOTIFY = False
+
+POLL_INTERVAL = 0.5  # seconds between snapshots when polling
+
+# Editor swap/backup files and build by-products that never need a deploy
+IGNORED_SUFFIXES = ('.swp', '.swx', '~', '.tmp', '.gz', '.br')
+IGNORED_NAMES = {'4913', '.DS_Store'}
+IGNORED_DIRS = {'node_modules', '.git', '.vite'}
+
+
+def ignored(path: str) -> bool:
+    name = os.path.basename(path)
+    return name in IGNORED_NAMES or name.endswith(IGNORED_SUFFIXES) or name.startswith('.#')
+
+
+class PollingWatcher:
+    """Detects changes by comparing (mtime, size) snapshots of the roots."""
+
+    def __init__(self, roots: Iterable[Path], interval: float = POLL_INTERVAL):
+        self.roots = [Path(root) for root in roots]
+        self.interval = interval
+        self.state = self.snapshot()
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        state = {}
+        pending = [str(root) for root in self.roots]
+        while pending:
+            current = pending.pop()
+            try:
+                if os.path.isfile(current):
+                    st = os.stat(current)
+                    state[current] = (st.st_mtime_ns, st.st_size)
+                    continue
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in IGNORED_DIRS:
+                                pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat()
+                            state[entry.path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue  # deleted while walking
+        return state
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Paths that changed since the last poll, waiting up to `timeout`."""
+        deadline = time.monotonic() + timeout
+        while True:
+            state = self.snapshot()
+            changed = {path for path in state.keys() | self.state.keys()
+                       if state.get(path) != self.state.get(path)}
+            self.state = state
+            changed = {path for path in changed if not ignored(path)}
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Watches every directory under the roots with inotify."""
+
+    MASK = (flags.CREATE | flags.MODIFY | flags.CLOSE_WRITE | flags.DELETE
+            | flags.MOVED_FROM | flags.MOVED_TO | flags.DELETE_SELF) if HAS_INOTIFY else 0
+
+    def __init__(self, roots: Iterable[Path]):
+        self.inotify = INotify()
+        self.watches: Dict[int, str] = {}
+        self.roots = [Path(root) for root in roots]
+        # Single files are watched through their folder, without recursing;
+        # so are roots that do not exist yet, like an optional .env.local
+        self.files = {str(root) for root in self.roots if not root.is_dir() and root.parent.is_dir()}
+        self.file_dirs = {os.path.dirname(path) for path in self.files}
+        for folder in self.file_dirs:
+            self.watches[self.inotify.add_watch(folder, self.MASK)] = folder
+        for root in self.roots:
+            if root.is_dir():
+                self.add_tree(str(root))
+
+    def add_tree(self, top: str):
+        for directory, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+            try:
+                self.watches[self.inotify.add_watch(directory, self.MASK)] = directory
+            except OSError:
+                continue
+
+    def poll(self, timeout: float) -> Set[str]:
+        changed = set()
+        for event in self.inotify.read(timeout=int(timeout * 1000)):
+            directory = self.watches.get(event.wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, event.name) if event.name else directory
+            if directory in self.file_dirs and path not in self.files:
+                continue
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    # New folders (e.g. a fresh dist/assets) need their own watch
+                    self.add_tree(path)
+                changed.add(path)
+            elif not ignored(path):
+                changed.add(path)
+            if event.mask & flags.IGNORED:
+                self.watches.pop(event.wd, None)
+        # A recreated root (rm -rf dist && build) must be watched again
+        for root in self.roots:
+            if root.is_dir() and str(root) not in self.watches.values():
+                self.add_tree(str(root))
+                changed.add(str(root))
+        return changed
+
+    def close(self):
+        self.inotify.close()
+
+
+def make_watcher(roots: Iterable[Path]):
+    """inotify where available, polling otherwise.
+
+    Missing directory roots (dist/ before the first build) are picked up
+    once they appear.
+    """
+    roots = list(roots)
+    if HAS_INOTIFY:
+        try:
+            return InotifyWatcher(roots)
+        except OSError:
+            pass  # inotify limits reached; polling still works
+    return PollingWatcher(roots)
+
+
+def collect(watcher, debounce: float, max_delay: float,
+            stop: Optional[threading.Event] = None, pending: Optional[Set[str]] = None) -> Set[str]:
+    """Block until something changes, then until it has settled. Returns the batch.
+
+    `pending` holds changes already seen (e.g. during the last deploy).
+    """
+    changed: Set[str] = set(pending or ())
+    while not changed:
+        if stop is not None and stop.is_set():
+            return changed
+        changed = watcher.poll(1.0)
+
+    first = time.monotonic()
+    while time.monotonic() - first < max_delay:
+        more = watcher.poll(debounce)
+        if not more:
+            break
+        changed |= more
+    return changed
+
+
+def under(path: str, root: Path) -> bool:
+    root = str(root)
+    return path == root or path.startswith(root + os.sep)
+
+
+def classify(changed: Set[str], inputs: List[Path], dist_dir: Path) -> Tuple[bool, bool]:
+    """(build inputs changed, dist/ changed) for a batch of paths."""
+    in_dist = any(under(path, dist_dir) for path in changed)
+    in_inputs = any(under(path, root) for path in changed for root in inputs)
+    return in_inputs, in_dist
@@ -8,6 +8,8 @@ export default defineConfig({
   build: {
     target: 'esnext',
     outDir: 'dist',
+    // dist/.vite/manifest.json, read by ops/bundle_budget.py
+    manifest: true,
     chunkSizeWarningLimit: 1000,
     rollupOptions: {
       output: {